@@ -0,0 +1,83 @@
+"""Compare slotted rows with dict_row for building and holding query results.
+
+`python brucebot/benchmark_rows.py [rows]`. No database needed: rows are
+made the way psycopg makes them, one call of the row maker per tuple of
+values. dict_row's row maker is `dict(zip(names, values))`.
+"""
+
+import datetime
+import sys
+import time
+import tracemalloc
+from collections.abc import Callable
+from types import SimpleNamespace
+
+from cogs.bot_stuff.rows import Event, Row, SetlistEntry, row_factory
+
+ROUNDS = 5
+
+
+def sample(cls: type[Row], count: int) -> list[tuple]:
+    """Make `count` tuples of values shaped like `cls`'s columns."""
+    if cls is Event:
+        day = datetime.date(1973, 1, 3)
+        return [
+            (
+                index,
+                f"{index:08d}-01",
+                day + datetime.timedelta(days=index),
+                index % 2000,
+            )
+            for index in range(count)
+        ]
+
+    return [(index // 20, index % 1500, "Show", index % 20) for index in range(count)]
+
+
+def dict_maker(cls: type[Row]) -> Callable[[tuple], dict]:
+    """Make rows the way dict_row does."""
+    names = cls.__slots__
+    return lambda values: dict(zip(names, values, strict=True))
+
+
+def slotted_maker(cls: type[Row]) -> Callable[[tuple], Row]:
+    """Make rows the way row_factory does."""
+    cursor = SimpleNamespace(
+        description=[SimpleNamespace(name=name) for name in cls.__slots__],
+    )
+    return row_factory(cls)(cursor)
+
+
+def measure(make: Callable[[tuple], object], values: list[tuple]) -> tuple[float, int]:
+    """Best time to build every row, and the memory holding them takes."""
+    best = float("inf")
+
+    for _ in range(ROUNDS):
+        start = time.perf_counter()
+        [make(row) for row in values]
+        best = min(best, time.perf_counter() - start)
+
+    tracemalloc.start()
+    held = [make(row) for row in values]
+    size, _ = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+
+    del held
+    return best, size
+
+
+if __name__ == "__main__":
+    count = int(sys.argv[1]) if len(sys.argv) > 1 else 100_000
+
+    print(f"{count} rows, best of {ROUNDS}")
+    print(f"{'rows':<14}{'maker':<10}{'build ms':>10}{'held MB':>10}")
+
+    for cls in (SetlistEntry, Event):
+        values = sample(cls, count)
+
+        for name, maker in (("dict_row", dict_maker), ("slotted", slotted_maker)):
+            seconds, size = measure(maker(cls), values)
+            print(
+                f"{cls.__name__:<14}{name:<10}{seconds * 1000:>10.1f}"
+                f"{size / 1024 / 1024:>10.1f}",
+            )
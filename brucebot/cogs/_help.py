@@ -1,95 +1,151 @@
+import json
+
 import discord
 from discord.ext import commands
 
+# stands in for the prefix in prebuilt embeds, replaced when sent
+PREFIX = "<<prefix>>"
 
-class MyHelp(commands.HelpCommand):
-    """Base for help commands."""
 
-    def get_command_signature(self, command: commands.Command) -> str:
-        """Retrieve the signature portion of the help page."""
-        return (
-            f"{self.context.clean_prefix}{command.qualified_name} {command.signature}"
-        )
+def visible(cmds: list[commands.Command]) -> list[commands.Command]:
+    """Commands that show up in help, the same ones filter_commands keeps."""
+    return [command for command in cmds if not command.hidden]
 
-    async def send_bot_help(self, mapping: dict) -> None:
-        """Help with bot functions."""
-        embed = discord.Embed(title="Brucebot Help", color=discord.Color.blurple())
 
-        for cog, cmds in mapping.items():
-            filtered = await self.filter_commands(cmds, sort=True)
-            command_signatures = [self.get_command_signature(c) for c in filtered]
+def signature(command: commands.Command) -> str:
+    """Signature of a command, with the prefix left as a placeholder."""
+    return f"{PREFIX}{command.qualified_name} {command.signature}"
 
-            if command_signatures and cog is not None:
-                embed.add_field(
-                    name=cog.qualified_name,
-                    value=cog.description,
-                    inline=True,
-                )
 
-        embed.set_footer(
-            text=f"{self.context.clean_prefix}bhelp [category] for more details.",
-        )
+def categories_embed(bot: commands.Bot) -> discord.Embed:
+    """Embed listing every category."""
+    embed = discord.Embed(title="Brucebot Help", color=discord.Color.blurple())
 
-        channel = self.get_destination()
-        await channel.send(embed=embed)
+    for cog in bot.cogs.values():
+        if visible(cog.get_commands()):
+            embed.add_field(
+                name=cog.qualified_name,
+                value=cog.description,
+                inline=True,
+            )
 
-    async def send_command_help(self, command: commands.Command) -> discord.Embed:
-        """Help with specific commands."""
-        embed = discord.Embed(
-            title=self.get_command_signature(command),
-            color=discord.Color.random(),
-        )
-        if command.help:
-            embed.description = command.help
-        if alias := command.aliases:
-            embed.add_field(name="Aliases", value=", ".join(alias), inline=False)
+    return embed.set_footer(text=f"{PREFIX}bhelp [category] for more details.")
 
-        channel = self.get_destination()
-        await channel.send(embed=embed)
 
-    async def send_cog_help(self, cog: commands.Cog) -> None:
-        """Help with cogs."""
-        embed = discord.Embed(
-            title=cog.qualified_name or "No Category",
-            description=cog.description,
-            color=discord.Color.blurple(),
+def command_embed(command: commands.Command) -> discord.Embed:
+    """Embed for a single command."""
+    embed = discord.Embed(title=signature(command), color=discord.Color.random())
+
+    if command.help:
+        embed.description = command.help
+    if alias := command.aliases:
+        embed.add_field(name="Aliases", value=", ".join(alias), inline=False)
+
+    return embed
+
+
+def cog_embed(cog: commands.Cog) -> discord.Embed:
+    """Embed listing a category's commands."""
+    embed = discord.Embed(
+        title=cog.qualified_name or "No Category",
+        description=cog.description,
+        color=discord.Color.blurple(),
+    )
+
+    for command in visible(cog.get_commands()):
+        embed.add_field(
+            name=signature(command),
+            value=command.help or "No Help Message Found... ",
+            inline=False,
         )
 
-        if filtered_commands := await self.filter_commands(cog.get_commands()):
-            for command in filtered_commands:
-                embed.add_field(
-                    name=self.get_command_signature(command),
-                    value=command.help or "No Help Message Found... ",
-                    inline=False,
-                )
+    return embed
 
-        await self.get_destination().send(embed=embed)
 
-    async def send_group_help(self, group: commands.Group) -> None:
-        """Help with specific groups of commands."""
-        embed = discord.Embed(
-            title=self.get_command_signature(group),
-            description=group.help,
-            color=discord.Color.blurple(),
+def group_embed(group: commands.Group) -> discord.Embed:
+    """Embed listing a group's subcommands."""
+    embed = discord.Embed(
+        title=signature(group),
+        description=group.help,
+        color=discord.Color.blurple(),
+    )
+
+    embed.description += "\n\nCan also use slash commands"
+
+    embed.description += "\n\n__**subcommands**__"
+
+    for command in visible(group.commands):
+        embed.add_field(
+            name=signature(command),
+            value=command.brief or command.help,
+            inline=False,
         )
 
-        embed.description += "\n\nCan also use slash commands"
+    return embed.set_footer(
+        text=f"{PREFIX}bhelp {group.qualified_name} [subcommand] for more details.",
+    )
+
 
-        embed.description += "\n\n__**subcommands**__"
+def build_help(bot: commands.Bot) -> dict[str, str]:
+    """Build every help embed, stored as JSON with the prefix left out."""
+    embeds = {"bot": categories_embed(bot)}
 
-        if filtered_commands := await self.filter_commands(group.commands):
-            for command in filtered_commands:
-                embed.add_field(
-                    name=f"{self.context.clean_prefix}{command.qualified_name} {command.signature}",  # noqa: E501
-                    value=command.brief or command.help,
-                    inline=False,
-                )
+    for cog in bot.cogs.values():
+        embeds[f"cog:{cog.qualified_name}"] = cog_embed(cog)
 
-        embed.set_footer(
-            text=(
-                f"{self.context.clean_prefix}bhelp {group.qualified_name} "
-                "[subcommand] for more details."
-            ),
+    for command in bot.walk_commands():
+        if isinstance(command, commands.Group):
+            embeds[f"group:{command.qualified_name}"] = group_embed(command)
+        else:
+            embeds[f"command:{command.qualified_name}"] = command_embed(command)
+
+    return {key: json.dumps(embed.to_dict()) for key, embed in embeds.items()}
+
+
+class MyHelp(commands.HelpCommand):
+    """Base for help commands.
+
+    The embeds only change when cogs are loaded or reloaded, so they're all
+    built at once and kept on the bot (cleared by its add_cog/remove_cog).
+    Sending one is just swapping in the prefix it was used with.
+    """
+
+    def get_command_signature(self, command: commands.Command) -> str:
+        """Retrieve the signature portion of the help page."""
+        return (
+            f"{self.context.clean_prefix}{command.qualified_name} {command.signature}"
         )
 
+    async def send_embed(self, key: str) -> None:
+        """Send a prebuilt embed, building them all if needed."""
+        bot = self.context.bot
+
+        if key not in bot.help_embeds:
+            bot.help_embeds = build_help(bot)
+
+        template = bot.help_embeds[key]
+        # escaped the same way as the rest of the JSON string
+        prefix = json.dumps(self.context.clean_prefix)[1:-1]
+
+        embed = discord.Embed.from_dict(json.loads(template.replace(PREFIX, prefix)))
+
+        if key.startswith("command:"):
+            embed.color = discord.Color.random()
+
         await self.get_destination().send(embed=embed)
+
+    async def send_bot_help(self, mapping: dict) -> None:  # noqa: ARG002
+        """Help with bot functions."""
+        await self.send_embed("bot")
+
+    async def send_command_help(self, command: commands.Command) -> None:
+        """Help with specific commands."""
+        await self.send_embed(f"command:{command.qualified_name}")
+
+    async def send_cog_help(self, cog: commands.Cog) -> None:
+        """Help with cogs."""
+        await self.send_embed(f"cog:{cog.qualified_name}")
+
+    async def send_group_help(self, group: commands.Group) -> None:
+        """Help with specific groups of commands."""
+        await self.send_embed(f"group:{group.qualified_name}")
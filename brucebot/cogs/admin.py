@@ -1,10 +1,12 @@
-import traceback
+import logging
 from typing import Literal, Optional
 
 import discord
-from cogs.bot_stuff import bot_embed
+from cogs.bot_stuff import bot_embed, executor
 from discord.ext import commands
 
+logger = logging.getLogger(__name__)
+
 TESTING = discord.Object(id=735698850802565171)
 BRUCE = discord.Object(id=363116664558059521)
 SNAKES = discord.Object(id=968567196169146419)
@@ -25,7 +27,7 @@ class Admin(commands.Cog):
         """Embed to send for any other error that might happen."""
         embed = await bot_embed.error_embed(error)
 
-        print(traceback.format_exc())
+        logger.error("Admin command failed", exc_info=error)
 
         await ctx.send(embed=embed)
 
@@ -93,6 +95,85 @@ class Admin(commands.Cog):
 
         await ctx.send("Cleared Commands")
 
+    @commands.command(hidden=True)
+    @commands.is_owner()
+    async def ratelimits(self, ctx: commands.Context) -> None:
+        """Show rate limiter counters."""
+        limiter = self.bot.rate_limiter
+
+        counters = [f"- **{key}**: {value}" for key, value in limiter.counters.items()]
+        limits = [
+            f"- **{scope}**: {size:.0f} tokens, {rate * 60:.1f}/min"
+            for scope, (size, rate) in limiter.limits.items()
+        ]
+
+        embed = await bot_embed.create_embed(
+            ctx=ctx,
+            title="Rate Limits",
+            description="\n".join(counters) or "Nothing yet.",
+        )
+
+        embed.add_field(name="Limits:", value="\n".join(limits), inline=False)
+        embed.add_field(name="Buckets:", value=len(limiter.buckets), inline=False)
+
+        await ctx.send(embed=embed)
+
+    @commands.command(hidden=True)
+    @commands.is_owner()
+    async def queues(self, ctx: commands.Context) -> None:
+        """Show database scheduler queues and counters."""
+        scheduler = self.bot.scheduler
+
+        queues = [
+            f"- **{name}**: {scheduler.running[name]} running, {scheduler.queued[name]} waiting (max {queue.concurrency}/{queue.max_waiting})"  # noqa: E501
+            for name, queue in scheduler.queues.items()
+        ]
+        counters = [
+            f"- **{key}**: {value}" for key, value in scheduler.counters.items()
+        ]
+
+        embed = await bot_embed.create_embed(
+            ctx=ctx,
+            title="DB Queues",
+            description="\n".join(queues),
+        )
+
+        embed.add_field(name="Slots:", value=scheduler.slots, inline=False)
+
+        if replicas := self.bot.replicas.replicas:
+            embed.add_field(
+                name="Replicas:",
+                value="\n".join(
+                    f"- **{replica.name}**: {'in use' if replica.healthy else 'skipped'}, lag {replica.lag}"  # noqa: E501
+                    for replica in replicas
+                ),
+                inline=False,
+            )
+        embed.add_field(
+            name="Counters:",
+            value="\n".join(counters) or "Nothing yet.",
+            inline=False,
+        )
+
+        await ctx.send(embed=embed)
+
+    @commands.command(hidden=True)
+    @commands.is_owner()
+    async def timings(self, ctx: commands.Context) -> None:
+        """Show timings for work offloaded to the executors."""
+        rows = [
+            f"- **{name}**: {timing.count} runs, avg {timing.total / timing.count * 1000:.0f}ms, max {timing.max * 1000:.0f}ms"  # noqa: E501
+            for name, timing in sorted(executor.timings.items())
+        ]
+
+        embed = await bot_embed.create_embed(
+            ctx=ctx,
+            title="Executor Timings",
+            description="\n".join(rows) or "Nothing yet.",
+        )
+
+        await ctx.send(embed=embed)
+
     @commands.command(hidden=True)
     @commands.guild_only()
     @commands.is_owner()
@@ -1,9 +1,9 @@
 import discord
 import ftfy
 import psycopg
-from cogs.bot_stuff import bot_embed, db, utils
+from cogs.bot_stuff import assets, bot_embed, db, executor, snapshot, utils
+from cogs.bot_stuff.album_stats import AlbumStats
 from discord.ext import commands
-from psycopg.rows import dict_row
 
 
 class Album(commands.Cog):
@@ -17,25 +17,26 @@ class Album(commands.Cog):
     async def album_embed(
         self,
         album: dict,
-        album_stats: dict,
+        album_stats: dict | None,
         ctx: commands.Context,
-    ) -> discord.Embed:
-        """Create embed with provided album info and send."""
+    ) -> tuple[discord.Embed, discord.File | None]:
+        """Create embed with provided album info, and the thumbnail to send."""
         embed = await bot_embed.create_embed(
             ctx=ctx,
             title=album["name"],
         )
 
-        try:
-            embed.set_thumbnail(url=album["thumb"])
-        except TypeError:
-            embed.set_thumbnail(
-                url="https://raw.githubusercontent.com/lilbud/brucebot/main/images/releases/default.jpg",
-            )
+        thumbnail = assets.set_thumbnail(
+            embed,
+            assets.get_manifest().release(album["name"]),
+        )
 
         embed.add_field(name="Release Date:", value=album["release_date"], inline=True)
         embed.add_field(name="Album Type:", value=album["type"], inline=True)
 
+        if album_stats is None:
+            return embed, thumbnail
+
         least = album_stats["least"]
         most = album_stats["most"]
 
@@ -61,50 +62,7 @@ class Album(commands.Cog):
             inline=True,
         )
 
-        return embed
-
-    async def get_album_stats(
-        self,
-        album_id: int,
-        cur: psycopg.AsyncCursor,
-    ) -> dict[dict, dict]:
-        """Get album tracks for the provided ID."""
-        res = await cur.execute(
-            """
-            WITH song_stats AS (
-                SELECT
-                    s.id AS song_id,
-                    s.uuid as song_uuid,
-                    s.song_name,
-                    COUNT(DISTINCT s1.*) FILTER (WHERE set_name IN ('Show', 'Set 1', 'Set 2', 'Encore')) AS times_played
-                FROM "release_tracks" r
-                LEFT JOIN "songs" s ON s.id = r.song_id
-                LEFT JOIN "setlists" s1 ON s1.song_id = s.id
-                WHERE r.release_id = %(id)s
-                GROUP BY 1, 2
-            ),
-            ranked_stats AS (
-                SELECT *,
-                    RANK() OVER (ORDER BY times_played DESC) as most_played_rank,
-                    RANK() OVER (ORDER BY times_played ASC) as least_played_rank
-                FROM song_stats
-            )
-            SELECT
-                song_name,
-                times_played,
-                song_id,
-                song_uuid,
-                CASE WHEN most_played_rank = 1 THEN 'most' ELSE 'least' END as category
-            FROM ranked_stats
-            WHERE most_played_rank = 1 OR least_played_rank = 1
-            ORDER BY times_played asc;
-            """,
-            {"id": album_id},
-        )
-
-        stats = await res.fetchall()
-
-        return {"least": stats[0], "most": stats[-1]}
+        return embed, thumbnail
 
     async def album_search(self, query: str, cur: psycopg.AsyncCursor) -> dict:
         """Find album by query."""
@@ -121,7 +79,7 @@ class Album(commands.Cog):
                 rank DESC
             LIMIT 1;
             """,  # noqa: E501
-            {"query": ftfy.fix_text(query)},
+            {"query": await executor.run_thread(ftfy.fix_text, query)},
         )
 
         return await res.fetchone()
@@ -142,24 +100,17 @@ class Album(commands.Cog):
 
         Album can be found by name or short name
         """
-        async with (
-            await db.create_pool() as pool,
-            pool.connection() as conn,
-            conn.cursor(
-                row_factory=dict_row,
-            ) as cur,
-        ):
+        album_stats = await snapshot.get(self.bot, AlbumStats)
+
+        async with db.cursor(self.bot) as cur:
             album = await self.album_search(album, cur)
 
             if album:
                 view = discord.ui.View()
 
-                stats = await self.get_album_stats(
-                    album_id=album["id"],
-                    cur=cur,
-                )
+                stats = album_stats.find(album["id"])
 
-                embed = await self.album_embed(
+                embed, thumbnail = await self.album_embed(
                     album=album,
                     album_stats=stats,
                     ctx=ctx,
@@ -178,7 +129,7 @@ class Album(commands.Cog):
                 view.add_item(item=databruce_button)
                 view.add_item(item=musicbrainz_button)
 
-                await ctx.send(embed=embed, view=view)
+                await ctx.send(embed=embed, view=view, file=thumbnail)
             else:
                 embed = await bot_embed.not_found_embed(
                     command=self.__class__.__name__,
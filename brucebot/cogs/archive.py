@@ -1,6 +1,13 @@
-from cogs.bot_stuff import bot_embed, db, utils, viewmenu
-from discord.ext import commands
-from psycopg.rows import dict_row
+import logging
+
+import discord
+from cogs.bot_stuff import bot_embed, snapshot, utils, viewmenu
+from cogs.bot_stuff.archive_feed import ArchiveFeed, feed_channels
+from cogs.bot_stuff.artifact_index import ArtifactIndex
+from cogs.bot_stuff.venue_index import VenueIndex
+from discord.ext import commands, tasks
+
+logger = logging.getLogger(__name__)
 
 
 class Archive(commands.Cog):
@@ -10,74 +17,95 @@ class Archive(commands.Cog):
         """Init Bootleg cog with bot."""
         self.bot = bot
         self.description = "Find bootlegs by date"
-
-    async def archive_latest(self, shows: dict, ctx: commands.Context) -> None:
-        """Archive default command, show 10 latest shows."""
-        menu = await viewmenu.create_dynamic_menu(
-            ctx=ctx,
-            page_counter="Page $/&",
-            rows=10,
-            title="Latest shows added to Radio Nowhere @ archive.org",
-        )
-
-        for index, show in enumerate(shows, start=1):
-            added_date = show["created_at"]
-
-            row = f"{index}. [{show['archive_url']}](https://archive.org/details/{show['archive_url']})\n\tAdded: {added_date.strftime('%Y-%m-%d - %I:%M %p')}"  # noqa: E501
-
-            menu.add_row(row)
-
-        await menu.start()
-
-    async def archive_embed(
-        self,
-        date: str,
-        shows: dict,
-        ctx: commands.Context,
-    ) -> None:
-        """Embed for getting results from Archive.org."""
-        embed = await bot_embed.create_embed(
-            ctx=ctx,
-            title=f"Radio Nowhere @ archive.org results for:\n{date}",
-            description="",
-            url="",
+        viewmenu.register_source("archive", self.archive_source)
+
+    async def cog_load(self) -> None:
+        """Start polling for new archive links."""
+        self.poll_feed.start()
+
+    async def cog_unload(self) -> None:
+        """Stop polling for new archive links."""
+        self.poll_feed.cancel()
+
+    def link_card(self, link: dict, venues: VenueIndex) -> str:
+        """Format an archive.org link under its event."""
+        card = utils.event_card(
+            link["event_date"],
+            link["event_id"],
+            venues.name(link["venue_id"]),
         )
 
-        links = []
-
-        for index, show in enumerate(shows, start=1):
-            added_date = show["created_at"].strftime("%Y-%m-%d %I:%M %p")
-            row = f"{index}. [{show['archive_url']}](https://archive.org/details/{show['archive_url']})\n\tAdded: {added_date}"  # noqa: E501
-
-            links.append(row)
-
-        embed.add_field(name="", value="\n".join(links))
-
-        await ctx.send(embed=embed)
-
-    async def archive_menu(
+        return f"{card}\n{link['row']}"
+
+    def archive_row(self, num: int, link: dict, venues: VenueIndex) -> str:
+        """Format an archive.org link as a numbered menu row."""
+        return f"{num}. {self.link_card(link, venues)}"
+
+    @tasks.loop(minutes=1)
+    async def poll_feed(self) -> None:
+        """Check for new archive links, posting any to the feed channels.
+
+        Each cluster only posts to the channels it can see, so every channel
+        gets each link once.
+        """
+        try:
+            feed = await snapshot.get(self.bot, ArchiveFeed)
+            await feed.refresh(self.bot)
+            new = feed.take_new()
+
+            channels = [
+                channel
+                for channel_id in feed_channels()
+                if (channel := self.bot.get_channel(channel_id))
+            ]
+
+            if not new or not channels:
+                return
+
+            venues = await snapshot.get(self.bot, VenueIndex)
+            embed = discord.Embed(
+                title="New on Radio Nowhere @ archive.org",
+                description="\n\n".join(
+                    self.link_card(link, venues) for link in new
+                )[:4096],
+                color=discord.Color.blurple(),
+            )
+
+            for channel in channels:
+                await channel.send(embed=embed)
+        except Exception:
+            logger.exception("Failed to poll the archive feed")
+
+    @poll_feed.before_loop
+    async def before_poll_feed(self) -> None:
+        """Wait until the bot is connected to start polling."""
+        await self.bot.wait_until_ready()
+
+    async def archive_source(
         self,
-        date: str,
-        shows: dict,
-        ctx: commands.Context,
-    ) -> None:
-        """Embed for getting results from Archive.org."""
-        menu = await viewmenu.create_dynamic_menu(
-            ctx=ctx,
-            page_counter="Page $/&",
+        bot: commands.Bot,
+        args: str,
+    ) -> viewmenu.RowSource:
+        """Build the menu of archive links for a date, or the latest if empty."""
+        venues = await snapshot.get(bot, VenueIndex)
+
+        if args:
+            title = f"Radio Nowhere @ archive.org results for:\n{args}"
+            links = (await snapshot.get(bot, ArtifactIndex)).find(args)["archive"]
+        else:
+            title = "Latest shows added to Radio Nowhere @ archive.org"
+            links = list((await snapshot.get(bot, ArchiveFeed)).latest)
+
+        return viewmenu.RowSource(
+            total=len(links),
+            get_rows=lambda start, stop: [
+                self.archive_row(num, link, venues)
+                for num, link in enumerate(links[start:stop], start=start + 1)
+            ],
+            title=title,
             rows=10,
-            title=f"Radio Nowhere @ archive.org results for:\n{date}",
         )
 
-        for index, show in enumerate(shows, start=1):
-            added_date = show["created_at"]
-
-            row = f"{index}. [{show['archive_url']}](https://archive.org/details/{show['archive_url']})\n\tAdded: {added_date.strftime('%Y-%m-%d %I:%M %p')}"  # noqa: E501
-
-            menu.add_row(row)
-
-        await menu.start()
-
     @commands.hybrid_command(
         name="archive",
         aliases=["ar"],
@@ -90,70 +118,25 @@ class Archive(commands.Cog):
         *,
         date: str = "",
     ) -> None:
-        async with (
-            await db.create_pool() as pool,
-            pool.connection() as conn,
-            conn.cursor(
-                row_factory=dict_row,
-            ) as cur,
-        ):
-            if date:
-                date = await utils.date_parsing(date)
-
-                try:
-                    date.strftime("%Y-%m-%d")
-                except AttributeError:
-                    embed = await bot_embed.not_found_embed(
-                        command=self.__class__.__name__,
-                        message=date,
-                    )
-                    await ctx.send(embed=embed)
-                    return
-
-                result = await cur.execute(
-                    """
-                        SELECT
-                            e.event_date,
-                            a.archive_url,
-                            a.created_at
-                        FROM archive_links a
-                        LEFT JOIN events e on e.id = a.event_id
-                        WHERE e.event_date::text = %(query)s
-                        """,
-                    {"query": date.strftime("%Y-%m-%d")},
+        if date:
+            date = await utils.date_parsing(date)
+
+            try:
+                date = date.strftime("%Y-%m-%d")
+            except AttributeError:
+                embed = await bot_embed.not_found_embed(
+                    command=self.__class__.__name__,
+                    message=date,
                 )
-
-                shows = await result.fetchall()
-
-                if shows:
-                    if len(shows) > 10:
-                        await self.archive_menu(date, shows, ctx)
-                    else:
-                        await self.archive_embed(date, shows, ctx)
-                else:
-                    embed = await bot_embed.not_found_embed(
-                        command=self.__class__.__name__,
-                        message=date,
-                    )
-                    await ctx.send(embed=embed)
-
-            else:
-                result = await cur.execute(
-                    """
-                        SELECT
-                            e.event_date,
-                            a.archive_url,
-                            a.created_at
-                        FROM archive_links a
-                        LEFT JOIN events e on e.id = a.event_id
-                        ORDER BY a.created_at DESC LIMIT 10
-                        """,
-                )
-
-                shows = await result.fetchall()
-
-                if shows:
-                    await self.archive_latest(shows, ctx)
+                await ctx.send(embed=embed)
+                return
+
+        if not await viewmenu.send_pages(ctx, "archive", date):
+            embed = await bot_embed.not_found_embed(
+                command=self.__class__.__name__,
+                message=date,
+            )
+            await ctx.send(embed=embed)
 
 
 async def setup(bot: commands.Bot) -> None:
@@ -1,10 +1,10 @@
 import datetime
 
-import psycopg
-from cogs.bot_stuff import bot_embed, db, utils, viewmenu
+import discord
+from cogs.bot_stuff import bot_embed, snapshot, utils, viewmenu
+from cogs.bot_stuff.artifact_index import ArtifactIndex
+from cogs.bot_stuff.venue_index import VenueIndex
 from discord.ext import commands
-from psycopg.rows import dict_row
-from reactionmenu import ViewButton
 
 
 class Bootleg(commands.Cog):
@@ -14,92 +14,40 @@ class Bootleg(commands.Cog):
         """Init Bootleg cog with bot."""
         self.bot = bot
         self.description = "Find bootlegs by date"
+        viewmenu.register_source("bootleg", self.bootleg_source)
 
-    async def media_to_emote(self, media_type: str) -> str:
-        """Match emotes to media types."""
-        match media_type:
-            case "DVD":
-                return "📀"
-            case "Blu-Ray" | "CD":
-                return "💿"
-            case "FLAC":
-                return "📁"
-            case "Vinyl":
-                return "🎵"
-            case _:
-                return ""
-
-    async def bootleg_embed(
+    async def bootleg_source(
         self,
-        ctx: commands.Context,
-        bootlegs: list,
-        date: str,
-    ) -> None:
-        """Embed for bootlegs, splits entries over pages."""
-        menu = await viewmenu.create_dynamic_menu(
-            ctx=ctx,
-            page_counter="Page $/&\nData gathered from SpringsteenLyrics",
-            rows=6,
-            title=f"Bootleg results for:\n{date} - {bootlegs[0]['formatted_loc']}",
+        bot: commands.Bot,
+        args: str,
+    ) -> viewmenu.RowSource:
+        """Build the bootleg menu for a date, given as YYYY-MM-DD."""
+        day = (await snapshot.get(bot, ArtifactIndex)).find(args)
+        venues = await snapshot.get(bot, VenueIndex)
+        bootlegs = day["bootlegs"]
+        label = utils.event_label(
+            datetime.date.fromisoformat(args),
+            day["event_id"],
+            venues.name(day["venue_id"]),
         )
 
-        sp_lyrics_button = ViewButton(
-            style="link",
-            label="SpringsteenLyrics",
-            url=f"https://www.springsteenlyrics.com/bootlegs.php?filter_date={date}&cmd=list&category=filter_date",
+        source = viewmenu.RowSource(
+            total=len(bootlegs),
+            get_rows=lambda start, stop: bootlegs[start:stop],
+            title=f"Bootleg results for:\n{label}",
+            style="Page $/&\nData gathered from SpringsteenLyrics",
+            rows=6,
         )
 
-        menu.add_button(sp_lyrics_button)
-
-        for boot in bootlegs:
-            emote = await self.media_to_emote(media_type=boot["media_type"])
-            row = f"**{boot['label']}** - {boot['title']}\n{emote}  {boot['media_type']} - *{boot['category']}*\n"  # noqa: E501
-
-            if boot["slid"] is not None:
-                url = await utils.format_link(
-                    url=f"https://www.springsteenlyrics.com/bootlegs.php?item={boot['slid']}",
-                    text=boot["title"],
-                )
-
-                row = f"**{boot['label']}** - {url}\n{emote}  {boot['media_type']} - *{boot['category']}*\n"  # noqa: E501
-
-            menu.add_row(data=row)
-
-        await menu.start()
-
-    async def bootleg_search(
-        self,
-        date: datetime.datetime,
-        cur: psycopg.AsyncCursor,
-    ) -> dict:
-        """Search for bootlegs."""
-        res = await cur.execute(
-            """
-            SELECT
-                DISTINCT extensions.unaccent(b.title) AS title,
-                b.label,
-                b.slid,
-                CASE
-                    WHEN b.category = 'aud_comp' THEN 'Audio Compilation'
-                    WHEN b.category = 'vid_comp' THEN 'Video Compilation'
-                    WHEN b.category SIMILAR TO 'aud_*' THEN 'Audio'
-                    WHEN b.category SIMILAR TO 'vid_*' THEN 'Video'
-                END as category,
-                b.media_type,
-                CASE WHEN c1.id in (2,6,37) then concat_ws(', ', v.name, c.name, s.state_abbrev) else concat_ws(', ', v.name, c.name, s.name, c1.name) end as formatted_loc
-            FROM "bootlegs" b
-            LEFT JOIN "events" e ON e.id = b.event_id
-            left join venues v on v.id = e.venue_id
-            left join cities c on c.id = v.city
-            left join states s on s.id = c.state
-            left join countries c1 on c1.id = s.country
-            WHERE e.event_date = %(query)s
-            ORDER BY title ASC
-            """,
-            {"query": date.strftime("%Y-%m-%d")},
+        source.buttons.append(
+            discord.ui.Button(
+                style=discord.ButtonStyle.link,
+                label="SpringsteenLyrics",
+                url=f"https://www.springsteenlyrics.com/bootlegs.php?filter_date={args}&cmd=list&category=filter_date",
+            ),
         )
 
-        return await res.fetchall()
+        return source
 
     @commands.hybrid_command(
         name="bootleg",
@@ -117,39 +65,24 @@ class Bootleg(commands.Cog):
 
         Date can be in any valid format, although YYYY-MM-DD is recommended.
         """
-        async with await db.create_pool() as pool:
-            date = await utils.date_parsing(date)
-
-            try:
-                date.strftime("%Y-%m-%d")
-            except AttributeError:
-                embed = await bot_embed.not_found_embed(
-                    command=self.__class__.__name__,
-                    message=date,
-                )
-                await ctx.send(embed=embed)
-                return
-
-            async with (
-                pool.connection() as conn,
-                conn.cursor(
-                    row_factory=dict_row,
-                ) as cur,
-            ):
-                bootlegs = await self.bootleg_search(date=date, cur=cur)
-
-            if len(bootlegs) > 0:
-                await self.bootleg_embed(
-                    ctx=ctx,
-                    bootlegs=bootlegs,
-                    date=date.strftime("%Y-%m-%d"),
-                )
-            else:
-                embed = await bot_embed.not_found_embed(
-                    command=self.__class__.__name__,
-                    message=date,
-                )
-                await ctx.send(embed=embed)
+        date = await utils.date_parsing(date)
+
+        try:
+            date = date.strftime("%Y-%m-%d")
+        except AttributeError:
+            embed = await bot_embed.not_found_embed(
+                command=self.__class__.__name__,
+                message=date,
+            )
+            await ctx.send(embed=embed)
+            return
+
+        if not await viewmenu.send_pages(ctx, "bootleg", date):
+            embed = await bot_embed.not_found_embed(
+                command=self.__class__.__name__,
+                message=date,
+            )
+            await ctx.send(embed=embed)
 
 
 async def setup(bot: commands.Bot) -> None:
@@ -0,0 +1,169 @@
+from collections import Counter
+
+import psycopg
+from cogs.bot_stuff.snapshot import Snapshot
+
+ALBUM_SETS = ["Show", "Set 1", "Set 2", "Encore"]
+
+
+class AlbumStats(Snapshot):
+    """Public play counts for every song, rolled up into per-release stats.
+
+    New shows are applied incrementally by only counting setlist rows past
+    the highest id already seen. Any update or delete in the tables (song
+    corrections, renames), or a change in release tracks, rebuilds from
+    scratch instead.
+    """
+
+    tables = ("release_tracks", "setlists", "songs")
+
+    def __init__(self) -> None:
+        """Init empty stats."""
+        super().__init__()
+        self.plays: Counter[int] = Counter()
+        self.songs: dict[int, dict] = {}
+        self.tracks: dict[int, list[int]] = {}
+        self.releases: dict[int, dict] = {}
+        self.last_setlist_id = 0
+        self.setlist_rows = 0
+        self.track_rows = 0
+        self.edits = 0
+
+    async def get_edits(self, cur: psycopg.AsyncCursor) -> int:
+        """Get the number of updates and deletes made to the tables."""
+        res = await cur.execute(
+            """
+            SELECT coalesce(sum(n_tup_upd + n_tup_del), 0) AS edits
+            FROM pg_stat_user_tables
+            WHERE relname = ANY(%(tables)s)
+            """,
+            {"tables": list(self.tables)},
+        )
+
+        return int((await res.fetchone())["edits"])
+
+    async def get_totals(self, cur: psycopg.AsyncCursor) -> tuple[int, int]:
+        """Get number of counted setlist rows and release tracks."""
+        res = await cur.execute(
+            """
+            SELECT
+                (SELECT count(*) FROM setlists WHERE set_name = ANY(%(sets)s)) AS setlists,
+                (SELECT count(*) FROM release_tracks) AS tracks
+            """,  # noqa: E501
+            {"sets": ALBUM_SETS},
+        )
+
+        totals = await res.fetchone()
+        return totals["setlists"], totals["tracks"]
+
+    async def build(self, cur: psycopg.AsyncCursor) -> None:
+        """Count every performance and rebuild all release stats."""
+        self.edits = await self.get_edits(cur)
+
+        res = await cur.execute(
+            """
+            SELECT
+                r.release_id,
+                s.id AS song_id,
+                s.uuid AS song_uuid,
+                s.song_name
+            FROM release_tracks r
+            LEFT JOIN songs s ON s.id = r.song_id
+            WHERE s.id IS NOT NULL
+            """,
+        )
+
+        track_rows = await res.fetchall()
+
+        res = await cur.execute(
+            """
+            SELECT
+                song_id,
+                count(*) AS times_played,
+                max(id) AS last_id
+            FROM setlists
+            WHERE set_name = ANY(%(sets)s)
+            GROUP BY song_id
+            """,
+            {"sets": ALBUM_SETS},
+        )
+
+        play_rows = await res.fetchall()
+
+        self.songs = {}
+        self.tracks = {}
+
+        for row in track_rows:
+            self.songs[row["song_id"]] = {
+                "song_id": row["song_id"],
+                "song_uuid": row["song_uuid"],
+                "song_name": row["song_name"],
+            }
+
+            tracks = self.tracks.setdefault(row["release_id"], [])
+
+            if row["song_id"] not in tracks:
+                tracks.append(row["song_id"])
+
+        self.plays = Counter({row["song_id"]: row["times_played"] for row in play_rows})
+        self.last_setlist_id = max((row["last_id"] for row in play_rows), default=0)
+        self.setlist_rows = sum(self.plays.values())
+        self.track_rows = len(track_rows)
+
+        self.releases = {release: self.rank(release) for release in self.tracks}
+
+    async def update(self, cur: psycopg.AsyncCursor) -> None:
+        """Count setlist rows added since the last refresh."""
+        # edited rows are already counted under their old song or name
+        if await self.get_edits(cur) != self.edits:
+            await self.build(cur)
+            return
+
+        res = await cur.execute(
+            """
+            SELECT id, song_id FROM setlists
+            WHERE id > %(last)s AND set_name = ANY(%(sets)s)
+            """,
+            {"last": self.last_setlist_id, "sets": ALBUM_SETS},
+        )
+
+        new_rows = await res.fetchall()
+        setlist_rows, track_rows = await self.get_totals(cur)
+
+        if (
+            setlist_rows != self.setlist_rows + len(new_rows)
+            or track_rows != self.track_rows
+        ):
+            await self.build(cur)
+            return
+
+        for row in new_rows:
+            self.plays[row["song_id"]] += 1
+
+        self.last_setlist_id = max(
+            (row["id"] for row in new_rows),
+            default=self.last_setlist_id,
+        )
+        self.setlist_rows = setlist_rows
+
+        changed = {row["song_id"] for row in new_rows}
+
+        for release, tracks in self.tracks.items():
+            if changed.intersection(tracks):
+                self.releases[release] = self.rank(release)
+
+    def rank(self, release: int) -> dict[str, dict]:
+        """Get the least and most played tracks on a release."""
+        tracks = sorted(
+            (
+                {**self.songs[song], "times_played": self.plays[song]}
+                for song in self.tracks[release]
+            ),
+            key=lambda track: track["times_played"],
+        )
+
+        return {"least": tracks[0], "most": tracks[-1]}
+
+    def find(self, release: int) -> dict[str, dict] | None:
+        """Get least/most played tracks for a release, if it has any tracks."""
+        return self.releases.get(release)
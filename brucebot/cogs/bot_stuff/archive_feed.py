@@ -0,0 +1,119 @@
+import datetime
+import os
+from collections import deque
+
+import psycopg
+from cogs.bot_stuff.artifact_index import archive_row
+from cogs.bot_stuff.snapshot import Snapshot
+
+# number of most recently added archive links shown by a bare !archive
+LATEST_ARCHIVE = 10
+
+# how far back each poll re-reads, created_at is when the adding transaction
+# started so links can commit after ones with a later created_at
+OVERLAP = datetime.timedelta(minutes=5)
+
+
+def feed_channels() -> list[int]:
+    """Ids of the channels new uploads are posted to, from ARCHIVE_FEED_CHANNELS."""
+    setting = os.getenv("ARCHIVE_FEED_CHANNELS", "")
+    return [int(channel) for channel in setting.split(",") if channel.strip()]
+
+
+class ArchiveFeed(Snapshot):
+    """The latest archive.org links, kept up to date by polling.
+
+    Remembers the newest `created_at` it has seen, so an update only fetches
+    links added around or after it. The window before the mark is read
+    again each time, with links already seen in it skipped by url. Links
+    added since the last `take_new` are kept for posting to the feed
+    channels.
+    """
+
+    tables = ("archive_links",)
+
+    def __init__(self) -> None:
+        """Init empty feed."""
+        super().__init__()
+        self.latest: deque[dict] = deque(maxlen=LATEST_ARCHIVE)
+        self.since: datetime.datetime | None = None
+        self.seen: dict[str, datetime.datetime] = {}
+        self.new: list[dict] = []
+
+    async def fetch(self, cur: psycopg.AsyncCursor) -> list:
+        """Get the links added in the window before the mark and after it.
+
+        Or the latest links, before there is a mark. Newest first.
+        """
+        if self.since is None:
+            where, limit = "", "LIMIT %(limit)s"
+        else:
+            where, limit = "WHERE a.created_at >= %(since)s", ""
+
+        res = await cur.execute(
+            f"""
+            SELECT
+                e.event_date,
+                e.event_id,
+                e.venue_id,
+                a.archive_url,
+                a.created_at
+            FROM archive_links a
+            LEFT JOIN events e on e.id = a.event_id
+            {where}
+            ORDER BY a.created_at DESC
+            {limit}
+            """,  # noqa: S608
+            {
+                "since": self.since and self.since - OVERLAP,
+                "limit": LATEST_ARCHIVE,
+            },
+        )
+
+        return await res.fetchall()
+
+    def add(self, links: list) -> list:
+        """Push unseen links (newest first) onto the feed, returns them.
+
+        Moves the mark up to the newest link, and forgets links that have
+        fallen out of the window before it.
+        """
+        fresh = [link for link in links if link["archive_url"] not in self.seen]
+
+        for link in reversed(fresh):
+            self.latest.appendleft(archive_row(link))
+            self.seen[link["archive_url"]] = link["created_at"]
+
+        if fresh:
+            newest = max(link["created_at"] for link in fresh)
+            self.since = max(self.since, newest) if self.since else newest
+
+        if self.since:
+            self.seen = {
+                url: created_at
+                for url, created_at in self.seen.items()
+                if created_at >= self.since - OVERLAP
+            }
+
+        return fresh
+
+    async def build(self, cur: psycopg.AsyncCursor) -> None:
+        """Load the latest links, nothing counts as new."""
+        self.latest.clear()
+        self.since = None
+        self.seen = {}
+        self.add(await self.fetch(cur))
+
+    async def update(self, cur: psycopg.AsyncCursor) -> None:
+        """Load only the links added since the last one seen."""
+        if self.since is None:
+            await self.build(cur)
+            return
+
+        fresh = self.add(await self.fetch(cur))
+        self.new.extend(archive_row(link) for link in reversed(fresh))
+
+    def take_new(self) -> list[dict]:
+        """Get the links added since the last call, oldest first."""
+        new, self.new = self.new, []
+        return new
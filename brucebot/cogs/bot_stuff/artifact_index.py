@@ -0,0 +1,164 @@
+import psycopg
+from cogs.bot_stuff import rows
+from cogs.bot_stuff.rows import Bootleg
+from cogs.bot_stuff.snapshot import Snapshot
+
+MEDIA_EMOTES = {
+    "DVD": "📀",
+    "Blu-Ray": "💿",
+    "CD": "💿",
+    "FLAC": "📁",
+    "Vinyl": "🎵",
+}
+
+
+def bootleg_row(boot: Bootleg) -> str:
+    """Format a bootleg as a menu row."""
+    emote = MEDIA_EMOTES.get(boot["media_type"], "")
+    title = boot["title"]
+
+    if boot["slid"] is not None:
+        title = f"[{boot['title']}](<https://www.springsteenlyrics.com/bootlegs.php?item={boot['slid']}>)"
+
+    return f"**{boot['label']}** - {title}\n{emote}  {boot['media_type']} - *{boot['category']}*\n"  # noqa: E501
+
+
+def archive_row(link: dict) -> dict:
+    """Format an archive.org link, leaving its number and event card out."""
+    added_date = link["created_at"].strftime("%Y-%m-%d %I:%M %p")
+
+    return {
+        "event_date": link["event_date"],
+        "event_id": link["event_id"],
+        "venue_id": link["venue_id"],
+        "row": f"[{link['archive_url']}](https://archive.org/details/{link['archive_url']})\n\tAdded: {added_date}",  # noqa: E501
+    }
+
+
+class ArtifactIndex(Snapshot):
+    """Bootlegs, covers and archive.org links for every date.
+
+    Each date (YYYY-MM-DD) maps to its preformatted bootleg and archive rows,
+    the event its bootlegs are from, and its covers, with the nugs thumbnail
+    already swapped in for dates with no cover of their own.
+    """
+
+    tables = (
+        "archive_links",
+        "bootlegs",
+        "covers",
+        "events",
+        "nugs_releases",
+    )
+
+    def __init__(self) -> None:
+        """Init empty index."""
+        super().__init__()
+        self.dates: dict[str, dict] = {}
+
+    def day(self, dates: dict, date: str) -> dict:
+        """Get the entry for a date, adding an empty one if needed."""
+        return dates.setdefault(
+            date,
+            {
+                "bootlegs": [],
+                "event_id": None,
+                "venue_id": None,
+                "covers": [],
+                "archive": [],
+            },
+        )
+
+    async def build(self, cur: psycopg.AsyncCursor) -> None:
+        """Load every bootleg, cover and archive link and rebuild the index."""
+        dates = {}
+
+        bootlegs = await rows.fetchall(
+            cur,
+            Bootleg,
+            """
+            SELECT
+                DISTINCT extensions.unaccent(b.title) AS title,
+                CAST(e.event_date AS TEXT) AS date,
+                e.event_id,
+                e.venue_id,
+                b.label,
+                b.slid,
+                CASE
+                    WHEN b.category = 'aud_comp' THEN 'Audio Compilation'
+                    WHEN b.category = 'vid_comp' THEN 'Video Compilation'
+                    WHEN b.category LIKE 'aud%' THEN 'Audio'
+                    WHEN b.category LIKE 'vid%' THEN 'Video'
+                END as category,
+                b.media_type
+            FROM "bootlegs" b
+            LEFT JOIN "events" e ON e.id = b.event_id
+            WHERE e.event_date IS NOT NULL
+            ORDER BY date, title ASC
+            """,
+        )
+
+        for row in bootlegs:
+            day = self.day(dates, row["date"])
+            day["bootlegs"].append(bootleg_row(row))
+
+            if day["event_id"] is None:
+                day["event_id"] = row["event_id"]
+                day["venue_id"] = row["venue_id"]
+
+        res = await cur.execute(
+            """
+            SELECT CAST(event_date AS TEXT) AS date, cover_url, 'lilbud' AS source
+            FROM "covers"
+            WHERE event_date IS NOT NULL
+            """,
+        )
+
+        for row in await res.fetchall():
+            self.day(dates, row["date"])["covers"].append(row)
+
+        res = await cur.execute(
+            """
+            SELECT
+                CAST(e.event_date AS TEXT) AS date,
+                n.thumbnail_url AS cover_url,
+                'Nugs' AS source
+            FROM nugs_releases n
+            LEFT JOIN events e ON e.event_id = n.event_id
+            WHERE e.event_date IS NOT NULL
+            """,
+        )
+
+        nugs = await res.fetchall()
+
+        # nugs covers only stand in for dates without any of our own
+        own_covers = {date for date, day in dates.items() if day["covers"]}
+
+        for row in nugs:
+            if row["date"] not in own_covers:
+                self.day(dates, row["date"])["covers"].append(row)
+
+        res = await cur.execute(
+            """
+            SELECT
+                CAST(e.event_date AS TEXT) AS date,
+                e.event_date,
+                e.event_id,
+                e.venue_id,
+                a.archive_url,
+                a.created_at
+            FROM archive_links a
+            LEFT JOIN events e on e.id = a.event_id
+            WHERE e.event_date IS NOT NULL
+            ORDER BY a.created_at ASC
+            """,
+        )
+
+        for link in await res.fetchall():
+            self.day(dates, link["date"])["archive"].append(archive_row(link))
+
+        self.dates = dates
+
+    def find(self, date: str) -> dict:
+        """Get everything for a date (YYYY-MM-DD), empty if there's nothing."""
+        return self.dates.get(date) or self.day({}, date)
@@ -0,0 +1,100 @@
+import hashlib
+import io
+from pathlib import Path
+
+import discord
+from cogs.bot_stuff.locations import normalize
+
+IMAGES_PATH = Path(Path(__file__).parents[3], "images")
+
+# images up to this size are kept in memory, bigger ones are read when sent
+MAX_INLINE_BYTES = 512 * 1024
+
+manifest: "Manifest | None" = None
+
+
+class Asset:
+    """A local image, with its size and hash."""
+
+    __slots__ = ("data", "filename", "path", "sha1", "size")
+
+    def __init__(self, path: Path) -> None:
+        """Read an image, keeping its bytes if it's small enough."""
+        data = path.read_bytes()
+
+        self.path = path
+        self.filename = path.name
+        self.size = len(data)
+        self.sha1 = hashlib.sha1(data).hexdigest()  # noqa: S324
+        self.data = data if self.size <= MAX_INLINE_BYTES else None
+
+    def file(self) -> discord.File:
+        """Create a new attachment for the image, files can only be sent once."""
+        data = self.data if self.data is not None else self.path.read_bytes()
+        return discord.File(io.BytesIO(data), filename=self.filename)
+
+
+def release_key(name: str) -> str:
+    """Normalize a release name the way the image files are named."""
+    return normalize(name).replace(" ", "")
+
+
+class Manifest:
+    """Every image in images/releases and images/tours, by name.
+
+    Releases are keyed by their name with everything but letters and digits
+    stripped (disco_borntorun.jpg is "Born To Run"), tours by brucebase tag.
+    """
+
+    def __init__(self, path: Path = IMAGES_PATH) -> None:
+        """Scan the image folders."""
+        self.releases: dict[str, Asset] = {}
+        self.tours: dict[str, Asset] = {}
+
+        for image in sorted(Path(path, "releases").glob("*.jpg")):
+            key = image.stem.removeprefix("disco_")
+            asset = Asset(image)
+
+            self.releases[key] = asset
+            # disco_bloodbrothers_dvd.jpg also stands in for "Blood Brothers"
+            self.releases.setdefault(key.split("_")[0], asset)
+
+        for image in sorted(Path(path, "tours").glob("*.jpg")):
+            self.tours[image.stem] = Asset(image)
+
+        self.default = self.releases["default"]
+
+    def release(self, name: str | None) -> Asset | None:
+        """Get the image for a release by name."""
+        return self.releases.get(release_key(name)) if name else None
+
+    def tour(self, tag: str | None) -> Asset | None:
+        """Get the image for a tour by brucebase tag."""
+        return self.tours.get(tag) if tag else None
+
+    @property
+    def size(self) -> int:
+        """Bytes of image data held in memory."""
+        assets = {*self.releases.values(), *self.tours.values()}
+        return sum(len(asset.data) for asset in assets if asset.data is not None)
+
+
+def get_manifest() -> Manifest:
+    """Get the image manifest, scanning the folders on first use."""
+    global manifest  # noqa: PLW0603
+
+    if manifest is None:
+        manifest = Manifest()
+
+    return manifest
+
+
+def set_thumbnail(embed: discord.Embed, asset: Asset | None = None) -> discord.File:
+    """Set an embed's thumbnail, returning the file to send with it.
+
+    Uses the local image, or the default one if there isn't one, so the
+    thumbnail is never a broken link.
+    """
+    asset = asset or get_manifest().default
+    embed.set_thumbnail(url=f"attachment://{asset.filename}")
+    return asset.file()
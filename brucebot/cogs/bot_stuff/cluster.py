@@ -0,0 +1,62 @@
+import os
+from typing import NamedTuple
+
+from dotenv import load_dotenv
+
+# total connections all processes may hold, matches the pool's default size
+DEFAULT_CONNECTION_BUDGET = 4
+
+
+class ClusterConfig(NamedTuple):
+    """How to split the bot's shards over worker processes."""
+
+    clusters: int
+    shard_count: int | None
+    pool_size: int
+
+    @property
+    def shard_ids(self) -> list[list[int]] | None:
+        """Shard ids run by each cluster, None to let discord.py decide."""
+        if self.shard_count is None:
+            return None
+
+        return [
+            list(range(cluster, self.shard_count, self.clusters))
+            for cluster in range(self.clusters)
+        ]
+
+
+def load_config() -> ClusterConfig:
+    """Get the cluster setup from the environment.
+
+    CLUSTERS is the number of worker processes (default 1), SHARD_COUNT the
+    total shards across them (default one per cluster, or Discord's
+    recommendation when running a single process). DB_MAX_CONNECTIONS is
+    the connection budget shared between every process.
+    """
+    load_dotenv()
+
+    clusters = max(1, int(os.getenv("CLUSTERS", "1")))
+    shard_count = os.getenv("SHARD_COUNT")
+    budget = int(os.getenv("DB_MAX_CONNECTIONS", str(DEFAULT_CONNECTION_BUDGET)))
+
+    # clusters are forked, so there's only ever one process without fork
+    if not hasattr(os, "fork"):
+        clusters = 1
+
+    if shard_count:
+        shard_count = int(shard_count)
+    elif clusters > 1:
+        shard_count = clusters
+    else:
+        shard_count = None
+
+    if shard_count is not None:
+        # no point running processes with no shards
+        clusters = min(clusters, shard_count)
+
+    return ClusterConfig(
+        clusters=clusters,
+        shard_count=shard_count,
+        pool_size=max(1, budget // clusters),
+    )
@@ -1,8 +1,13 @@
 import os
 import sys
+from collections.abc import AsyncIterator
+from contextlib import AsyncExitStack, asynccontextmanager
 
 import psycopg
+from cogs.bot_stuff import offline
+from discord.ext import commands
 from dotenv import load_dotenv
+from psycopg.rows import dict_row
 from psycopg_pool import AsyncConnectionPool
 
 
@@ -28,8 +33,11 @@ def load_db() -> psycopg.Connection:
     )
 
 
-async def create_pool() -> AsyncConnectionPool:
-    """Create a connection pool for the database."""
+async def create_pool(size: int = 4) -> AsyncConnectionPool | offline.OfflinePool:
+    """Create a connection pool for the database, holding `size` connections.
+
+    `offline` reads from a local export made with export_offline.py instead.
+    """
     load_dotenv()
 
     match sys.argv[2]:
@@ -37,23 +45,104 @@ async def create_pool() -> AsyncConnectionPool:
             return AsyncConnectionPool(
                 conninfo=os.getenv("LOCAL_DB_URL"),
                 kwargs={"prepare_threshold": None},
+                min_size=size,
                 open=False,
             )
         case "heroku":
             return AsyncConnectionPool(
                 conninfo=os.getenv("HEROKU_DATABASE_URL"),
                 kwargs={"prepare_threshold": None},
+                min_size=size,
                 open=False,
             )
         case "supabase":
             return AsyncConnectionPool(
                 conninfo=os.getenv("SUPABASE_DATABASE_URL"),
                 kwargs={"prepare_threshold": None},
+                min_size=size,
                 open=False,
             )
         case "digitalocean":
             return AsyncConnectionPool(
                 conninfo=os.getenv("DO_DATABASE_URL"),
                 kwargs={"prepare_threshold": None},
+                min_size=size,
                 open=False,
             )
+        case "offline":
+            return offline.OfflinePool(offline.get_path(), size)
+
+
+def create_replica_pools(size: int = 4) -> list[AsyncConnectionPool]:
+    """Create a pool for each read replica in REPLICA_DATABASE_URLS.
+
+    Comma separated, and none when running offline.
+    """
+    load_dotenv()
+
+    if sys.argv[2] == "offline":
+        return []
+
+    return [
+        AsyncConnectionPool(
+            conninfo=conninfo.strip(),
+            kwargs={"prepare_threshold": None},
+            min_size=size,
+            open=False,
+        )
+        for conninfo in os.getenv("REPLICA_DATABASE_URLS", "").split(",")
+        if conninfo.strip()
+    ]
+
+
+@asynccontextmanager
+async def cursor(
+    bot: commands.Bot,
+    queue: str = "lookup",
+    *,
+    primary: bool = False,
+) -> AsyncIterator[psycopg.AsyncCursor]:
+    """Get a cursor, once the scheduler lets `queue` run.
+
+    Reads go to a replica when one is healthy, `primary` skips them for
+    anything that can't be behind (like the change counters snapshots use).
+    """
+    async with (
+        bot.scheduler.slot(queue),
+        bot.replicas.connection(primary=primary) as conn,
+        conn.cursor(row_factory=dict_row) as cur,
+    ):
+        yield cur
+
+
+async def batch(
+    cur: psycopg.AsyncCursor,
+    *queries: tuple[str, dict],
+) -> list[list[dict]]:
+    """Run independent queries in one round trip, returns each one's rows.
+
+    Uses pipeline mode, so every query is sent before any result is waited
+    on. Cursors that can't pipeline (offline) run them one after another.
+    """
+    if not isinstance(cur, psycopg.AsyncCursor):
+        results = []
+
+        for query, params in queries:
+            res = await cur.execute(query, params)
+            results.append(await res.fetchall())
+
+        return results
+
+    conn = cur.connection
+
+    async with conn.pipeline(), AsyncExitStack() as stack:
+        cursors = [
+            await stack.enter_async_context(conn.cursor(row_factory=dict_row))
+            for _ in queries
+        ]
+
+        for batch_cur, (query, params) in zip(cursors, queries, strict=True):
+            await batch_cur.execute(query, params)
+
+        # the first fetch sends the sync, the rest are already here
+        return [await batch_cur.fetchall() for batch_cur in cursors]
@@ -0,0 +1,96 @@
+import psycopg
+from cogs.bot_stuff.snapshot import Snapshot
+
+# counter -> (table it's counted from, query), each a single table scan
+COUNTERS = {
+    "bands": (
+        "bands",
+        "SELECT count(*) AS total FROM bands WHERE first_event IS NOT NULL",
+    ),
+    "events": ("events", "SELECT count(DISTINCT event_id) AS total FROM events"),
+    "people": (
+        "relations",
+        "SELECT count(*) AS total FROM relations WHERE first_event IS NOT NULL",
+    ),
+    "setlists": (
+        "setlists",
+        "SELECT count(DISTINCT event_id) AS total FROM setlists",
+    ),
+    "songs": (
+        "setlists",
+        "SELECT count(DISTINCT song_id) AS total FROM setlists",
+    ),
+    "venues": ("events", "SELECT count(DISTINCT venue_id) AS total FROM events"),
+    "bootlegs": ("bootlegs", "SELECT count(*) AS total FROM bootlegs"),
+}
+
+LABELS = {
+    "bands": "Band Count",
+    "events": "Event Count",
+    "people": "People Count",
+    "setlists": "Setlist Count",
+    "songs": "Song Count",
+    "venues": "Venue Count",
+    "bootlegs": "Bootleg Count",
+}
+
+
+class DbCounters(Snapshot):
+    """Row counts shown by !binfo.
+
+    On refresh only the counters whose table has changed are recounted.
+    """
+
+    tables = tuple(sorted({table for table, _ in COUNTERS.values()}))
+
+    def __init__(self) -> None:
+        """Init with nothing counted."""
+        super().__init__()
+        self.counts: dict[str, int] = {}
+        self.table_changes: dict[str, int] = {}
+
+    async def get_table_changes(self, cur: psycopg.AsyncCursor) -> dict[str, int]:
+        """Get the number of changes made to each table."""
+        res = await cur.execute(
+            """
+            SELECT
+                relname,
+                n_tup_ins + n_tup_upd + n_tup_del AS changes
+            FROM pg_stat_user_tables
+            WHERE relname = ANY(%(tables)s)
+            """,
+            {"tables": list(self.tables)},
+        )
+
+        return {row["relname"]: row["changes"] for row in await res.fetchall()}
+
+    async def count(self, cur: psycopg.AsyncCursor, tables: set[str]) -> None:
+        """Recount every counter taken from one of `tables`."""
+        for name, (table, query) in COUNTERS.items():
+            if table in tables:
+                res = await cur.execute(query)
+                self.counts[name] = (await res.fetchone())["total"]
+
+    async def build(self, cur: psycopg.AsyncCursor) -> None:
+        """Count everything."""
+        self.table_changes = await self.get_table_changes(cur)
+        await self.count(cur, set(self.tables))
+
+    async def update(self, cur: psycopg.AsyncCursor) -> None:
+        """Recount only the counters whose tables changed."""
+        changes = await self.get_table_changes(cur)
+        changed = {
+            table
+            for table in self.tables
+            if changes.get(table) != self.table_changes.get(table)
+        }
+
+        await self.count(cur, changed)
+        self.table_changes = changes
+
+    def rows(self) -> list[str]:
+        """Format the counts as a list."""
+        return [
+            f"- **{LABELS[name]}** - _{total} {name}_"
+            for name, total in self.counts.items()
+        ]
@@ -0,0 +1,97 @@
+import asyncio
+import functools
+import logging
+import multiprocessing
+import os
+import time
+from collections.abc import Callable
+from concurrent.futures import Executor, ProcessPoolExecutor, ThreadPoolExecutor
+
+logger = logging.getLogger(__name__)
+
+# tasks slower than this (seconds, including waiting for a worker) get logged
+SLOW_TASK = 1.0
+
+# a round trip through the thread pool costs about 0.1ms, more than building
+# an embed or a page of menu rows does (tens of microseconds), so those stay
+# on the event loop. Offload work that takes milliseconds, like markdown.
+
+executors: dict[str, Executor] = {}
+
+
+class TaskTiming:
+    """Running totals for one offloaded function."""
+
+    __slots__ = ("count", "max", "total")
+
+    def __init__(self) -> None:
+        """Init empty timing."""
+        self.count = 0
+        self.total = 0.0
+        self.max = 0.0
+
+    def add(self, seconds: float) -> None:
+        """Record a run."""
+        self.count += 1
+        self.total += seconds
+        self.max = max(self.max, seconds)
+
+
+timings: dict[str, TaskTiming] = {}
+
+
+def get_executor(kind: str) -> Executor:
+    """Get the process or thread pool, starting it on first use.
+
+    Processes are spawned rather than forked, since forking a process with
+    a running event loop and connection pool isn't safe.
+    """
+    if kind not in executors:
+        if kind == "process":
+            executors[kind] = ProcessPoolExecutor(
+                max_workers=int(os.getenv("EXECUTOR_PROCESSES", "2")),
+                mp_context=multiprocessing.get_context("spawn"),
+            )
+        else:
+            executors[kind] = ThreadPoolExecutor(
+                max_workers=int(os.getenv("EXECUTOR_THREADS", "4")),
+                thread_name_prefix="brucebot",
+            )
+
+    return executors[kind]
+
+
+async def run[T](kind: str, func: Callable[..., T], *args: object) -> T:
+    """Run a blocking function off the event loop and time it."""
+    name = getattr(func, "__qualname__", repr(func))
+    start = time.perf_counter()
+
+    try:
+        return await asyncio.get_running_loop().run_in_executor(
+            get_executor(kind),
+            functools.partial(func, *args),
+        )
+    finally:
+        seconds = time.perf_counter() - start
+        timings.setdefault(f"{kind}:{name}", TaskTiming()).add(seconds)
+
+        if seconds > SLOW_TASK:
+            logger.warning("Slow %s task %s took %.2fs", kind, name, seconds)
+
+
+async def run_process[T](func: Callable[..., T], *args: object) -> T:
+    """Run CPU heavy work in the process pool, `func` must be picklable."""
+    return await run("process", func, *args)
+
+
+async def run_thread[T](func: Callable[..., T], *args: object) -> T:
+    """Run light blocking work in the thread pool."""
+    return await run("thread", func, *args)
+
+
+def shutdown() -> None:
+    """Stop the pools, dropping queued tasks."""
+    for executor in executors.values():
+        executor.shutdown(wait=False, cancel_futures=True)
+
+    executors.clear()
@@ -0,0 +1,290 @@
+import difflib
+import re
+import unicodedata
+
+import psycopg
+from cogs.bot_stuff import executor, rows
+from cogs.bot_stuff.rows import Venue
+from cogs.bot_stuff.snapshot import Snapshot
+
+# countries that get shown as "City, ST" rather than "City, Country"
+ABBREV_COUNTRIES = (2, 6, 37)
+
+LEVELS = ("city", "state", "country")
+
+# nicknames remembered per level, the oldest are forgotten past this
+MAX_NICKNAMES = 500
+
+FTS_QUERIES = {
+    "city": """
+        SELECT id FROM cities
+        WHERE fts_name_vector @@ websearch_to_tsquery('english', %(query)s)
+        ORDER BY
+            extensions.SIMILARITY(%(query)s, name) DESC,
+            ts_rank(fts_name_vector, websearch_to_tsquery('english', %(query)s)) DESC
+        LIMIT 1
+        """,
+    "state": """
+        SELECT id FROM states
+        WHERE fts_name_vector @@ websearch_to_tsquery('english', %(query)s)
+        ORDER BY
+            extensions.SIMILARITY(%(query)s, name) DESC,
+            ts_rank(fts_name_vector, websearch_to_tsquery('english', %(query)s)) DESC
+        LIMIT 1
+        """,
+    "country": """
+        SELECT id FROM countries
+        WHERE fts_name_vector @@ websearch_to_tsquery('english', %(query)s)
+        ORDER BY
+            extensions.SIMILARITY(%(query)s, name) DESC,
+            ts_rank(fts_name_vector, websearch_to_tsquery('english', %(query)s)) DESC
+        LIMIT 1
+        """,
+}
+
+
+def normalize(text: str) -> str:
+    """Lowercase, strip accents and punctuation for name matching."""
+    text = unicodedata.normalize("NFKD", text)
+    text = "".join(char for char in text if not unicodedata.combining(char))
+    return re.sub(r"[^a-z0-9]+", " ", text.lower()).strip()
+
+
+class Locations(Snapshot):
+    """City -> state -> country hierarchy with event counts at each level.
+
+    Every node is a dict with its display name, num_events and first/last
+    event, plus links to its parent and child nodes. Venues hang off their
+    city so per-location venue stats are just a walk down the tree.
+    """
+
+    tables = ("cities", "countries", "events", "states", "venues")
+
+    def __init__(self) -> None:
+        """Init empty hierarchy."""
+        super().__init__()
+        self.nodes: dict[str, dict[int, dict]] = {level: {} for level in LEVELS}
+        self.names: dict[str, dict[str, list[dict]]] = {level: {} for level in LEVELS}
+        # queries resolved by full text search (nicknames etc.) are remembered
+        self.nicknames: dict[str, dict[str, int]] = {level: {} for level in LEVELS}
+
+    async def build(self, cur: psycopg.AsyncCursor) -> None:
+        """Load cities, states, countries and venues and rebuild the tree."""
+        nodes = {level: {} for level in LEVELS}
+
+        await self.load_countries(cur, nodes)
+        await self.load_states(cur, nodes)
+        await self.load_cities(cur, nodes)
+        await self.load_venues(cur, nodes)
+
+        self.nodes = nodes
+        self.names = self.index_names(nodes)
+        self.nicknames = {level: {} for level in LEVELS}
+
+    async def load_countries(self, cur: psycopg.AsyncCursor, nodes: dict) -> None:
+        """Add every country to `nodes`."""
+        res = await cur.execute(
+            """
+            SELECT
+                c.id,
+                c.name,
+                c.num_events,
+                coalesce(CAST(e.event_date AS TEXT), e.event_id) AS first_event_date,
+                e.event_id AS first_event,
+                coalesce(CAST(e1.event_date AS TEXT), e1.event_id) AS last_event_date,
+                e1.event_id AS last_event
+            FROM countries c
+            LEFT JOIN events e ON e.id = c.first_event
+            LEFT JOIN events e1 ON e1.id = c.last_event
+            """,
+        )
+
+        for row in await res.fetchall():
+            nodes["country"][row["id"]] = {
+                **row,
+                "level": "country",
+                "short_name": row["name"],
+                "states": [],
+                "cities": [],
+            }
+
+    async def load_states(self, cur: psycopg.AsyncCursor, nodes: dict) -> None:
+        """Add every state to `nodes`, under its country."""
+        res = await cur.execute(
+            """
+            SELECT
+                s.id,
+                s.name,
+                s.state_abbrev,
+                s.country,
+                s.num_events,
+                coalesce(CAST(e.event_date AS TEXT), e.event_id) AS first_event_date,
+                e.event_id AS first_event,
+                coalesce(CAST(e1.event_date AS TEXT), e1.event_id) AS last_event_date,
+                e1.event_id AS last_event
+            FROM states s
+            LEFT JOIN events e ON e.id = s.first_event
+            LEFT JOIN events e1 ON e1.id = s.last_event
+            """,
+        )
+
+        for row in await res.fetchall():
+            country = nodes["country"].get(row["country"])
+            state = {
+                **row,
+                "level": "state",
+                "short_name": row["name"],
+                "country": country,
+                "cities": [],
+            }
+
+            if country:
+                country["states"].append(state)
+
+                if country["id"] in ABBREV_COUNTRIES:
+                    state["name"] = f"{row['name']}, {country['name']}"
+
+            nodes["state"][row["id"]] = state
+
+    async def load_cities(self, cur: psycopg.AsyncCursor, nodes: dict) -> None:
+        """Add every city to `nodes`, under its state and country."""
+        res = await cur.execute(
+            """
+            SELECT
+                c.id,
+                c.name,
+                c.state,
+                c.country,
+                c.num_events,
+                coalesce(CAST(e.event_date AS TEXT), e.event_id) AS first_event_date,
+                e.event_id AS first_event,
+                coalesce(CAST(e1.event_date AS TEXT), e1.event_id) AS last_event_date,
+                e1.event_id AS last_event
+            FROM cities c
+            LEFT JOIN events e ON e.id = c.first_event
+            LEFT JOIN events e1 ON e1.id = c.last_event
+            """,
+        )
+
+        for row in await res.fetchall():
+            state = nodes["state"].get(row["state"])
+            country = nodes["country"].get(row["country"]) or (
+                state and state["country"]
+            )
+
+            city = {
+                **row,
+                "level": "city",
+                "short_name": row["name"],
+                "state": state,
+                "country": country,
+                "venues": [],
+            }
+
+            if state and country and country["id"] in ABBREV_COUNTRIES:
+                city["name"] = f"{row['name']}, {state['state_abbrev']}"
+            elif country:
+                city["name"] = f"{row['name']}, {country['name']}"
+
+            for parent in (state, country):
+                if parent:
+                    parent["cities"].append(city)
+
+            nodes["city"][row["id"]] = city
+
+    async def load_venues(self, cur: psycopg.AsyncCursor, nodes: dict) -> None:
+        """Hang every venue off its city."""
+        venues = await rows.fetchall(
+            cur,
+            Venue,
+            """
+            SELECT
+                v.id,
+                v.uuid,
+                v.name,
+                v.city,
+                vt.event_count
+            FROM venues v
+            LEFT JOIN venues_text vt ON vt.id = v.id
+            """,
+        )
+
+        for venue in venues:
+            if city := nodes["city"].get(venue["city"]):
+                city["venues"].append(venue)
+
+    def index_names(self, nodes: dict) -> dict[str, dict[str, list[dict]]]:
+        """Map the normalized names and abbreviations of each level to nodes."""
+        names = {level: {} for level in LEVELS}
+
+        for level, level_nodes in nodes.items():
+            for node in level_nodes.values():
+                keys = {node["short_name"], node["name"]}
+
+                if level == "state" and node["state_abbrev"]:
+                    keys.add(node["state_abbrev"])
+
+                for key in filter(None, map(normalize, filter(None, keys))):
+                    names[level].setdefault(key, []).append(node)
+
+        return names
+
+    async def match(self, level: str, query: str) -> dict | None:
+        """Find a location by name, abbreviation or a previously seen nickname.
+
+        Near misses are matched too, in the thread pool since it compares
+        against every name.
+        """
+        key = normalize(query)
+        names = self.names[level]
+        matches = names.get(key)
+
+        if not matches and key in self.nicknames[level]:
+            return self.nodes[level].get(self.nicknames[level][key])
+
+        if not matches:
+            close = await executor.run_thread(
+                difflib.get_close_matches,
+                key,
+                list(names),
+                1,
+                0.85,
+            )
+            matches = names[close[0]] if close else None
+
+        if matches:
+            return max(matches, key=lambda node: node["num_events"] or 0)
+
+        return None
+
+    async def search(
+        self,
+        level: str,
+        query: str,
+        cur: psycopg.AsyncCursor,
+    ) -> dict | None:
+        """Find a location by full text search, for nicknames `match` misses."""
+        res = await cur.execute(FTS_QUERIES[level], {"query": query})
+        row = await res.fetchone()
+
+        if row is None:
+            return None
+
+        nicknames = self.nicknames[level]
+
+        if len(nicknames) >= MAX_NICKNAMES:
+            del nicknames[next(iter(nicknames))]
+
+        nicknames[normalize(query)] = row["id"]
+        return self.nodes[level].get(row["id"])
+
+    def top_venues(self, node: dict, limit: int = 3) -> list[Venue]:
+        """Get the venues with the most events in and below a location."""
+        cities = [node] if node["level"] == "city" else node["cities"]
+        venues = [venue for city in cities for venue in city["venues"]]
+
+        return sorted(
+            venues,
+            key=lambda venue: venue["event_count"] or 0,
+            reverse=True,
+        )[:limit]
@@ -0,0 +1,160 @@
+import atexit
+import contextvars
+import logging
+import logging.handlers
+import os
+import queue
+import sys
+import time
+
+from discord.ext import commands
+
+# the command being run by the current task, set by BruceBot.invoke
+command_context: contextvars.ContextVar[dict | None] = contextvars.ContextVar(
+    "command_context",
+    default=None,
+)
+
+# repeats of the same warning/error past this many per window are dropped
+SAMPLE_LIMIT = 5
+SAMPLE_WINDOW = 60
+
+listener: logging.handlers.QueueListener | None = None
+listener_pid: int | None = None
+
+
+class ContextFilter(logging.Filter):
+    """Add the current command's details to every record."""
+
+    def filter(self, record: logging.LogRecord) -> bool:
+        """Attach context, always lets the record through."""
+        record.context = command_context.get() or {}
+        return True
+
+
+class SampleFilter(logging.Filter):
+    """Drop repeats of the same warning or error during storms.
+
+    Records are grouped by logger, message and exception type. After
+    SAMPLE_LIMIT of a group in a window, the rest are counted rather than
+    logged, and the count goes out with the first one in the next window.
+    """
+
+    def __init__(self) -> None:
+        """Init with no groups seen."""
+        super().__init__()
+        self.seen: dict[tuple, list] = {}
+
+    def filter(self, record: logging.LogRecord) -> bool:
+        """Let the record through unless its group is over the limit."""
+        if record.levelno < logging.WARNING:
+            return True
+
+        exc_type = record.exc_info[0].__name__ if record.exc_info else None
+        key = (record.name, record.msg, exc_type)
+        now = time.monotonic()
+
+        # [window start, logged in window, dropped in window]
+        window = self.seen.setdefault(key, [now, 0, 0])
+
+        if now - window[0] > SAMPLE_WINDOW:
+            if window[2]:
+                record.suppressed = window[2]
+
+            window[:] = [now, 0, 0]
+
+        if window[1] >= SAMPLE_LIMIT:
+            window[2] += 1
+            return False
+
+        window[1] += 1
+        return True
+
+
+class LogfmtFormatter(logging.Formatter):
+    """Format records as `key=value` pairs, tracebacks on the lines after."""
+
+    def format(self, record: logging.LogRecord) -> str:
+        """Format a record as a single logfmt line."""
+        fields = {
+            "time": self.formatTime(record, "%Y-%m-%dT%H:%M:%S"),
+            "level": record.levelname,
+            "logger": record.name,
+            "process": record.processName,
+            **getattr(record, "context", {}),
+            "msg": record.getMessage(),
+        }
+
+        if suppressed := getattr(record, "suppressed", None):
+            fields["suppressed"] = suppressed
+
+        line = " ".join(f"{key}={quote(value)}" for key, value in fields.items())
+
+        if record.exc_info:
+            line += "\n" + self.formatException(record.exc_info)
+
+        return line
+
+
+def quote(value: object) -> str:
+    """Quote a logfmt value if it needs it."""
+    text = str(value)
+
+    if not text or any(char in text for char in ' ="\n'):
+        return '"' + text.replace('"', '\\"').replace("\n", "\\n") + '"'
+
+    return text
+
+
+def setup(level: str | None = None) -> None:
+    """Send all logging through a queue, written out by a background thread.
+
+    Formatting (and reading the command context) happens in the thread that
+    logs, only the write to stdout is moved off the event loop. Needs calling
+    again in forked processes, since the writer thread isn't forked with them.
+    """
+    global listener, listener_pid  # noqa: PLW0603
+
+    # a forked process has the parent's listener, but not its thread
+    if listener_pid == os.getpid():
+        stop()
+
+    log_queue = queue.SimpleQueue()
+
+    queue_handler = logging.handlers.QueueHandler(log_queue)
+    queue_handler.addFilter(ContextFilter())
+    queue_handler.addFilter(SampleFilter())
+    queue_handler.setFormatter(LogfmtFormatter())
+
+    stream_handler = logging.StreamHandler(sys.stdout)
+    stream_handler.setFormatter(logging.Formatter("%(message)s"))
+
+    root = logging.getLogger()
+    root.handlers = [queue_handler]
+    root.setLevel(level or os.getenv("LOG_LEVEL", "INFO"))
+
+    listener = logging.handlers.QueueListener(log_queue, stream_handler)
+    listener_pid = os.getpid()
+    listener.start()
+
+
+@atexit.register
+def stop() -> None:
+    """Flush and stop the writer thread, if it's running."""
+    global listener  # noqa: PLW0603
+
+    if listener and listener_pid == os.getpid():
+        listener.stop()
+        listener = None
+
+
+def set_command(ctx: commands.Context) -> None:
+    """Set the command context for the current task."""
+    command_context.set(
+        {
+            "command": ctx.command.qualified_name if ctx.command else None,
+            "user": ctx.author.id,
+            "channel": ctx.channel.id,
+            "guild": ctx.guild.id if ctx.guild else None,
+        },
+    )
@@ -0,0 +1,357 @@
+import asyncio
+import datetime
+import decimal
+import json
+import logging
+import os
+import re
+import sqlite3
+import unicodedata
+import uuid
+from collections.abc import AsyncIterator
+from contextlib import asynccontextmanager
+from pathlib import Path
+from typing import Self
+
+import psycopg
+from cogs.bot_stuff import executor
+from discord.ext import commands
+
+logger = logging.getLogger(__name__)
+
+OFFLINE_PATH = Path(Path(__file__).parents[3], "databruce.sqlite3")
+
+# everything the cogs and snapshots read, views are exported as plain tables
+TABLES = (
+    "archive_links",
+    "bands",
+    "bootlegs",
+    "cities",
+    "countries",
+    "covers",
+    "events",
+    "nugs_releases",
+    "relations",
+    "release_tracks",
+    "releases",
+    "runs",
+    "setlists",
+    "setlists_by_set_and_date",
+    "snippets",
+    "songs",
+    "states",
+    "tour_legs",
+    "tours",
+    "valid_events",
+    "venues",
+    "venues_text",
+)
+
+# postgres type -> sqlite column type, anything else is stored as text
+COLUMN_TYPES = {
+    "bool": "INTEGER",
+    "date": "DATE",
+    "float4": "REAL",
+    "float8": "REAL",
+    "int2": "INTEGER",
+    "int4": "INTEGER",
+    "int8": "INTEGER",
+    "numeric": "REAL",
+    "timestamp": "TIMESTAMP",
+    "timestamptz": "TIMESTAMP",
+}
+
+# only needed for postgres full text search, which doesn't work offline anyway
+SKIPPED_TYPES = ("tsvector",)
+
+INDEX_DEF = re.compile(
+    r"CREATE (UNIQUE )?INDEX (\w+) ON \S+ USING btree \(([\w, ]+)\)$",
+)
+
+# postgres only syntax the cogs use -> the sqlite equivalent
+DIALECT = (
+    (re.compile(r"([\w.]+)::text"), r"CAST(\1 AS TEXT)"),
+    (re.compile(r"\bNOW\(\)", re.IGNORECASE), "CURRENT_DATE"),
+    (re.compile(r"\bstring_agg\(", re.IGNORECASE), "group_concat("),
+    (
+        re.compile(r"\bEXTRACT\(year FROM ([\w.]+)\)", re.IGNORECASE),
+        r"CAST(strftime('%Y', \1) AS INTEGER)",
+    ),
+    (re.compile(r"\bto_char\(([^,]+), 'YYYY'\)"), r"strftime('%Y', \1)"),
+)
+
+# full text search has no sqlite equivalent, queries using it are refused
+FULL_TEXT_SEARCH = re.compile(r"websearch_to_tsquery|@@")
+
+
+class OfflineUnsupportedError(commands.CommandError):
+    """Raised for queries that only work against postgres."""
+
+    def __init__(self) -> None:
+        """Init error."""
+        super().__init__("Not available while running offline")
+
+
+sqlite3.register_adapter(datetime.date, datetime.date.isoformat)
+sqlite3.register_adapter(datetime.datetime, datetime.datetime.isoformat)
+sqlite3.register_adapter(decimal.Decimal, float)
+sqlite3.register_adapter(uuid.UUID, str)
+sqlite3.register_adapter(dict, json.dumps)
+sqlite3.register_adapter(list, json.dumps)
+sqlite3.register_converter(
+    "date",
+    lambda value: datetime.date.fromisoformat(value.decode()),
+)
+sqlite3.register_converter(
+    "timestamp",
+    lambda value: datetime.datetime.fromisoformat(value.decode()),
+)
+
+
+def get_path() -> Path:
+    """Path of the offline database, OFFLINE_DB if set."""
+    return Path(os.getenv("OFFLINE_DB", str(OFFLINE_PATH)))
+
+
+def export(conn: psycopg.Connection, path: Path) -> None:
+    """Copy every table in TABLES, their indexes and change counters to `path`.
+
+    Written to a temporary file first, so a running bot never sees half an
+    export. The change counters from pg_stat_user_tables come along so
+    snapshots built offline line up with the ones built from postgres.
+    """
+    tmp = path.with_suffix(".tmp")
+    tmp.unlink(missing_ok=True)
+
+    lite = sqlite3.connect(tmp)
+
+    with lite, conn.cursor() as cur:
+        for table in TABLES:
+            cur.execute(f'SELECT * FROM "{table}"')  # noqa: S608
+
+            columns = [
+                (column.name, conn.adapters.types.get(column.type_code))
+                for column in cur.description
+            ]
+            keep = [
+                index
+                for index, (_, info) in enumerate(columns)
+                if not info or info.name not in SKIPPED_TYPES
+            ]
+
+            definition = ", ".join(
+                f'"{columns[index][0]}" '
+                + COLUMN_TYPES.get(columns[index][1] and columns[index][1].name, "TEXT")
+                for index in keep
+            )
+            lite.execute(f'CREATE TABLE "{table}" ({definition})')
+
+            lite.executemany(
+                f'INSERT INTO "{table}" VALUES ({", ".join("?" * len(keep))})',  # noqa: S608
+                ([row[index] for index in keep] for row in cur),
+            )
+
+            logger.info("Exported %s", table)
+
+        cur.execute(
+            "SELECT indexdef FROM pg_indexes WHERE tablename = ANY(%(tables)s)",
+            {"tables": list(TABLES)},
+        )
+
+        # expression and non-btree indexes have no sqlite equivalent
+        for (indexdef,) in cur.fetchall():
+            if match := INDEX_DEF.search(indexdef):
+                unique, name, index_columns = match.groups()
+                table = indexdef.split(" ON ")[1].split()[0].split(".")[-1]
+
+                unique = unique or ""
+                lite.execute(
+                    f'CREATE {unique}INDEX "{name}" ON "{table}" ({index_columns})',
+                )
+
+        cur.execute(
+            """
+            SELECT relname, n_tup_ins, n_tup_upd, n_tup_del
+            FROM pg_stat_user_tables
+            WHERE relname = ANY(%(tables)s)
+            """,
+            {"tables": list(TABLES)},
+        )
+
+        lite.execute(
+            """
+            CREATE TABLE pg_stat_user_tables (
+                relname TEXT, n_tup_ins INTEGER, n_tup_upd INTEGER, n_tup_del INTEGER
+            )
+            """,
+        )
+        lite.executemany("INSERT INTO pg_stat_user_tables VALUES (?, ?, ?, ?)", cur)
+
+    lite.close()
+    tmp.replace(path)
+
+
+def unaccent(text: str | None) -> str | None:
+    """Strip accents, like the postgres extension of the same name."""
+    if text is None:
+        return None
+
+    text = unicodedata.normalize("NFKD", text)
+    return "".join(char for char in text if not unicodedata.combining(char))
+
+
+def concat_ws(separator: str, *values: object) -> str:
+    """Join the values that aren't null, like postgres' concat_ws."""
+    return separator.join(str(value) for value in values if value is not None)
+
+
+def trigrams(text: str) -> set[str]:
+    """Split text into trigrams the way pg_trgm does."""
+    grams = set()
+
+    for word in re.findall(r"\w+", text.lower()):
+        padded = f"  {word} "
+        grams.update(padded[index : index + 3] for index in range(len(padded) - 2))
+
+    return grams
+
+
+def similarity(first: str | None, second: str | None) -> float:
+    """Share of trigrams two strings have in common, like pg_trgm's similarity."""
+    if first is None or second is None:
+        return 0
+
+    first, second = trigrams(first), trigrams(second)
+
+    if not first or not second:
+        return 0
+
+    return len(first & second) / len(first | second)
+
+
+def translate(query: str, params: dict | None) -> tuple[str, dict]:
+    """Turn a psycopg query into sqlite's dialect.
+
+    Named placeholders become `:name` (and `%%` a plain `%`), `= ANY(list)`
+    is expanded into an `IN (...)`, the `extensions.` schema is dropped from
+    functions and the syntax in DIALECT is rewritten. Raises
+    OfflineUnsupportedError for full text search.
+    """
+    if FULL_TEXT_SEARCH.search(query):
+        raise OfflineUnsupportedError
+
+    params = dict(params or {})
+
+    def expand(match: re.Match) -> str:
+        name = match.group(1)
+        values = params.pop(name)
+        names = [f"{name}_{index}" for index in range(len(values))]
+
+        params.update(zip(names, values, strict=True))
+        return f"IN ({', '.join(f':{name}' for name in names)})"
+
+    query = re.sub(r"= ANY\(%\((\w+)\)s\)", expand, query)
+    query = re.sub(r"%\((\w+)\)s", r":\1", query)
+    query = query.replace("%%", "%")
+
+    for pattern, replacement in DIALECT:
+        query = pattern.sub(replacement, query)
+
+    return query.replace("extensions.", ""), params
+
+
+class OfflineCursor:
+    """The parts of psycopg's AsyncCursor the cogs use, over sqlite.
+
+    Queries run in the thread pool, rows come back as dicts like dict_row.
+    """
+
+    def __init__(self, conn: sqlite3.Connection) -> None:
+        """Init cursor on a connection."""
+        self.cur = conn.cursor()
+
+    async def execute(self, query: str, params: dict | None = None) -> "OfflineCursor":
+        """Run a query, returns the cursor to fetch from."""
+        query, params = translate(query, params)
+        await executor.run_thread(self.cur.execute, query, params)
+        return self
+
+    async def fetchone(self) -> dict | None:
+        """Get the next row."""
+        return await executor.run_thread(self.cur.fetchone)
+
+    async def fetchall(self) -> list[dict]:
+        """Get the remaining rows."""
+        return await executor.run_thread(self.cur.fetchall)
+
+
+class OfflineConnection:
+    """A pooled sqlite connection, read only."""
+
+    def __init__(self, path: Path) -> None:
+        """Open the database at `path`."""
+        self.conn = sqlite3.connect(
+            f"{path.resolve().as_uri()}?mode=ro",
+            uri=True,
+            detect_types=sqlite3.PARSE_DECLTYPES,
+            check_same_thread=False,
+        )
+        self.conn.row_factory = lambda cur, row: {
+            column[0]: value for column, value in zip(cur.description, row, strict=True)
+        }
+        self.conn.create_function("unaccent", 1, unaccent, deterministic=True)
+        self.conn.create_function("concat_ws", -1, concat_ws, deterministic=True)
+        self.conn.create_function("similarity", 2, similarity, deterministic=True)
+
+    @asynccontextmanager
+    async def cursor(self, **kwargs: object) -> AsyncIterator[OfflineCursor]:  # noqa: ARG002
+        """Get a cursor, rows are always dicts."""
+        yield OfflineCursor(self.conn)
+
+
+class OfflinePool:
+    """Stands in for AsyncConnectionPool when running from an export.
+
+    Snapshots, lookups by id or date and song searches work offline. The
+    other searches use postgres full text search, and are refused with
+    OfflineUnsupportedError.
+    """
+
+    def __init__(self, path: Path, size: int = 4) -> None:
+        """Init pool of `size` connections to the export at `path`."""
+        self.path = path
+        self.max_size = size
+        self.idle: asyncio.Queue[OfflineConnection] = asyncio.Queue()
+
+    async def open(self) -> None:
+        """Open the connections."""
+        if not self.path.exists():
+            msg = f"No offline database at {self.path}, run export_offline.py first"
+            raise FileNotFoundError(msg)
+
+        for _ in range(self.max_size):
+            self.idle.put_nowait(OfflineConnection(self.path))
+
+    async def close(self) -> None:
+        """Close the connections."""
+        while not self.idle.empty():
+            self.idle.get_nowait().conn.close()
+
+    async def __aenter__(self) -> Self:
+        """Open the pool for use in a with block."""
+        await self.open()
+        return self
+
+    async def __aexit__(self, *args: object) -> None:
+        """Close the pool at the end of a with block."""
+        await self.close()
+
+    @asynccontextmanager
+    async def connection(self) -> AsyncIterator[OfflineConnection]:
+        """Borrow a connection, waiting for one to be free."""
+        conn = await self.idle.get()
+
+        try:
+            yield conn
+        finally:
+            self.idle.put_nowait(conn)
@@ -0,0 +1,151 @@
+import os
+import time
+from collections import Counter
+
+from discord.ext import commands
+
+# scope -> (bucket size, tokens refilled per second)
+# can be overridden with RATE_LIMIT_<SCOPE>="size/seconds to refill"
+DEFAULT_LIMITS = {
+    "user": (8, 8 / 60),
+    "channel": (20, 20 / 60),
+    "guild": (40, 40 / 60),
+}
+
+# prune full buckets once there are this many
+MAX_BUCKETS = 5000
+
+
+def load_limits() -> dict[str, tuple[float, float]]:
+    """Get the limits for each scope, using any set in the environment."""
+    limits = dict(DEFAULT_LIMITS)
+
+    for scope in limits:
+        if value := os.getenv(f"RATE_LIMIT_{scope.upper()}"):
+            size, seconds = value.split("/")
+            limits[scope] = (float(size), float(size) / float(seconds))
+
+    return limits
+
+
+def subcommand_pending(ctx: commands.Context) -> bool:
+    """Check if a group is being prepared ahead of one of its subcommands.
+
+    Prefix groups run their before hooks before `invoked_subcommand` is set,
+    so the next word is peeked at to see whether a subcommand follows.
+    """
+    if not isinstance(ctx.command, commands.Group) or ctx.invoked_subcommand:
+        return False
+
+    view = ctx.view
+    index, previous = view.index, view.previous
+
+    view.skip_ws()
+    trigger = view.get_word()
+
+    view.index, view.previous = index, previous
+    return bool(trigger) and trigger in ctx.command.all_commands
+
+
+class RateLimitedError(commands.CheckFailure):
+    """Raised when a command is used while over the rate limit."""
+
+    def __init__(self, scope: str, retry_after: float, *, notify: bool) -> None:
+        """Init error with how long until the command can be used again."""
+        super().__init__(f"Rate limited by {scope}, retry in {retry_after:.0f}s")
+        self.scope = scope
+        self.retry_after = retry_after
+        self.notify = notify
+
+
+class TokenBucket:
+    """Bucket holding up to `size` tokens, refilling at `rate` per second."""
+
+    __slots__ = ("rate", "size", "tokens", "updated")
+
+    def __init__(self, size: float, rate: float) -> None:
+        """Init a full bucket."""
+        self.size = size
+        self.rate = rate
+        self.tokens = size
+        self.updated = time.monotonic()
+
+    def refill(self) -> None:
+        """Add the tokens earned since the last update."""
+        now = time.monotonic()
+        self.tokens = min(self.size, self.tokens + (now - self.updated) * self.rate)
+        self.updated = now
+
+    def retry_after(self, cost: float) -> float:
+        """Get seconds until `cost` tokens are available, 0 if they are now."""
+        self.refill()
+        cost = min(cost, self.size)
+
+        if self.tokens >= cost:
+            return 0
+
+        return (cost - self.tokens) / self.rate
+
+
+class RateLimiter:
+    """Token bucket rate limiting per user, channel and guild.
+
+    A command costs `extras["cost"]` tokens (1 if not set), and is only
+    allowed if every bucket it touches can pay. Users get told once per
+    cooldown that they are being limited, after that it's silent.
+    """
+
+    def __init__(self) -> None:
+        """Init limiter with the configured limits."""
+        self.limits = load_limits()
+        self.buckets: dict[tuple[str, int], TokenBucket] = {}
+        self.notified: dict[tuple[str, int], float] = {}
+        self.counters: Counter[str] = Counter()
+
+    def bucket(self, scope: str, key: int) -> TokenBucket:
+        """Get the bucket for a user/channel/guild, creating it if needed."""
+        if (scope, key) not in self.buckets:
+            if len(self.buckets) >= MAX_BUCKETS:
+                self.prune()
+
+            self.buckets[(scope, key)] = TokenBucket(*self.limits[scope])
+
+        return self.buckets[(scope, key)]
+
+    def prune(self) -> None:
+        """Drop buckets that have refilled, they're the same as new ones."""
+        for key, bucket in list(self.buckets.items()):
+            bucket.refill()
+
+            if bucket.tokens >= bucket.size:
+                del self.buckets[key]
+                self.notified.pop(key, None)
+
+    def check(self, ctx: commands.Context) -> None:
+        """Take tokens for a command, raise RateLimitedError if over a limit."""
+        command = ctx.invoked_subcommand or ctx.command
+        cost = command.extras.get("cost", 1) if command else 1
+
+        keys = [("user", ctx.author.id), ("channel", ctx.channel.id)]
+
+        if ctx.guild:
+            keys.append(("guild", ctx.guild.id))
+
+        buckets = [(key, self.bucket(*key)) for key in keys]
+
+        for key, bucket in buckets:
+            if retry_after := bucket.retry_after(cost):
+                now = time.monotonic()
+                notify = self.notified.get(key, 0) < now
+                self.notified[key] = now + retry_after
+
+                self.counters[f"limited_{key[0]}"] += 1
+                self.counters["notified" if notify else "silenced"] += 1
+
+                raise RateLimitedError(key[0], retry_after, notify=notify)
+
+        for _, bucket in buckets:
+            bucket.tokens -= min(cost, bucket.size)
+
+        self.counters["allowed"] += 1
+        self.counters["tokens"] += cost
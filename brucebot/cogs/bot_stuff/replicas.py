@@ -0,0 +1,144 @@
+import itertools
+import logging
+import os
+import time
+from collections.abc import AsyncIterator
+from contextlib import asynccontextmanager
+
+import psycopg
+from psycopg_pool import AsyncConnectionPool, PoolTimeout
+
+logger = logging.getLogger(__name__)
+
+# replicas further behind the primary than this (seconds) aren't used,
+# unless REPLICA_MAX_LAG says otherwise
+MAX_LAG = 30
+
+# how long to wait for a replica connection before using the primary
+CONNECT_TIMEOUT = 2
+
+# replay lag of a standby. A standby that has replayed everything it was
+# sent is caught up, however long ago the last write on the primary was.
+LAG_QUERY = """
+    SELECT
+        CASE
+            WHEN NOT pg_is_in_recovery() THEN 0
+            WHEN pg_last_wal_receive_lsn() = pg_last_wal_replay_lsn() THEN 0
+            ELSE extract(epoch FROM now() - pg_last_xact_replay_timestamp())
+        END AS lag
+"""
+
+
+class Replica:
+    """A read replica's pool and how far behind it was when last checked."""
+
+    def __init__(self, name: str, pool: AsyncConnectionPool) -> None:
+        """Init replica, unhealthy until its first check."""
+        self.name = name
+        self.pool = pool
+        self.lag: float | None = None
+        self.healthy = False
+        self.checked_at: float | None = None
+
+    async def check(self, max_lag: float) -> None:
+        """Measure replication lag, skipping the replica if it's too far behind."""
+        try:
+            async with self.pool.connection(timeout=CONNECT_TIMEOUT) as conn:
+                res = await conn.execute(LAG_QUERY)
+                (lag,) = await res.fetchone()
+        except (psycopg.Error, PoolTimeout):
+            logger.warning("Replica %s is down", self.name, exc_info=True)
+            self.lag = None
+        else:
+            self.lag = float(lag) if lag is not None else None
+
+        healthy = self.lag is not None and self.lag <= max_lag
+
+        if healthy != self.healthy:
+            logger.info(
+                "Replica %s is now %s (lag %s)",
+                self.name,
+                "in use" if healthy else "skipped",
+                self.lag,
+            )
+
+        self.healthy = healthy
+        self.checked_at = time.monotonic()
+
+
+class ReplicaSet:
+    """Routes reads to healthy replicas, falling back to the primary.
+
+    Replicas take turns. With none configured, or none healthy, everything
+    goes to the primary, same as before replicas existed.
+    """
+
+    def __init__(
+        self,
+        primary: AsyncConnectionPool,
+        replicas: list[Replica],
+        max_lag: float | None = None,
+    ) -> None:
+        """Init routing over a primary pool and its replicas."""
+        self.primary = primary
+        self.replicas = replicas
+        self.max_lag = max_lag or float(os.getenv("REPLICA_MAX_LAG", str(MAX_LAG)))
+        self.turn = itertools.cycle(replicas)
+
+    async def open(self) -> None:
+        """Open the replica pools and check them."""
+        for replica in self.replicas:
+            await replica.pool.open()
+
+        await self.check()
+
+    async def close(self) -> None:
+        """Close the replica pools."""
+        for replica in self.replicas:
+            await replica.pool.close()
+
+    async def check(self) -> None:
+        """Check every replica's lag."""
+        for replica in self.replicas:
+            await replica.check(self.max_lag)
+
+    def pick(self) -> Replica | None:
+        """Get the next healthy replica, if there is one."""
+        for _ in self.replicas:
+            replica = next(self.turn)
+
+            if replica.healthy:
+                return replica
+
+        return None
+
+    @asynccontextmanager
+    async def connection(
+        self,
+        *,
+        primary: bool = False,
+    ) -> AsyncIterator[psycopg.AsyncConnection]:
+        """Get a replica connection, or a primary one if asked or none are up."""
+        replica = None if primary else self.pick()
+        conn = None
+
+        if replica:
+            try:
+                conn = await replica.pool.getconn(timeout=CONNECT_TIMEOUT)
+            except PoolTimeout:
+                # skipped until the next check finds it back up
+                logger.warning("Replica %s timed out, using primary", replica.name)
+                replica.healthy = False
+
+        if conn is None:
+            async with self.primary.connection() as conn:
+                yield conn
+
+            return
+
+        # what AsyncConnectionPool.connection does, with the connection above
+        try:
+            async with conn:
+                yield conn
+        finally:
+            await replica.pool.putconn(conn)
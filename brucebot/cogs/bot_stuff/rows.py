@@ -0,0 +1,190 @@
+from collections.abc import Callable, Iterator, Mapping
+
+import psycopg
+
+
+class Row(Mapping):
+    """A row with a fixed set of columns, kept in slots instead of a dict.
+
+    Reads the same as a dict_row (`row["name"]`, `.get`, `**row`), so code
+    written against dicts keeps working. Columns a query selects that
+    aren't in `__slots__` are dropped, slots it doesn't select are None.
+
+    Each row class takes a value for every slot, in order, and assigns them
+    in its own `__init__`. Assigning them by name in a loop here would make
+    building rows slower than building dicts.
+    """
+
+    __slots__ = ()
+
+    def __getitem__(self, key: str) -> object:
+        """Get a column by name."""
+        if key not in self.__slots__:
+            raise KeyError(key)
+
+        return getattr(self, key)
+
+    def __iter__(self) -> Iterator[str]:
+        """Iterate over column names."""
+        return iter(self.__slots__)
+
+    def __len__(self) -> int:
+        """Count the columns."""
+        return len(self.__slots__)
+
+    def __repr__(self) -> str:
+        """Show the row like a dict, with its class name."""
+        return f"{self.__class__.__name__}({dict(self.items())})"
+
+
+class Event(Row):
+    """An event, as used by the setlist index."""
+
+    __slots__ = ("id", "event_id", "event_date", "venue_id")  # noqa: RUF023, column order
+
+    def __init__(self, *values: object) -> None:
+        """Init event from its columns."""
+        self.id, self.event_id, self.event_date, self.venue_id = values
+
+
+class Song(Row):
+    """A song."""
+
+    __slots__ = ("id", "uuid", "song_name")  # noqa: RUF023, column order
+
+    def __init__(self, *values: object) -> None:
+        """Init song from its columns."""
+        self.id, self.uuid, self.song_name = values
+
+
+class Venue(Row):
+    """A venue and its event count."""
+
+    __slots__ = ("id", "uuid", "name", "city", "event_count")  # noqa: RUF023, column order
+
+    def __init__(self, *values: object) -> None:
+        """Init venue from its columns."""
+        self.id, self.uuid, self.name, self.city, self.event_count = values
+
+
+class Tour(Row):
+    """A tour with its first and last event, and what the tour catalog adds.
+
+    `legs` and `search` aren't columns, they're filled in after the query.
+    """
+
+    __slots__ = (  # noqa: RUF023, column order
+        "id",
+        "tour_name",
+        "brucebase_tag",
+        "num_shows",
+        "num_songs",
+        "first_event_date",
+        "first_event_id",
+        "last_event_date",
+        "last_event_id",
+        "legs",
+        "search",
+    )
+
+    def __init__(self, *values: object) -> None:
+        """Init tour from its columns."""
+        (
+            self.id,
+            self.tour_name,
+            self.brucebase_tag,
+            self.num_shows,
+            self.num_songs,
+            self.first_event_date,
+            self.first_event_id,
+            self.last_event_date,
+            self.last_event_id,
+            self.legs,
+            self.search,
+        ) = values
+
+
+class Bootleg(Row):
+    """A bootleg with the event it's from."""
+
+    __slots__ = (  # noqa: RUF023, column order
+        "title",
+        "date",
+        "event_id",
+        "venue_id",
+        "label",
+        "slid",
+        "category",
+        "media_type",
+    )
+
+    def __init__(self, *values: object) -> None:
+        """Init bootleg from its columns."""
+        (
+            self.title,
+            self.date,
+            self.event_id,
+            self.venue_id,
+            self.label,
+            self.slid,
+            self.category,
+            self.media_type,
+        ) = values
+
+
+class SetlistEntry(Row):
+    """A single song in a setlist."""
+
+    __slots__ = ("event_id", "song_id", "set_name", "position")  # noqa: RUF023, column order
+
+    def __init__(self, *values: object) -> None:
+        """Init setlist entry from its columns."""
+        self.event_id, self.song_id, self.set_name, self.position = values
+
+
+def row_factory[T: Row](
+    cls: type[T],
+) -> Callable[[psycopg.AsyncCursor], Callable[[tuple], T]]:
+    """Make a psycopg row factory that builds `cls` rows.
+
+    Queries selecting exactly the class's columns, in order, pass values
+    straight through. Others are matched up by column name once per query.
+    """
+
+    def factory(cursor: psycopg.AsyncCursor) -> Callable[[tuple], T]:
+        names = tuple(column.name for column in cursor.description or ())
+
+        if names == cls.__slots__:
+            return lambda values: cls(*values)
+
+        indexes = [
+            names.index(name) if name in names else None for name in cls.__slots__
+        ]
+
+        return lambda values: cls(
+            *(values[index] if index is not None else None for index in indexes),
+        )
+
+    return factory
+
+
+async def fetchall[T: Row](
+    cur: psycopg.AsyncCursor,
+    cls: type[T],
+    query: str,
+    params: dict | None = None,
+) -> list[T]:
+    """Run a query on the cursor's connection, returning `cls` rows.
+
+    Offline cursors only make dicts, so their rows are converted instead.
+    """
+    if not isinstance(cur, psycopg.AsyncCursor):
+        res = await cur.execute(query, params)
+        return [
+            cls(*(row.get(name) for name in cls.__slots__))
+            for row in await res.fetchall()
+        ]
+
+    async with cur.connection.cursor(row_factory=row_factory(cls)) as typed:
+        res = await typed.execute(query, params)
+        return await res.fetchall()
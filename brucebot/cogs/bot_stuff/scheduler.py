@@ -0,0 +1,132 @@
+import asyncio
+import itertools
+import time
+from collections import Counter
+from contextlib import asynccontextmanager
+from typing import NamedTuple
+
+from discord.ext import commands
+
+
+class Queue(NamedTuple):
+    """Limits for one class of database work."""
+
+    priority: int  # lower runs first
+    concurrency: int  # max running at once, in connections
+    max_waiting: int  # waiting past this is turned away
+
+
+# class -> limits, concurrency is capped at the pool size
+QUEUES = {
+    "admin": Queue(priority=0, concurrency=1, max_waiting=5),
+    "lookup": Queue(priority=1, concurrency=100, max_waiting=25),
+    "aggregate": Queue(priority=2, concurrency=2, max_waiting=5),
+    "background": Queue(priority=3, concurrency=1, max_waiting=5),
+}
+
+# classes that together leave at least one connection free for lookups,
+# unless the pool only has the one
+HEAVY = ("aggregate", "background")
+
+
+class BusyError(commands.CommandError):
+    """Raised when there are too many queries of a class waiting to run."""
+
+    def __init__(self, queue: str) -> None:
+        """Init error with the class that was full."""
+        super().__init__(f"Too many {queue} queries waiting")
+        self.queue = queue
+
+
+class Scheduler:
+    """Admission control in front of the connection pool.
+
+    Every query takes a slot for its class before getting a connection.
+    Free slots go to the highest priority waiter whose class is under its
+    concurrency limit, so a backlog of heavy stats can't hold up lookups.
+    Once too many of a class are waiting, new ones fail with BusyError
+    straight away rather than sitting in line.
+    """
+
+    def __init__(self, slots: int, queues: dict[str, Queue] = QUEUES) -> None:
+        """Init scheduler for a pool with `slots` connections."""
+        self.slots = slots
+        self.heavy_slots = max(slots - 1, 1)
+        self.queues = queues
+        self.running: Counter[str] = Counter()
+        self.queued: Counter[str] = Counter()
+        self.waiting: list[tuple[int, int, str, asyncio.Future]] = []
+        self.order = itertools.count()
+        self.counters: Counter[str] = Counter()
+
+    def can_run(self, queue: str) -> bool:
+        """Whether a slot is free for a class."""
+        if queue in HEAVY and (
+            sum(self.running[heavy] for heavy in HEAVY) >= self.heavy_slots
+        ):
+            return False
+
+        return (
+            self.running.total() < self.slots
+            and self.running[queue] < self.queues[queue].concurrency
+        )
+
+    def dispatch(self) -> None:
+        """Hand free slots to waiters, highest priority first."""
+        for entry in sorted(self.waiting):
+            if self.running.total() >= self.slots:
+                return
+
+            _, _, queue, future = entry
+
+            # cancelled waiters take themselves out of line once they wake
+            if future.done():
+                continue
+
+            if self.can_run(queue):
+                self.waiting.remove(entry)
+                self.queued[queue] -= 1
+                self.running[queue] += 1
+                future.set_result(None)
+
+    async def acquire(self, queue: str) -> None:
+        """Wait for a slot, raises BusyError if the class's line is full."""
+        if self.queued[queue] >= self.queues[queue].max_waiting:
+            self.counters[f"{queue}_shed"] += 1
+            raise BusyError(queue)
+
+        start = time.monotonic()
+        future = asyncio.get_running_loop().create_future()
+        entry = (self.queues[queue].priority, next(self.order), queue, future)
+
+        self.waiting.append(entry)
+        self.queued[queue] += 1
+        self.dispatch()
+
+        try:
+            await future
+        except asyncio.CancelledError:
+            if future.done() and not future.cancelled():
+                self.release(queue)
+            else:
+                self.waiting.remove(entry)
+                self.queued[queue] -= 1
+            raise
+
+        self.counters[f"{queue}_run"] += 1
+        self.counters[f"{queue}_wait_ms"] += int((time.monotonic() - start) * 1000)
+
+    def release(self, queue: str) -> None:
+        """Give back a slot and wake whoever is next."""
+        self.running[queue] -= 1
+        self.dispatch()
+
+    @asynccontextmanager
+    async def slot(self, queue: str):  # noqa: ANN201
+        """Hold a slot for a class for the duration of the block."""
+        await self.acquire(queue)
+
+        try:
+            yield
+        finally:
+            self.release(queue)
@@ -0,0 +1,393 @@
+import datetime
+import json
+import logging
+import mmap
+import os
+import struct
+import sys
+import zlib
+from array import array
+from collections import Counter, defaultdict
+from pathlib import Path
+
+import psycopg
+from cogs.bot_stuff import executor
+from cogs.bot_stuff.snapshot import Snapshot
+
+logger = logging.getLogger(__name__)
+
+COLUMNS_PATH = Path(Path(__file__).parents[3], "setlists.columns")
+
+MAGIC = b"BRUCECOL"
+# bump when columns are added, removed or change type, old files get rebuilt
+VERSION = 1
+
+# table -> column -> array typecode, the file's schema
+SCHEMA = {
+    "events": {
+        "id": "I",
+        "year": "H",
+        "tour_id": "I",
+    },
+    "setlists": {
+        "event": "I",
+        "song_id": "I",
+        "set": "B",
+        "position": "H",
+        "flags": "B",
+    },
+}
+
+OPENER = 1
+CLOSER = 2
+LAST_IN_SHOW = 4
+MAIN_SET_CLOSER = 8
+
+FLAGS = {
+    "is_opener": OPENER,
+    "is_closer": CLOSER,
+    "is_last_in_show": LAST_IN_SHOW,
+    "is_main_set_closer": MAIN_SET_CLOSER,
+}
+
+MAIN_SETS = ("Show", "Set 1", "Set 2", "Encore")
+
+# columns start on a multiple of this, so they can be cast in place
+ALIGN = 8
+
+
+def get_path() -> Path:
+    """Path of the columns file, SETLIST_COLUMNS if set."""
+    return Path(os.getenv("SETLIST_COLUMNS", str(COLUMNS_PATH)))
+
+
+def pack(data: dict) -> tuple[dict[str, dict[str, array]], dict]:
+    """Turn query results into columns and the lookup tables beside them."""
+    sets = sorted({row["set_name"] or "" for row in data["setlists"]})
+    set_index = {name: index for index, name in enumerate(sets)}
+
+    columns = {
+        table: {name: array(code) for name, code in table_columns.items()}
+        for table, table_columns in SCHEMA.items()
+    }
+
+    events = columns["events"]
+    event_index = {}
+
+    for index, row in enumerate(data["events"]):
+        event_index[row["id"]] = index
+        events["id"].append(row["id"])
+        events["year"].append(int(row["date"][:4]) if row["date"] else 0)
+        events["tour_id"].append(row["tour_id"] or 0)
+
+    setlists = columns["setlists"]
+
+    for row in data["setlists"]:
+        if row["event_id"] not in event_index:
+            continue
+
+        setlists["event"].append(event_index[row["event_id"]])
+        setlists["song_id"].append(row["song_id"] or 0)
+        setlists["set"].append(set_index[row["set_name"] or ""])
+        setlists["position"].append(row["position"] or 0)
+        setlists["flags"].append(
+            sum(flag for name, flag in FLAGS.items() if row[name]),
+        )
+
+    strings = {
+        "sets": sets,
+        "songs": {row["id"]: row["song_name"] for row in data["songs"]},
+        "tours": {row["id"]: row["tour_name"] for row in data["tours"]},
+    }
+
+    return columns, strings
+
+
+def write(path: Path, fingerprint: int, data: dict) -> None:
+    """Write the columns file.
+
+    Layout is MAGIC, a u32 header length and a JSON header giving the
+    offset and length of every column, then the columns themselves as raw
+    arrays. The names for songs, tours and sets are small, so they're kept
+    zlib compressed in one block rather than as columns.
+    """
+    columns, strings = pack(data)
+
+    header = {
+        "version": VERSION,
+        "byteorder": sys.byteorder,
+        "fingerprint": fingerprint,
+        "columns": {},
+    }
+
+    blobs = []
+    offset = 0
+
+    for table, table_columns in columns.items():
+        for name, column in table_columns.items():
+            blob = column.tobytes()
+            header["columns"][f"{table}.{name}"] = {
+                "type": column.typecode,
+                "offset": offset,
+                "length": len(column),
+            }
+
+            blobs.append(blob + b"\0" * (-len(blob) % ALIGN))
+            offset += len(blobs[-1])
+
+    compressed = zlib.compress(json.dumps(strings).encode())
+    header["strings"] = {"offset": offset, "size": len(compressed)}
+    blobs.append(compressed)
+
+    header_bytes = json.dumps(header).encode()
+    # pad the header too, so column offsets are aligned in the file
+    prefix = len(MAGIC) + 4 + len(header_bytes)
+    header_bytes += b" " * (-prefix % ALIGN)
+
+    tmp = path.with_suffix(f".{os.getpid()}.tmp")
+
+    with tmp.open("wb") as file:
+        file.write(MAGIC)
+        file.write(struct.pack("<I", len(header_bytes)))
+        file.write(header_bytes)
+
+        for blob in blobs:
+            file.write(blob)
+
+    tmp.replace(path)
+
+
+class Columns:
+    """A columns file mapped into memory.
+
+    Columns are memoryviews over the mapping, so nothing is read until it's
+    used and forked processes share the same pages.
+    """
+
+    def __init__(self, path: Path) -> None:
+        """Map the file at `path`, raises ValueError if it's not usable."""
+        self.path = path
+
+        with path.open("rb") as file:
+            self.mmap = mmap.mmap(file.fileno(), 0, access=mmap.ACCESS_READ)
+
+        if self.mmap[: len(MAGIC)] != MAGIC:
+            msg = f"{path} is not a columns file"
+            raise ValueError(msg)
+
+        (size,) = struct.unpack_from("<I", self.mmap, len(MAGIC))
+        start = len(MAGIC) + 4
+        header = json.loads(self.mmap[start : start + size])
+
+        if header["version"] != VERSION or header["byteorder"] != sys.byteorder:
+            msg = f"{path} was written by another version"
+            raise ValueError(msg)
+
+        data = memoryview(self.mmap)[start + size :]
+
+        self.fingerprint: int = header["fingerprint"]
+        self.columns: dict[str, memoryview] = {
+            name: data[
+                column["offset"] : column["offset"]
+                + column["length"] * array(column["type"]).itemsize
+            ].cast(column["type"])
+            for name, column in header["columns"].items()
+        }
+
+        block = header["strings"]
+        strings = json.loads(
+            zlib.decompress(data[block["offset"] : block["offset"] + block["size"]]),
+        )
+
+        self.sets: list[str] = strings["sets"]
+        self.songs = {int(key): name for key, name in strings["songs"].items()}
+        self.tours = {int(key): name for key, name in strings["tours"].items()}
+
+    def __getitem__(self, name: str) -> memoryview:
+        """Get a column by `table.column` name."""
+        return self.columns[name]
+
+
+def group_flagged(columns: Columns) -> dict[str, dict[int, list[tuple]]]:
+    """Group the opener/closer rows by song, year and tour.
+
+    One pass over the columns, done when they're mapped or built. Stats
+    then only look at the few rows for the song, year or tour asked for.
+    Rows are (song_id, set, position, flags).
+    """
+    groups = {name: defaultdict(list) for name in ("song", "year", "tour")}
+    years = columns["events.year"]
+    tours = columns["events.tour_id"]
+
+    for event, song, set_index, position, flag in zip(
+        columns["setlists.event"],
+        columns["setlists.song_id"],
+        columns["setlists.set"],
+        columns["setlists.position"],
+        columns["setlists.flags"],
+        strict=True,
+    ):
+        if flag & (OPENER | CLOSER):
+            row = (song, set_index, position, flag)
+            groups["song"][song].append(row)
+            groups["year"][years[event]].append(row)
+            groups["tour"][tours[event]].append(row)
+
+    return {name: dict(group) for name, group in groups.items()}
+
+
+class SetlistColumns(Snapshot):
+    """Every setlist row as columns, backing the opener/closer stats.
+
+    Built from the database and written to a columns file. At startup a
+    file matching the database is mapped instead of rebuilding, which is
+    what makes cold starts quick. The file can also be written ahead of
+    time with export_columns.py.
+    """
+
+    tables = ("events", "setlists", "songs", "tours")
+
+    def __init__(self) -> None:
+        """Init with nothing mapped."""
+        super().__init__()
+        self.columns: Columns | None = None
+        self.flagged: dict[str, dict[int, list[tuple]]] = {}
+
+    async def use(self, columns: Columns) -> None:
+        """Serve stats from `columns`, grouping its rows off the event loop."""
+        self.flagged = await executor.run_thread(group_flagged, columns)
+        self.columns = columns
+
+    async def load(self, cur: psycopg.AsyncCursor, *, force: bool = False) -> bool:
+        """Map an existing file if it's up to date, otherwise build."""
+        if not self.ready and not force:
+            fingerprint = await self.get_fingerprint(cur)
+
+            try:
+                columns = await executor.run_thread(Columns, get_path())
+            except (OSError, ValueError):
+                columns = None
+
+            if columns and columns.fingerprint == fingerprint:
+                await self.use(columns)
+                self.fingerprint = fingerprint
+                self.loaded_at = datetime.datetime.now(tz=datetime.timezone.utc)
+
+                logger.info("Mapped %s from %s", self.__class__.__name__, columns.path)
+                return True
+
+        return await super().load(cur, force=force)
+
+    async def build(self, cur: psycopg.AsyncCursor) -> None:
+        """Query the tables, write them to the file and map it."""
+        fingerprint = await self.get_fingerprint(cur)
+
+        data = {}
+
+        res = await cur.execute(
+            """
+            SELECT id, CAST(event_date AS TEXT) AS date, tour_id
+            FROM events
+            ORDER BY event_id
+            """,
+        )
+        data["events"] = await res.fetchall()
+
+        res = await cur.execute(
+            """
+            SELECT
+                event_id,
+                song_id,
+                set_name,
+                position,
+                is_opener,
+                is_closer,
+                is_last_in_show,
+                is_main_set_closer
+            FROM setlists
+            """,
+        )
+        data["setlists"] = await res.fetchall()
+
+        res = await cur.execute("""SELECT id, song_name FROM songs""")
+        data["songs"] = await res.fetchall()
+
+        res = await cur.execute("""SELECT id, tour_name FROM tours""")
+        data["tours"] = await res.fetchall()
+
+        path = get_path()
+        await executor.run_thread(write, path, fingerprint, data)
+        await self.use(await executor.run_thread(Columns, path))
+
+    def rows(
+        self,
+        group: str,
+        key: int,
+        flags: int,
+        sets: tuple[str, ...] | None = None,
+    ) -> list[tuple[int, int, int, int]]:
+        """Get (song_id, set, position, flags) of a group's rows with all `flags`."""
+        wanted = None
+
+        if sets is not None:
+            wanted = {
+                index for index, name in enumerate(self.columns.sets) if name in sets
+            }
+
+        return [
+            row
+            for row in self.flagged[group].get(key, ())
+            if row[3] & flags == flags and (wanted is None or row[1] in wanted)
+        ]
+
+    def top(
+        self,
+        flags: int,
+        sets: tuple[str, ...] | None = None,
+        year: int | None = None,
+        tour_id: int | None = None,
+    ) -> list[dict]:
+        """Count songs by position for a year or tour, most played first."""
+        if year is not None:
+            rows = self.rows("year", year, flags, sets)
+        else:
+            rows = self.rows("tour", tour_id, flags, sets)
+
+        counts = Counter((song, position) for song, _, position, _ in rows)
+
+        return [
+            {
+                "song_name": self.columns.songs.get(song),
+                "position": position,
+                "total": total,
+            }
+            for (song, position), total in counts.most_common()
+        ]
+
+    def song_openers(self, song_id: int) -> list[dict]:
+        """Count how often a song opened each kind of set."""
+        counts = Counter()
+
+        for _, set_index, _, _ in self.rows("song", song_id, OPENER, MAIN_SETS):
+            set_name = self.columns.sets[set_index]
+
+            if set_name in ("Show", "Set 1"):
+                counts["Show Opener"] += 1
+            else:
+                counts[f"{set_name} Opener"] += 1
+
+        return [{"position": name, "count": count} for name, count in counts.items()]
+
+    def song_closers(self, song_id: int) -> list[dict]:
+        """Count how often a song closed each kind of set."""
+        counts = Counter()
+
+        for _, set_index, _, flag in self.rows("song", song_id, CLOSER, MAIN_SETS):
+            if flag & MAIN_SET_CLOSER:
+                counts["Main Set Closer"] += 1
+            elif flag & LAST_IN_SHOW:
+                counts["Show Closer"] += 1
+            else:
+                counts[f"{self.columns.sets[set_index]} Closer"] += 1
+
+        return [{"position": name, "count": count} for name, count in counts.items()]
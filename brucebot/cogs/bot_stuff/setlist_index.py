@@ -0,0 +1,132 @@
+from array import array
+from collections import defaultdict
+from itertools import pairwise
+
+import psycopg
+from cogs.bot_stuff import rows
+from cogs.bot_stuff.rows import Event, SetlistEntry, Song
+from cogs.bot_stuff.snapshot import Snapshot
+
+PUBLIC_SETS = ["Show", "Set 1", "Set 2", "Encore", "Pre-Show", "Post-Show"]
+
+
+class SetlistIndex(Snapshot):
+    """Every public setlist in order, flattened into one sequence of slots.
+
+    A slot is a single performance of a song. Slots for an event are
+    contiguous and events are in chronological order, so song B following
+    song A means B sits at A's slot + 1. Longer chains are then just an
+    intersection of shifted posting lists.
+
+    Each song also keeps a posting list of its slots, so listing every
+    performance of a song is a slice of that list.
+    """
+
+    tables = ("events", "setlists", "songs")
+
+    def __init__(self) -> None:
+        """Init empty index."""
+        super().__init__()
+        self.events: list[Event] = []
+        self.song_names: dict[int, str] = {}
+        self.slot_song = array("I")
+        self.slot_event = array("I")
+        self.slot_set = array("B")
+        self.slot_position = array("H")
+        self.song_slots: dict[int, array] = {}
+        self.transitions: dict[tuple[int, int], array] = {}
+
+    async def build(self, cur: psycopg.AsyncCursor) -> None:
+        """Load events and setlists and rebuild the index."""
+        events = await rows.fetchall(
+            cur,
+            Event,
+            """
+            SELECT
+                e.id,
+                e.event_id,
+                e.event_date,
+                e.venue_id
+            FROM events e
+            WHERE e.id IN (SELECT event_id FROM setlists)
+            ORDER BY e.event_id
+            """,
+        )
+        event_index = {event["id"]: index for index, event in enumerate(events)}
+
+        # the biggest result of any snapshot, rows stay small
+        setlists = await rows.fetchall(
+            cur,
+            SetlistEntry,
+            """
+            SELECT
+                s.event_id,
+                s.song_id,
+                s.set_name,
+                s.position
+            FROM setlists s
+            LEFT JOIN events e ON e.id = s.event_id
+            WHERE s.set_name = ANY(%(sets)s) AND s.song_id IS NOT NULL
+            ORDER BY e.event_id, s.position
+            """,
+            {"sets": PUBLIC_SETS},
+        )
+
+        songs = await rows.fetchall(cur, Song, """SELECT id, song_name FROM songs""")
+        song_names = {song["id"]: song["song_name"] for song in songs}
+
+        slot_song = array("I")
+        slot_event = array("I")
+        slot_set = array("B")
+        slot_position = array("H")
+        song_slots = defaultdict(lambda: array("I"))
+        transitions = defaultdict(lambda: array("I"))
+
+        for row in setlists:
+            event = event_index[row["event_id"]]
+            slot = len(slot_song)
+
+            if slot > 0 and slot_event[-1] == event:
+                transitions[(slot_song[-1], row["song_id"])].append(slot - 1)
+
+            slot_song.append(row["song_id"])
+            slot_event.append(event)
+            slot_set.append(PUBLIC_SETS.index(row["set_name"]))
+            slot_position.append(row["position"] or 0)
+            song_slots[row["song_id"]].append(slot)
+
+        self.events = events
+        self.song_names = song_names
+        self.slot_song = slot_song
+        self.slot_event = slot_event
+        self.slot_set = slot_set
+        self.slot_position = slot_position
+        self.song_slots = dict(song_slots)
+        self.transitions = dict(transitions)
+
+    def follow(self, songs: list[int]) -> list[Event]:
+        """Get events where the given songs were played in order, back to back."""
+        slots = self.transitions.get((songs[0], songs[1]), array("I"))
+
+        for offset, pair in enumerate(pairwise(songs[1:]), start=1):
+            if not slots:
+                break
+
+            following = set(self.transitions.get(pair, ()))
+            slots = [slot for slot in slots if slot + offset in following]
+
+        # a sequence can show up more than once in a show, list the show once
+        matches = dict.fromkeys(self.slot_event[slot] for slot in slots)
+        return [self.events[event] for event in matches]
+
+    def performances(self, song: int) -> array:
+        """Get the slots for every performance of a song, in chronological order."""
+        return self.song_slots.get(song, array("I"))
+
+    def performance(self, slot: int) -> dict:
+        """Get the event, set and position of the performance in a slot."""
+        return {
+            **self.events[self.slot_event[slot]],
+            "set_name": PUBLIC_SETS[self.slot_set[slot]],
+            "position": self.slot_position[slot],
+        }
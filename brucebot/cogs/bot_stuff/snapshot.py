@@ -0,0 +1,137 @@
+import asyncio
+import datetime
+import logging
+from collections.abc import Iterable
+
+from cogs.bot_stuff import db
+from discord.ext import commands
+from psycopg.rows import dict_row
+from psycopg_pool import AsyncConnectionPool
+
+logger = logging.getLogger(__name__)
+
+
+class Snapshot:
+    """Data held in memory and rebuilt from the database when it changes.
+
+    Subclasses list the tables they are built from in `tables` and implement
+    `build`. Change detection uses the insert/update/delete counters postgres
+    keeps for every table, so checking for changes is a single cheap query.
+    """
+
+    tables: tuple[str, ...] = ()
+
+    def __init__(self) -> None:
+        """Init empty snapshot."""
+        self.loaded_at: datetime.datetime | None = None
+        self.fingerprint: int | None = None
+        self.lock = asyncio.Lock()
+
+    @property
+    def ready(self) -> bool:
+        """Whether the snapshot has been built at least once."""
+        return self.loaded_at is not None
+
+    async def build(self, cur: object) -> None:
+        """Rebuild the snapshot from scratch."""
+        raise NotImplementedError
+
+    async def update(self, cur: object) -> None:
+        """Bring an already built snapshot up to date, rebuilds by default."""
+        await self.build(cur)
+
+    async def get_fingerprint(self, cur: object) -> int:
+        """Get the total number of changes made to the snapshot tables."""
+        res = await cur.execute(
+            """
+            SELECT
+                coalesce(sum(n_tup_ins + n_tup_upd + n_tup_del), 0) AS changes
+            FROM pg_stat_user_tables
+            WHERE relname = ANY(%(tables)s)
+            """,
+            {"tables": list(self.tables)},
+        )
+
+        row = await res.fetchone()
+        return int(row["changes"])
+
+    async def load(self, cur: object, *, force: bool = False) -> bool:
+        """Rebuild using `cur` if the tables changed, returns if it did."""
+        fingerprint = await self.get_fingerprint(cur)
+
+        if self.ready and not force and fingerprint == self.fingerprint:
+            return False
+
+        start = datetime.datetime.now(tz=datetime.timezone.utc)
+
+        if self.ready and not force:
+            await self.update(cur)
+        else:
+            await self.build(cur)
+
+        self.fingerprint = fingerprint
+        self.loaded_at = datetime.datetime.now(tz=datetime.timezone.utc)
+
+        logger.info(
+            "Refreshed %s in %.2fs",
+            self.__class__.__name__,
+            (self.loaded_at - start).total_seconds(),
+        )
+
+        return True
+
+    async def refresh(
+        self,
+        bot: commands.Bot,
+        *,
+        queue: str = "background",
+        force: bool = False,
+    ) -> bool:
+        """Rebuild if any of the snapshot tables changed, returns if it did.
+
+        Always reads the primary, replicas don't keep the change counters.
+        """
+        async with self.lock, db.cursor(bot, queue, primary=True) as cur:
+            return await self.load(cur, force=force)
+
+
+async def get[T: Snapshot](bot: commands.Bot, snapshot: type[T]) -> T:
+    """Get the bot's shared instance of a snapshot, building it on first use.
+
+    Call this before opening a cursor, not inside one. Building takes a slot
+    and connection of its own, which could wait forever on the one held.
+    """
+    if snapshot not in bot.snapshots:
+        bot.snapshots[snapshot] = snapshot()
+
+    instance = bot.snapshots[snapshot]
+
+    if not instance.ready:
+        # someone is waiting on this one, so it goes in line as a lookup
+        await instance.refresh(bot, queue="lookup")
+
+    return instance
+
+
+async def refresh_all(bot: commands.Bot) -> None:
+    """Refresh every snapshot the bot has loaded."""
+    for instance in list(bot.snapshots.values()):
+        try:
+            await instance.refresh(bot)
+        except Exception:
+            logger.exception("Failed to refresh %s", instance.__class__.__name__)
+
+
+async def prefill(
+    pool: AsyncConnectionPool,
+    snapshots: Iterable[type[Snapshot]],
+) -> dict[type[Snapshot], Snapshot]:
+    """Build snapshots outside of a bot, to hand to bots created afterwards."""
+    built = {}
+
+    async with pool.connection() as conn, conn.cursor(row_factory=dict_row) as cur:
+        for snapshot in snapshots:
+            built[snapshot] = snapshot()
+            await built[snapshot].load(cur)
+
+    return built
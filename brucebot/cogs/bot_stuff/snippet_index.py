@@ -0,0 +1,70 @@
+from collections import Counter
+
+import psycopg
+from cogs.bot_stuff.snapshot import Snapshot
+
+
+class SnippetIndex(Snapshot):
+    """Stats for every song that has been played as a snippet.
+
+    Maps the snippet's song id to its count, first and last event and a
+    count of the songs it was played during.
+    """
+
+    tables = ("events", "setlists", "snippets", "songs")
+
+    def __init__(self) -> None:
+        """Init empty index."""
+        super().__init__()
+        self.snippets: dict[int, dict] = {}
+
+    async def build(self, cur: psycopg.AsyncCursor) -> None:
+        """Load all snippets and rebuild the index."""
+        res = await cur.execute(
+            """
+            SELECT
+                sn.snippet_id,
+                e.event_id,
+                coalesce(CAST(e.event_date AS TEXT), e.event_id) AS date,
+                s1.song_name,
+                s1.uuid AS song_uuid
+            FROM snippets sn
+            LEFT JOIN setlists s ON s.id = sn.setlist_id
+            LEFT JOIN events e ON e.id = s.event_id
+            LEFT JOIN songs s1 ON s1.id = s.song_id
+            ORDER BY e.event_id
+            """,
+        )
+
+        snippets = {}
+        songs = {}
+
+        for row in await res.fetchall():
+            snippet = snippets.setdefault(
+                row["snippet_id"],
+                {
+                    "count": 0,
+                    "first": row["date"],
+                    "first_url": row["event_id"],
+                },
+            )
+
+            snippet["count"] += 1
+            snippet["last"] = row["date"]
+            snippet["last_url"] = row["event_id"]
+
+            songs.setdefault(row["snippet_id"], Counter())[
+                (row["song_name"], row["song_uuid"])
+            ] += 1
+
+        for snippet_id, snippet in snippets.items():
+            snippet["songs"] = [
+                {"song_name": name, "uuid": uuid, "count": count}
+                for (name, uuid), count in songs[snippet_id].most_common()
+            ]
+
+        self.snippets = snippets
+
+    def find(self, song: int) -> dict:
+        """Get snippet stats for a song, zero counts if never played as one."""
+        return self.snippets.get(song, {"count": 0, "songs": []})
@@ -0,0 +1,131 @@
+import psycopg
+from cogs.bot_stuff import rows
+from cogs.bot_stuff.locations import normalize
+from cogs.bot_stuff.rows import Tour
+from cogs.bot_stuff.snapshot import Snapshot
+
+# full text searches remembered, the oldest are forgotten past this
+MAX_SEARCHED = 500
+
+
+class TourCatalog(Snapshot):
+    """Every tour with its legs, first/last event and a preformatted list row."""
+
+    tables = ("events", "tour_legs", "tours")
+
+    def __init__(self) -> None:
+        """Init empty catalog."""
+        super().__init__()
+        self.tours: dict[int, Tour] = {}
+        self.rows: list[str] = []
+        self.searched: dict[str, int] = {}
+
+    async def build(self, cur: psycopg.AsyncCursor) -> None:
+        """Load all tours and rebuild the catalog."""
+        tours: dict[int, Tour] = {}
+
+        for tour in await rows.fetchall(
+            cur,
+            Tour,
+            """
+            SELECT
+                t.id,
+                t.tour_name,
+                t.brucebase_tag,
+                t.num_shows,
+                t.num_songs,
+                coalesce(CAST(e.event_date AS TEXT), e.event_id) AS first_event_date,
+                e.event_id AS first_event_id,
+                coalesce(CAST(e1.event_date AS TEXT), e1.event_id) AS last_event_date,
+                e1.event_id AS last_event_id
+            FROM "tours" t
+            LEFT JOIN events e ON e.id = t.first_event
+            LEFT JOIN events e1 ON e1.id = t.last_event
+            ORDER BY e.event_id
+            """,
+        ):
+            tour.legs = []
+            tour.search = set(normalize(tour.tour_name).split())
+            tours[tour.id] = tour
+
+        res = await cur.execute(
+            """
+            SELECT
+                e.tour_id,
+                t.name
+            FROM events e
+            LEFT JOIN tour_legs t ON t.id = e.tour_leg
+            WHERE e.tour_leg IS NOT NULL
+            GROUP BY e.tour_id, t.id, t.name
+            ORDER BY min(e.event_id)
+            """,
+        )
+
+        for row in await res.fetchall():
+            if tour := tours.get(row["tour_id"]):
+                tour["legs"].append(row["name"])
+
+        listing = []
+
+        for row in tours.values():
+            shows = f"**Shows:** {row['num_shows']}"
+            songs = f"**Songs:** {row['num_songs']}"
+            first_show = f"**First:** [{row['first_event_date']}](https://www.databruce.com/events/{row['first_event_id']})"
+            last_show = f"**Last:** [{row['last_event_date']}](https://www.databruce.com/events/{row['last_event_id']})"
+
+            listing.append(
+                f"### **[{row['tour_name']}](https://www.databruce.com/tours/{row['id']})**\n- {shows}\t{songs}\n- {first_show}\n- {last_show}",  # noqa: E501
+            )
+
+        self.tours = tours
+        self.rows = listing
+        self.searched = {}
+
+    def match(self, query: str) -> Tour | None:
+        """Find the biggest tour with every word of the query in its name."""
+        words = set(normalize(query).split())
+
+        if not words:
+            return None
+
+        if query_id := self.searched.get(" ".join(sorted(words))):
+            return self.tours.get(query_id)
+
+        matches = [tour for tour in self.tours.values() if words <= tour["search"]]
+
+        if matches:
+            return max(matches, key=lambda tour: tour["num_shows"] or 0)
+
+        return None
+
+    async def find(self, query: str, cur: psycopg.AsyncCursor) -> Tour | None:
+        """Find a tour, falling back to full text search if no name matches."""
+        if tour := self.match(query):
+            return tour
+
+        res = await cur.execute(
+            """
+            SELECT
+                t.id
+            FROM tours t
+            WHERE
+                t.fts_name_vector @@ websearch_to_tsquery('english', %(query)s)
+            ORDER BY
+                t.num_shows desc,
+                extensions.SIMILARITY(%(query)s, t.tour_name) DESC,
+                ts_rank(t.fts_name_vector, websearch_to_tsquery('english', %(query)s)) DESC
+            LIMIT 1;
+            """,  # noqa: E501
+            {"query": query},
+        )
+
+        row = await res.fetchone()
+
+        if row is None:
+            return None
+
+        if len(self.searched) >= MAX_SEARCHED:
+            del self.searched[next(iter(self.searched))]
+
+        self.searched[" ".join(sorted(normalize(query).split()))] = row["id"]
+        return self.tours.get(row["id"])
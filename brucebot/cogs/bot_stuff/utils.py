@@ -5,6 +5,7 @@ import dateparser
 import discord
 import psycopg
 from bs4 import BeautifulSoup
+from cogs.bot_stuff import executor
 from dateutil import parser
 from markdown import markdown
 
@@ -17,11 +18,25 @@ async def date_parsing(date: str) -> datetime.datetime | str:
     own error if date is required.
     """
     try:
-        return dateparser.parse(date).date()
+        return (await executor.run_process(dateparser.parse, date)).date()
     except (parser.ParserError, AttributeError):
         return date
 
 
+def event_label(date: datetime.date | None, event_id: str, venue: str) -> str:
+    """Format an event as `YYYY-MM-DD [Dy] - Venue`.
+
+    Events without a date show their id with a # marking it as a placeholder.
+    """
+    day = date.strftime("%Y-%m-%d [%a]") if date else f"{event_id} #"
+    return f"{day} - {venue}" if venue else day
+
+
+def event_card(date: datetime.date | None, event_id: str, venue: str) -> str:
+    """Format an event as a link to its databruce page."""
+    return f"[{event_label(date, event_id, venue)}](https://www.databruce.com/events/{event_id})"
+
+
 async def format_link(url: str, text: str) -> str:
     """Format link as markdown.
 
@@ -42,36 +57,60 @@ async def create_link_button(
     )
 
 
+SONG_SEARCH = """
+    WITH search_results AS (
+        SELECT
+            s.id,
+            s.song_name,
+            s.uuid,
+            s.fts_name_vector,
+            websearch_to_tsquery('english', %(query)s) AS q
+        FROM
+            songs s
+        WHERE
+            s.fts_name_vector @@ websearch_to_tsquery('english', %(query)s)
+    )
+    SELECT
+        *
+    FROM
+        search_results sr
+    ORDER BY
+        extensions.SIMILARITY(%(query)s, sr.song_name) DESC,
+        ts_rank(sr.fts_name_vector, q) DESC
+    LIMIT 1;
+    """
+
+# song search without full text search, for the offline sqlite export
+SONG_SEARCH_OFFLINE = """
+    SELECT
+        s.id,
+        s.song_name,
+        s.uuid
+    FROM
+        songs s
+    WHERE
+        unaccent(s.song_name) LIKE '%%' || unaccent(%(query)s) || '%%'
+        OR SIMILARITY(%(query)s, s.song_name) > 0.3
+    ORDER BY
+        SIMILARITY(%(query)s, s.song_name) DESC
+    LIMIT 1;
+    """
+
+
 async def song_find_fuzzy(
     query: str,
     cur: psycopg.AsyncCursor,
 ) -> dict:
-    """Fuzzy search SONGS table using full text search."""
-    res = await cur.execute(
-        """
-        WITH search_results AS (
-            SELECT
-                s.id,
-                s.song_name,
-                s.uuid,
-                s.fts_name_vector,
-                websearch_to_tsquery('english', %(query)s) AS q
-            FROM
-                songs s
-            WHERE
-                s.fts_name_vector @@ websearch_to_tsquery('english', %(query)s)
-        )
-        SELECT
-            *
-        FROM
-            search_results sr
-        ORDER BY
-            extensions.SIMILARITY(%(query)s, sr.song_name) DESC,
-            ts_rank(sr.fts_name_vector, q) DESC
-        LIMIT 1;
-        """,
-        {"query": query},
-    )
+    """Fuzzy search SONGS table using full text search.
+
+    Offline there's no full text search, so songs are matched by name and
+    trigram similarity instead.
+    """
+    if not isinstance(cur, psycopg.AsyncCursor):
+        res = await cur.execute(SONG_SEARCH_OFFLINE, {"query": query})
+        return await res.fetchone()
+
+    res = await cur.execute(SONG_SEARCH, {"query": query})
 
     return await res.fetchone()
 
@@ -0,0 +1,51 @@
+import psycopg
+from cogs.bot_stuff.snapshot import Snapshot
+
+
+class VenueIndex(Snapshot):
+    """Display name and databruce link for every venue, by venue id."""
+
+    tables = ("cities", "countries", "states", "venues")
+
+    def __init__(self) -> None:
+        """Init empty index."""
+        super().__init__()
+        self.venues: dict[int, dict] = {}
+
+    async def build(self, cur: psycopg.AsyncCursor) -> None:
+        """Load every venue and rebuild the index."""
+        res = await cur.execute(
+            """
+            SELECT
+                v.id,
+                v.uuid,
+                coalesce(
+                    vt.full_location,
+                    CASE WHEN c1.id in (2,6,37)
+                        then concat_ws(', ', v.name, c.name, s.state_abbrev)
+                        else concat_ws(', ', v.name, c.name, s.name, c1.name)
+                    end
+                ) AS name
+            FROM venues v
+            LEFT JOIN venues_text vt ON vt.id = v.id
+            LEFT JOIN cities c ON c.id = v.city
+            LEFT JOIN states s ON s.id = c.state
+            LEFT JOIN countries c1 ON c1.id = c.country
+            """,
+        )
+
+        self.venues = {
+            row["id"]: {
+                "name": row["name"],
+                "url": f"https://www.databruce.com/venues/{row['uuid']}",
+            }
+            for row in await res.fetchall()
+        }
+
+    def find(self, venue_id: int | None) -> dict:
+        """Get a venue's name and link, both empty if unknown."""
+        return self.venues.get(venue_id) or {"name": "", "url": ""}
+
+    def name(self, venue_id: int | None) -> str:
+        """Get a venue's display name, empty if unknown."""
+        return self.find(venue_id)["name"] or ""
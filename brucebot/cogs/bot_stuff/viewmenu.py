@@ -1,6 +1,511 @@
+import contextlib
+import math
+import re
+import sys
+from collections import OrderedDict
+from collections.abc import Awaitable, Callable
+
 import discord
+from cogs.bot_stuff import db, scheduler
 from discord.ext import commands
-from reactionmenu import ViewButton, ViewMenu
+
+# how long a menu listens for clicks after the last one
+MENU_TIMEOUT = 600
+
+# limits on how many menus stay live at once, oldest idle menus go first
+MAX_MENUS = 250
+MAX_MENU_BYTES = 16 * 1024 * 1024
+
+# discord's limit on a button's custom_id
+MAX_CUSTOM_ID = 100
+
+active_menus: OrderedDict[int, "PageMenu"] = OrderedDict()
+
+# name -> function that rebuilds a menu's source from its arguments
+page_sources: dict[
+    str,
+    Callable[[commands.Bot, str], Awaitable["RowSource | EmbedSource | None"]],
+] = {}
+
+
+class NoPagesError(Exception):
+    """Raised when starting a menu that has nothing to show."""
+
+
+class RowSource:
+    """Text rows for a menu, fetched one page at a time.
+
+    The source is given the total number of rows and a function that returns
+    the rows for a slice, so only the page being shown is ever formatted.
+    """
+
+    def __init__(
+        self,
+        total: int,
+        get_rows: Callable[[int, int], list[str]],
+        *,
+        title: str = "",
+        style: str = "Page $/&",
+        rows: int = 10,
+    ) -> None:
+        """Init source."""
+        self.total = total
+        self.get_rows = get_rows
+        self.title = title
+        self.style = style
+        self.rows = rows
+        self.buttons: list[discord.ui.Button] = []
+
+    @property
+    def pages(self) -> int:
+        """Number of pages in the menu."""
+        return math.ceil(self.total / self.rows)
+
+    def size(self) -> int:
+        """Approximate number of bytes held by this source."""
+        return 0
+
+    def page_key(self, page: int) -> str:  # noqa: ARG002
+        """Get the key a page starts after, if the source pages by key."""
+        return ""
+
+    async def fetch(self, start: int, stop: int) -> list[str]:
+        """Get rows for a slice."""
+        return self.get_rows(start, stop)
+
+    async def get_page(self, page: int) -> discord.Embed:
+        """Create the embed for a page."""
+        start = page * self.rows
+
+        embed = discord.Embed(
+            title=self.title,
+            description="\n".join(await self.fetch(start, start + self.rows)),
+            color=discord.Color.random(),
+        )
+
+        return embed.set_footer(
+            text=self.style.replace("$", str(page + 1)).replace("&", str(self.pages)),
+        )
+
+
+class ListSource(RowSource):
+    """Rows that were all built ahead of time."""
+
+    def __init__(
+        self,
+        *,
+        title: str = "",
+        style: str = "Page $/&",
+        rows: int = 10,
+    ) -> None:
+        """Init empty source."""
+        super().__init__(0, self.slice, title=title, style=style, rows=rows)
+        self.data: list[str] = []
+
+    def add_row(self, data: str) -> None:
+        """Add a row to the end of the list."""
+        self.data.append(data)
+        self.total = len(self.data)
+
+    def slice(self, start: int, stop: int) -> list[str]:
+        """Get rows for a slice."""
+        return self.data[start:stop]
+
+    def size(self) -> int:
+        """Approximate number of bytes held by this source."""
+        return sum(sys.getsizeof(row) for row in self.data)
+
+
+class QuerySource(RowSource):
+    """Rows fetched from the database on demand, using keyset pagination.
+
+    The query must select a text `key` column, be ordered by it, and take
+    `%(after)s` and `%(limit)s` parameters. Only the key each visited page
+    starts after is kept around, never the rows themselves.
+    """
+
+    def __init__(  # noqa: PLR0913
+        self,
+        bot: commands.Bot,
+        query: str,
+        params: dict,
+        total: int,
+        format_row: Callable[[int, dict], str],
+        *,
+        first_key: object = "",
+        title: str = "",
+        style: str = "Page $/&",
+        rows: int = 10,
+    ) -> None:
+        """Init source on the first page."""
+        super().__init__(total, None, title=title, style=style, rows=rows)
+        self.bot = bot
+        self.query = query
+        self.params = params
+        self.format_row = format_row
+        self.page_keys: dict[int, object] = {0: first_key}
+
+    def seek(self, page: int, key: object) -> None:
+        """Start `page` after `key`, known from an earlier visit to it."""
+        self.page_keys[page] = key
+
+    def page_key(self, page: int) -> str:
+        """Get the key a page starts after, if it has been visited."""
+        return str(self.page_keys.get(page, ""))
+
+    async def fetch(self, start: int, stop: int) -> list[str]:  # noqa: ARG002
+        """Get rows for the page starting at `start`."""
+        target = start // self.rows
+        page = max(known for known in self.page_keys if known <= target)
+
+        async with db.cursor(self.bot) as cur:
+            # jumping ahead (Back from the first page) walks the pages between
+            while page < target:
+                res = await cur.execute(
+                    self.query,
+                    {**self.params, "after": self.page_keys[page], "limit": self.rows},
+                )
+
+                skipped = await res.fetchall()
+
+                if not skipped:
+                    break
+
+                page += 1
+                self.page_keys[page] = skipped[-1]["key"]
+
+            res = await cur.execute(
+                self.query,
+                {**self.params, "after": self.page_keys[page], "limit": self.rows},
+            )
+
+            rows = await res.fetchall()
+
+        if rows:
+            self.page_keys.setdefault(page + 1, rows[-1]["key"])
+
+        return [
+            self.format_row(num, row)
+            for num, row in enumerate(rows, start=page * self.rows + 1)
+        ]
+
+    def size(self) -> int:
+        """Approximate number of bytes held by this source."""
+        return sys.getsizeof(self.page_keys)
+
+
+class EmbedSource:
+    """Pages that are each a complete embed, like setlists or covers."""
+
+    def __init__(self, style: str = "Page $/&") -> None:
+        """Init empty source."""
+        self.style = style
+        self.embeds: list[discord.Embed] = []
+        self.buttons: list[discord.ui.Button] = []
+
+    @property
+    def pages(self) -> int:
+        """Number of pages in the menu."""
+        return len(self.embeds)
+
+    def add_page(self, embed: discord.Embed) -> None:
+        """Add a page to the end of the menu."""
+        self.embeds.append(embed)
+
+    def add_pages(self, embeds: list[discord.Embed]) -> None:
+        """Add several pages to the end of the menu."""
+        self.embeds.extend(embeds)
+
+    def size(self) -> int:
+        """Approximate number of bytes held by this source."""
+        return sum(len(embed) for embed in self.embeds)
+
+    def page_key(self, page: int) -> str:  # noqa: ARG002
+        """Get the key a page starts after, embeds don't have one."""
+        return ""
+
+    async def get_page(self, page: int) -> discord.Embed:
+        """Get the embed for a page, with the page counter added to its footer."""
+        embed = self.embeds[page].copy()
+        counter = self.style.replace("$", str(page + 1)).replace("&", str(self.pages))
+
+        if embed.footer.text:
+            counter = f"{embed.footer.text}\n{counter}"
+
+        return embed.set_footer(text=counter)
+
+
+class PageMenu(discord.ui.View):
+    """Paginated menu that asks its source for each page as it is shown.
+
+    Live menus are tracked in `active_menus`, and once there are too many, or
+    they hold too much, the least recently used ones stop listening.
+    """
+
+    def __init__(
+        self,
+        ctx: commands.Context,
+        source: RowSource | EmbedSource,
+    ) -> None:
+        """Init menu on the first page."""
+        super().__init__(timeout=MENU_TIMEOUT)
+        self.ctx = ctx
+        self.source = source
+        self.page = 0
+        self.size = 0
+        self.message: discord.Message | None = None
+
+    def add_row(self, data: str) -> None:
+        """Add a row to a menu built from a list of rows."""
+        self.source.add_row(data)
+
+    def add_page(self, embed: discord.Embed) -> None:
+        """Add a page to a menu built from embeds."""
+        self.source.add_page(embed)
+
+    def add_pages(self, embeds: list[discord.Embed]) -> None:
+        """Add several pages to a menu built from embeds."""
+        self.source.add_pages(embeds)
+
+    def add_button(self, button: discord.ui.Button) -> None:
+        """Add an extra button, like a link, to the menu."""
+        self.add_item(button)
+
+    async def show_page(self, interaction: discord.Interaction, page: int) -> None:
+        """Move to the given page, wrapping around at either end."""
+        self.page = page % self.source.pages
+
+        # evicted or timed out menus can still get a click that was in flight
+        if self.message and self.message.id in active_menus:
+            active_menus.move_to_end(self.message.id, last=True)
+
+        await interaction.response.edit_message(
+            embed=await self.source.get_page(self.page),
+            view=self,
+        )
+
+    @discord.ui.button(label="Back", style=discord.ButtonStyle.primary)
+    async def back(
+        self,
+        interaction: discord.Interaction,
+        button: discord.ui.Button,  # noqa: ARG002
+    ) -> None:
+        """Go to previous page."""
+        await self.show_page(interaction, self.page - 1)
+
+    @discord.ui.button(label="Next", style=discord.ButtonStyle.secondary)
+    async def next(
+        self,
+        interaction: discord.Interaction,
+        button: discord.ui.Button,  # noqa: ARG002
+    ) -> None:
+        """Go to next page."""
+        await self.show_page(interaction, self.page + 1)
+
+    async def close(self) -> None:
+        """Stop listening and remove the buttons from the message."""
+        self.stop()
+
+        if self.message:
+            active_menus.pop(self.message.id, None)
+
+            with contextlib.suppress(discord.HTTPException):
+                await self.message.edit(view=None)
+
+    async def on_timeout(self) -> None:
+        """Close the menu once it has gone idle."""
+        await self.close()
+
+    async def start(self) -> None:
+        """Send the menu and start tracking it."""
+        if self.source.pages == 0:
+            raise NoPagesError
+
+        embed = await self.source.get_page(0)
+
+        if self.source.pages == 1:
+            # nothing to page through, just the embed and any link buttons
+            for item in self.children[:2]:
+                self.remove_item(item)
+
+        self.message = await self.ctx.send(embed=embed, view=self)
+
+        if self.source.pages == 1:
+            self.stop()
+            return
+
+        self.size = self.source.size()
+        active_menus[self.message.id] = self
+
+        while len(active_menus) > MAX_MENUS or (
+            sum(menu.size for menu in active_menus.values()) > MAX_MENU_BYTES
+            and len(active_menus) > 1
+        ):
+            _, oldest = active_menus.popitem(last=False)
+            await oldest.close()
+
+
+def page_custom_id(name: str, move: str, page: int, key: str, args: str) -> str:
+    """Build the custom_id of a page button."""
+    return f"page:{name}:{move}:{page}:{key}:{args}"
+
+
+class PageButton(
+    discord.ui.DynamicItem[discord.ui.Button],
+    template=r"page:(?P<name>\w+):(?P<move>[bn]):(?P<page>\d+):(?P<key>[^:]*):(?P<args>.*)",
+):
+    """Back/Next button that carries everything needed to render its page.
+
+    The custom_id holds the menu name, its arguments, the current page and
+    the key the page it moves to starts after, so any click can be answered
+    by rebuilding the source, even for menus sent before a restart. The key
+    lets query sources go straight to that page. Registered once with
+    `bot.add_dynamic_items`.
+    """
+
+    def __init__(
+        self,
+        name: str,
+        move: str,
+        page: int,
+        args: str,
+        key: str = "",
+    ) -> None:
+        """Init button for moving back or next from a page."""
+        custom_id = page_custom_id(name, move, page, key, args)
+
+        # the key only saves queries, so it's left out if it doesn't fit
+        if ":" in key or len(custom_id) > MAX_CUSTOM_ID:
+            key = ""
+            custom_id = page_custom_id(name, move, page, key, args)
+
+        if len(custom_id) > MAX_CUSTOM_ID:
+            msg = f"Arguments for {name} menu are too long for a button"
+            raise ValueError(msg)
+
+        super().__init__(
+            discord.ui.Button(
+                label="Back" if move == "b" else "Next",
+                style=discord.ButtonStyle.primary
+                if move == "b"
+                else discord.ButtonStyle.secondary,
+                custom_id=custom_id,
+            ),
+        )
+        self.name = name
+        self.move = move
+        self.page = page
+        self.args = args
+        self.key = key
+
+    @classmethod
+    async def from_custom_id(
+        cls,
+        interaction: discord.Interaction,  # noqa: ARG003
+        item: discord.ui.Button,  # noqa: ARG003
+        match: re.Match[str],
+    ) -> "PageButton":
+        """Rebuild the button from a clicked custom_id."""
+        return cls(
+            match["name"],
+            match["move"],
+            int(match["page"]),
+            match["args"],
+            match["key"],
+        )
+
+    async def callback(self, interaction: discord.Interaction) -> None:
+        """Render the next/previous page in place."""
+        source = None
+
+        try:
+            if factory := page_sources.get(self.name):
+                source = await factory(interaction.client, self.args)
+
+            if not source or source.pages == 0:
+                await interaction.response.send_message(
+                    "This menu is no longer available, try the command again.",
+                    ephemeral=True,
+                )
+                return
+
+            page = (self.page + (-1 if self.move == "b" else 1)) % source.pages
+
+            if self.key and isinstance(source, QuerySource):
+                source.seek(page, self.key)
+
+            embed = await source.get_page(page)
+        except scheduler.BusyError:
+            await interaction.response.send_message(
+                "Too busy right now, try again in a moment.",
+                ephemeral=True,
+            )
+            return
+
+        await interaction.response.edit_message(
+            embed=embed,
+            view=page_view(self.name, self.args, page, source),
+        )
+
+
+def fits_buttons(name: str, args: str, source: RowSource | EmbedSource) -> bool:
+    """Whether a menu's arguments fit in its buttons' custom_ids."""
+    return len(page_custom_id(name, "b", source.pages, "", args)) <= MAX_CUSTOM_ID
+
+
+def register_source(
+    name: str,
+    factory: Callable[[commands.Bot, str], Awaitable[RowSource | EmbedSource | None]],
+) -> None:
+    """Register a function that rebuilds a menu's source from its arguments."""
+    page_sources[name] = factory
+
+
+def page_view(
+    name: str,
+    args: str,
+    page: int,
+    source: RowSource | EmbedSource,
+) -> discord.ui.View:
+    """Create the persistent view for a page of a registered menu."""
+    view = discord.ui.View(timeout=None)
+
+    if source.pages > 1:
+        back = (page - 1) % source.pages
+        forward = (page + 1) % source.pages
+
+        view.add_item(PageButton(name, "b", page, args, source.page_key(back)))
+        view.add_item(PageButton(name, "n", page, args, source.page_key(forward)))
+
+    for button in source.buttons:
+        view.add_item(button)
+
+    return view
+
+
+async def send_pages(ctx: commands.Context, name: str, args: str) -> bool:
+    """Send the first page of a registered menu, returns False if it's empty."""
+    source = await page_sources[name](ctx.bot, args)
+
+    if not source or source.pages == 0:
+        return False
+
+    if not fits_buttons(name, args, source):
+        # too long to carry in the buttons, page from memory instead
+        menu = PageMenu(ctx, source)
+
+        for button in source.buttons:
+            menu.add_button(button)
+
+        await menu.start()
+        return True
+
+    await ctx.send(
+        embed=await source.get_page(0),
+        view=page_view(name, args, 0, source),
+    )
+
+    return True
 
 
 async def stats_menu(
@@ -28,79 +533,23 @@ async def create_dynamic_menu(
     page_counter: str,
     rows: int,
     title: str,
-) -> ViewMenu:
-    """Create dynamic ReactionMenu.
+) -> PageMenu:
+    """Create dynamic menu.
 
-    This is a type of ReactionMenu, which dynamically creates pages
-    based on amount of data. Used for Bootleg and Opener/Closer stats.
+    Menu that dynamically creates pages based on amount of data.
+    Used for Bootleg and Opener/Closer stats.
     """
-    embed = discord.Embed(
-        title=title,
-        description="",
-        color=discord.Color.random(),
-    )
-
-    menu = ViewMenu(
-        ctx,
-        menu_type=ViewMenu.TypeEmbedDynamic,
-        rows_requested=rows,
-        all_can_click=True,
-        style=page_counter,
-        custom_embed=embed,
-        timeout=None,
-    )
-
-    back_button = ViewButton(
-        style=discord.ButtonStyle.primary,
-        label="Back",
-        custom_id=ViewButton.ID_PREVIOUS_PAGE,
-    )
-    menu.add_button(back_button)
-
-    next_button = ViewButton(
-        style=discord.ButtonStyle.secondary,
-        label="Next",
-        custom_id=ViewButton.ID_NEXT_PAGE,
-    )
-    menu.add_button(next_button)
-
-    return menu
+    return PageMenu(ctx, ListSource(title=title, style=page_counter, rows=rows))
 
 
 async def create_view_menu(
     ctx: commands.Context,
     style: str = "Page $/&",
-    title: str = "",
-) -> ViewMenu:
-    """Create standard ReactionMenu.
+    title: str = "",  # noqa: ARG001
+) -> PageMenu:
+    """Create standard menu.
 
-    A type of ReactionMenu, but for arranging a series of embeds
-    into pages, reducing clutter when multiple setlists are found.
+    For arranging a series of embeds into pages,
+    reducing clutter when multiple setlists are found.
     """
-    embed = discord.Embed(title=title, description="", color=discord.Color.random())
-
-    menu = ViewMenu(
-        ctx,
-        menu_type=ViewMenu.TypeEmbed,
-        style=style,
-        custom_embed=embed,
-        timeout=None,
-    )
-
-    # ViewButton.ID_PREVIOUS_PAGE
-    back_button = ViewButton(
-        style=discord.ButtonStyle.primary,
-        label="Back",
-        custom_id=ViewButton.ID_PREVIOUS_PAGE,
-    )
-    menu.add_button(back_button)
-
-    # ViewButton.ID_NEXT_PAGE
-    next_button = ViewButton(
-        style=discord.ButtonStyle.secondary,
-        label="Next",
-        custom_id=ViewButton.ID_NEXT_PAGE,
-    )
-    menu.add_button(next_button)
-
-    return menu
+    return PageMenu(ctx, EmbedSource(style=style))
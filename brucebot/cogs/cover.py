@@ -1,6 +1,6 @@
-from cogs.bot_stuff import bot_embed, db, utils, viewmenu
+from cogs.bot_stuff import bot_embed, snapshot, utils, viewmenu
+from cogs.bot_stuff.artifact_index import ArtifactIndex
 from discord.ext import commands
-from psycopg.rows import dict_row
 
 
 class Cover(commands.Cog):
@@ -48,46 +48,21 @@ class Cover(commands.Cog):
         date: str,
     ) -> list:
         """Get list of covers from my repo based on date."""
-        async with (
-            await db.create_pool() as pool,
-            pool.connection() as conn,
-            conn.cursor(
-                row_factory=dict_row,
-            ) as cur,
-        ):
-            date = await utils.date_parsing(date)
-
-            try:
-                date.strftime("%Y-%m-%d")
-            except AttributeError:
-                embed = await bot_embed.not_found_embed(
-                    command=self.__class__.__name__,
-                    message=date,
-                )
-                await ctx.send(embed=embed)
-
-                return
-
-            res = await cur.execute(
-                """SELECT cover_url, 'lilbud' AS source FROM "covers"
-                    WHERE event_date=%(date)s""",
-                {"date": date.strftime("%Y-%m-%d")},
-            )
+        date = await utils.date_parsing(date)
 
-            files = await res.fetchall()
+        try:
+            date.strftime("%Y-%m-%d")
+        except AttributeError:
+            embed = await bot_embed.not_found_embed(
+                command=self.__class__.__name__,
+                message=date,
+            )
+            await ctx.send(embed=embed)
 
-            if len(files) == 0:
-                res = await cur.execute(
-                    """SELECT
-                            n.thumbnail_url AS cover_url,
-                            'Nugs' AS source
-                        FROM nugs_releases n
-                        LEFT JOIN events e ON e.event_id = n.event_id
-                        WHERE e.event_date = %(date)s""",
-                    {"date": date.strftime("%Y-%m-%d")},
-                )
+            return
 
-                files = await res.fetchall()
+        index = await snapshot.get(self.bot, ArtifactIndex)
+        files = index.find(date.strftime("%Y-%m-%d"))["covers"]
 
         # ViewMenu is only for multiple covers,
         # single embed is just default embed + image.
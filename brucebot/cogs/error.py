@@ -1,8 +1,11 @@
-import traceback
+import logging
 
 import discord
+from cogs.bot_stuff import offline, ratelimit, scheduler
 from discord.ext import commands
 
+logger = logging.getLogger(__name__)
+
 
 class Error(commands.Cog):
     """Cog to handle various errors."""
@@ -26,11 +29,32 @@ class Error(commands.Cog):
 
         if isinstance(error, commands.MissingRequiredArgument):
             await ctx.send_help(ctx.command)
+        elif isinstance(error, ratelimit.RateLimitedError):
+            if error.notify:
+                await ctx.reply(
+                    f"Easy there, tramp. Try again in {error.retry_after:.0f}s.",
+                    delete_after=min(error.retry_after, 30),
+                    mention_author=False,
+                )
+        elif isinstance(getattr(error, "original", error), scheduler.BusyError):
+            await ctx.reply(
+                "Too busy right now, try again in a moment.",
+                delete_after=30,
+                mention_author=False,
+            )
+        elif isinstance(
+            getattr(error, "original", error),
+            offline.OfflineUnsupportedError,
+        ):
+            await ctx.reply(
+                "That search isn't available while the bot is offline.",
+                mention_author=False,
+            )
         else:
-            print(
-                "".join(
-                    traceback.format_exception(type(error), error, error.__traceback__),
-                ),
+            logger.error(
+                "Command failed: %s",
+                type(error).__name__,
+                exc_info=error,
             )
 
             await ctx.send(embed=embed)
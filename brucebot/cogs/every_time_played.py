@@ -0,0 +1,106 @@
+from cogs.bot_stuff import bot_embed, db, snapshot, utils, viewmenu
+from cogs.bot_stuff.setlist_index import SetlistIndex
+from cogs.bot_stuff.venue_index import VenueIndex
+from discord.ext import commands
+
+
+class EveryTimePlayed(commands.Cog, name="Every Time Played"):
+    """Collection of commands for finding every performance of a song."""
+
+    def __init__(self, bot: commands.Bot) -> None:
+        """Init cog with bot."""
+        self.bot = bot
+        self.description = "Find every time a song was played live."
+        viewmenu.register_source("etp", self.etp_source)
+
+    def event_row(self, num: int, event: dict, venues: VenueIndex) -> str:
+        """Format a single event as a menu row."""
+        card = utils.event_card(
+            event["event_date"],
+            event["event_id"],
+            venues.name(event["venue_id"]),
+        )
+
+        return f"{num}. {card}"
+
+    async def etp_source(
+        self,
+        bot: commands.Bot,
+        args: str,
+    ) -> viewmenu.RowSource | None:
+        """Build the menu for a song, or sequence of songs, from their ids."""
+        index = await snapshot.get(bot, SetlistIndex)
+        venues = await snapshot.get(bot, VenueIndex)
+        songs = [int(song) for song in args.split(">")]
+        names = [index.song_names.get(song, "") for song in songs]
+
+        if len(songs) == 1:
+            slots = index.performances(songs[0])
+
+            def get_rows(start: int, stop: int) -> list[str]:
+                rows = []
+
+                for num, slot in enumerate(slots[start:stop], start=start + 1):
+                    performance = index.performance(slot)
+                    row = self.event_row(num, performance, venues)
+                    rows.append(
+                        f"{row} ({performance['set_name']} #{performance['position']})",
+                    )
+
+                return rows
+
+            return viewmenu.RowSource(
+                total=len(slots),
+                get_rows=get_rows,
+                title=f"Every time {names[0]} was played ({len(slots)})",
+                rows=10,
+            )
+
+        if len(names) == 2:  # noqa: PLR2004
+            title = f"Times that {names[0]} was followed by {names[1]}"
+        else:
+            title = f"Times that {' > '.join(names)} was played"
+
+        events = index.follow(songs)
+
+        return viewmenu.RowSource(
+            total=len(events),
+            get_rows=lambda start, stop: [
+                self.event_row(num, event, venues)
+                for num, event in enumerate(events[start:stop], start=start + 1)
+            ],
+            title=title,
+            rows=10,
+        )
+
+    @commands.command(name="etp", usage="<song1> [> <song2> > <song3>...]")
+    async def etp_find(self, ctx: commands.Context, *, argument: str = "") -> None:
+        """Find every time a song, or a sequence of songs, was played."""
+        queries = [song.strip() for song in argument.split(">")]
+
+        if "" in queries:
+            await ctx.send_help(ctx.command)
+            return
+
+        await ctx.typing()
+
+        async with db.cursor(self.bot) as cur:
+            songs = [await utils.song_find_fuzzy(query, cur) for query in queries]
+
+        found = None not in songs and await viewmenu.send_pages(
+            ctx,
+            "etp",
+            ">".join(str(song["id"]) for song in songs),
+        )
+
+        if not found:
+            embed = await bot_embed.not_found_embed(
+                command=self.__class__.__name__,
+                message=argument,
+            )
+            await ctx.send(embed=embed)
+
+
+async def setup(bot: commands.Bot) -> None:
+    """Load extension into bot."""
+    await bot.add_cog(EveryTimePlayed(bot))
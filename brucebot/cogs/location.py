@@ -1,7 +1,7 @@
 import ftfy
-from cogs.bot_stuff import bot_embed, db, utils
+from cogs.bot_stuff import bot_embed, db, executor, snapshot, utils
+from cogs.bot_stuff.locations import Locations
 from discord.ext import commands
-from psycopg.rows import dict_row
 
 
 class Location(commands.Cog):
@@ -29,9 +29,10 @@ class Location(commands.Cog):
     async def location_embed(
         self,
         location: dict,
+        venues: list[dict],
         ctx: commands.Context,
     ) -> None:
-        """Embed for city."""
+        """Embed for city/state/country."""
         embed = await bot_embed.create_embed(ctx=ctx, title=location["name"])
 
         first_event = await utils.format_link(
@@ -48,6 +49,21 @@ class Location(commands.Cog):
         embed.add_field(name="First:", value=first_event)
         embed.add_field(name="Last:", value=last_event)
 
+        if venues:
+            top_venues = [
+                await utils.format_link(
+                    url=f"https://www.databruce.com/venues/{venue['uuid']}",
+                    text=f"{venue['name']} ({venue['event_count']})",
+                )
+                for venue in venues
+            ]
+
+            embed.add_field(
+                name="Top Venues:",
+                value="\n".join(top_venues),
+                inline=False,
+            )
+
         await ctx.send(embed=embed)
 
     @commands.hybrid_group(
@@ -61,6 +77,35 @@ class Location(commands.Cog):
         if ctx.invoked_subcommand is None:
             await ctx.send_help(ctx.command)
 
+    async def location_find(
+        self,
+        ctx: commands.Context,
+        level: str,
+        query: str,
+    ) -> None:
+        """Find a city/state/country in the location hierarchy and send it."""
+        query = await executor.run_thread(ftfy.fix_text, query)
+        locations = await snapshot.get(self.bot, Locations)
+
+        location = await locations.match(level, query)
+
+        if location is None:
+            async with db.cursor(self.bot) as cur:
+                location = await locations.search(level, query, cur)
+
+        if location:
+            await self.location_embed(
+                location=location,
+                venues=locations.top_venues(location),
+                ctx=ctx,
+            )
+        else:
+            embed = await bot_embed.not_found_embed(
+                command=level,
+                message=query,
+            )
+            await ctx.send(embed=embed)
+
     @location.command(
         name="city",
         usage="<city>",
@@ -75,58 +120,7 @@ class Location(commands.Cog):
 
         Cities can be found by either name or nickname/alias (NYC/Philly/etc.)
         """
-        city = ftfy.fix_text(city)
-
-        async with (
-            await db.create_pool() as pool,
-            pool.connection() as conn,
-            conn.cursor(
-                row_factory=dict_row,
-            ) as cur,
-        ):
-            res = await cur.execute(
-                """
-                WITH search_results AS (
-                    SELECT
-                        CASE WHEN c1.id in (2,6,37) then concat_ws(', ', c.name, s.state_abbrev) else s.name end,
-                        c.num_events,
-                        e.event_date as first_event_date,
-                        e.event_id as first_event,
-                        e1.event_date as last_event_date,
-                        e1.event_id as last_event,
-                        c.fts_name_vector,
-                        websearch_to_tsquery('english', %(query)s) AS q
-                    FROM
-                        cities c
-                    left join states s on s.id = c.state
-                    left join countries c1 on c1.id = s.country
-                    LEFT JOIN events e ON e.id = s.first_event
-                    LEFT JOIN events e1 ON e1.id = s.last_event
-                    WHERE
-                        c.fts_name_vector @@ websearch_to_tsquery('english', %(query)s)
-                )
-                SELECT
-                    *
-                FROM
-                    search_results
-                ORDER BY
-                    extensions.SIMILARITY(%(query)s, name) DESC,
-                    ts_rank(fts_name_vector, q) DESC
-                LIMIT 1;
-                """,
-                {"query": city},
-            )
-
-            city = await res.fetchone()
-
-            if city:
-                await self.location_embed(location=city, ctx=ctx)
-            else:
-                embed = await bot_embed.not_found_embed(
-                    command="city",
-                    message=city,
-                )
-                await ctx.send(embed=embed)
+        await self.location_find(ctx, "city", city)
 
     @location.command(
         name="state",
@@ -143,55 +137,7 @@ class Location(commands.Cog):
 
         States can be found by either name or abbreviation.
         """
-        async with await db.create_pool() as pool:
-            async with (
-                pool.connection() as conn,
-                conn.cursor(
-                    row_factory=dict_row,
-                ) as cur,
-            ):
-                res = await cur.execute(
-                    """
-                    WITH search_results AS (
-                        SELECT
-                            CASE WHEN c1.id in (2,6,37) then concat_ws(', ', s.name, c1.name) else s.name end,
-                            s.num_events,
-                            e.event_date as first_event_date,
-                            e.event_id as first_event,
-                            e1.event_date as last_event_date,
-                            e1.event_id as last_event,
-                            s.fts_name_vector,
-                            websearch_to_tsquery('english', 'pa') AS q
-                        FROM
-                            states s
-                        left join countries c1 on c1.id = s.country
-                        LEFT JOIN events e ON e.id = s.first_event
-                        LEFT JOIN events e1 ON e1.id = s.last_event
-                        WHERE
-                            s.fts_name_vector @@ websearch_to_tsquery('english', 'pa')
-                    )
-                    SELECT
-                        *
-                    FROM
-                        search_results
-                    ORDER BY
-                        extensions.SIMILARITY('pa', name) DESC,
-                        ts_rank(fts_name_vector, q) DESC
-                    LIMIT 1;
-                    """,
-                    {"query": state},
-                )
-
-                state = await res.fetchone()
-
-            if state:
-                await self.location_embed(location=state, ctx=ctx)
-            else:
-                embed = await bot_embed.not_found_embed(
-                    command="state",
-                    message=state,
-                )
-                await ctx.send(embed=embed)
+        await self.location_find(ctx, "state", state)
 
     @location.command(
         name="country",
@@ -206,56 +152,9 @@ class Location(commands.Cog):
     ) -> None:
         """Search for a country with a Bruce history.
 
-        Countries can be found by either name or abbreviation.
+        Countries can be found by name.
         """
-        async with await db.create_pool() as pool:
-            async with (
-                pool.connection() as conn,
-                conn.cursor(
-                    row_factory=dict_row,
-                ) as cur,
-            ):
-                res = await cur.execute(
-                    """
-                    WITH search_results AS (
-                        SELECT
-                            c.name,
-                            c.num_events,
-                            coalesce(e.event_date::text, e.event_id) as first_event_date,
-                            e.event_id as first_event,
-                            coalesce(e1.event_date::text, e1.event_id) as last_event_date,
-                            e1.event_id as last_event,
-                            c.fts_name_vector,
-                            websearch_to_tsquery('english', %(query)s) AS q
-                        FROM
-                            countries c
-                        LEFT JOIN events e ON e.id = c.first_event
-                        LEFT JOIN events e1 ON e1.id = c.last_event
-                        WHERE
-                            c.fts_name_vector @@ websearch_to_tsquery('english', %(query)s)
-                    )
-                    SELECT
-                        *
-                    FROM
-                        search_results
-                    ORDER BY
-                        extensions.SIMILARITY(%(query)s, name) DESC,
-                        ts_rank(fts_name_vector, q) DESC
-                    LIMIT 1;
-                    """,
-                    {"query": country},
-                )
-
-                country = await res.fetchone()
-
-            if country:
-                await self.location_embed(location=country, ctx=ctx)
-            else:
-                embed = await bot_embed.not_found_embed(
-                    command="country",
-                    message=country,
-                )
-                await ctx.send(embed=embed)
+        await self.location_find(ctx, "country", country)
 
 
 async def setup(bot: commands.Bot) -> None:
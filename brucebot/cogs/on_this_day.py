@@ -1,11 +1,26 @@
 import datetime
 
-from cogs.bot_stuff import bot_embed, db, utils, viewmenu
+from cogs.bot_stuff import bot_embed, db, snapshot, utils, viewmenu
+from cogs.bot_stuff.venue_index import VenueIndex
 from discord.ext import commands
-from psycopg.rows import dict_row
 
 current_date = datetime.datetime.now(tz=datetime.timezone.utc)
 
+OTD_QUERY = """
+    SELECT
+    e.event_id AS key,
+    e.event_type,
+    e.event_date,
+    b.name AS artist,
+    e.event_id,
+    e.venue_id
+    FROM "events" e
+    LEFT JOIN bands b ON b.id = e.artist
+    WHERE e.event_date::text LIKE %(date)s AND e.event_id > %(after)s
+    ORDER BY e.event_id
+    LIMIT %(limit)s
+    """
+
 
 class OnThisDay(commands.Cog, name="On This Day"):
     """Collection of commands for searching events by day."""
@@ -14,6 +29,49 @@ class OnThisDay(commands.Cog, name="On This Day"):
         """Init OnThisDay cog with bot."""
         self.bot = bot
         self.description = "Find events by day"
+        viewmenu.register_source("otd", self.otd_source)
+
+    def otd_row(self, row: dict, venues: VenueIndex) -> str:
+        """Format an event as a menu row."""
+        card = utils.event_card(
+            row["event_date"],
+            row["event_id"],
+            venues.name(row["venue_id"]),
+        )
+
+        return f"**{row['artist']}:**\n- {card} [{row['event_type']}]\n"
+
+    async def otd_source(
+        self,
+        bot: commands.Bot,
+        args: str,
+    ) -> viewmenu.QuerySource:
+        """Build the menu for events on a day, given as MM-DD."""
+        params = {"date": f"%{args}"}
+        venues = await snapshot.get(bot, VenueIndex)
+
+        async with db.cursor(bot) as cur:
+            res = await cur.execute(
+                """SELECT count(*) AS total FROM "events" e
+                WHERE e.event_date::text LIKE %(date)s""",
+                params,
+            )
+
+            total = (await res.fetchone())["total"]
+
+        return viewmenu.QuerySource(
+            bot=bot,
+            query=OTD_QUERY,
+            params=params,
+            total=total,
+            format_row=lambda _, row: self.otd_row(row, venues),
+            # leap year, so Feb 29 parses
+            title=datetime.datetime.strptime(f"2000-{args}", "%Y-%m-%d").strftime(
+                "%B %d",
+            ),
+            style="Event $/&\nEvents with # are placeholder dates",
+            rows=6,
+        )
 
     @commands.hybrid_command(
         name="onthisday",
@@ -28,77 +86,27 @@ class OnThisDay(commands.Cog, name="On This Day"):
         date: str = "",
     ) -> None:
         """Find events on a given day, or current day if empty."""
-        async with (
-            await db.create_pool() as pool,
-            pool.connection() as conn,
-            conn.cursor(
-                row_factory=dict_row,
-            ) as cur,
-        ):
-            if date == "":
-                date = current_date
-            else:
-                date = await utils.date_parsing(date)
-
-            try:
-                date.strftime("%m-%d")
-            except AttributeError:
-                embed = await bot_embed.not_found_embed(
-                    command="Events on this day",
-                    message=date,
-                )
-                await ctx.send(embed=embed)
-                return
+        if date == "":
+            date = current_date
+        else:
+            date = await utils.date_parsing(date)
 
-            res = await cur.execute(
-                """
-                    SELECT
-                    e.event_type,
-                    to_char(e.event_date, 'YYYY-MM-DD [Dy]')||
-                    CASE WHEN e.event_date is null then ' #' else '' end as date,
-                    b.name AS artist,
-                    e.event_id,
-                    CASE WHEN c1.id in (2,6,37)
-                        then concat_ws(', ', v.name, c.name, s.state_abbrev)
-                        else concat_ws(', ', v.name, c.name, s.name, c1.name)
-                    end as formatted_loc
-                    FROM "events" e
-                    LEFT JOIN bands b ON b.id = e.artist
-                    left join venues v on v.id = e.venue_id
-                    left join cities c on c.id = v.city
-                    left join states s on s.id = c.state
-                    left join countries c1 on c1.id = c.country
-                    WHERE e.event_date::text LIKE %(date)s
-                    ORDER BY e.event_id
-                    """,
-                {"date": f"%{date.strftime('%m-%d')}"},
+        try:
+            date.strftime("%m-%d")
+        except AttributeError:
+            embed = await bot_embed.not_found_embed(
+                command="Events on this day",
+                message=date,
             )
+            await ctx.send(embed=embed)
+            return
 
-            otd_results = await res.fetchall()
-
-            if len(otd_results) > 0:
-                menu = await viewmenu.create_dynamic_menu(
-                    ctx=ctx,
-                    page_counter="Event $/&\nEvents with # are placeholder dates",
-                    rows=6,
-                    title=date.strftime("%B %d"),
-                )
-
-                data = [
-                    f"**{row['artist']}:**\n- [{row['date']} - {row['formatted_loc']}](https://www.databruce.com/events/{row['event_id']}) [{row['event_type']}]\n"  # noqa: E501
-                    for row in otd_results
-                ]
-
-                for row in data:
-                    menu.add_row(data=row)
-
-                await menu.start()
-            else:
-                embed = await bot_embed.not_found_embed(
-                    command="Events on this day",
-                    message=date,
-                )
-                await ctx.send(embed=embed)
+        if not await viewmenu.send_pages(ctx, "otd", date.strftime("%m-%d")):
+            embed = await bot_embed.not_found_embed(
+                command="Events on this day",
+                message=date,
+            )
+            await ctx.send(embed=embed)
 
 
 async def setup(bot: commands.Bot) -> None:
@@ -1,7 +1,42 @@
+import logging
+
 import discord
 from cogs.bot_stuff import bot_embed, db, utils
 from discord.ext import commands
-from psycopg.rows import dict_row
+
+logger = logging.getLogger(__name__)
+
+RELATION_SEARCH = """
+    WITH search_results AS (
+        SELECT
+            r.*,
+            coalesce(e.event_date::text, e.event_id) as first_date,
+            e.event_id as first_event,
+            coalesce(e1.event_date::text, e1.event_id) as last_date,
+            e1.event_id as last_event,
+            string_agg(r1.name, ',') as aliases,
+            websearch_to_tsquery('english', %(query)s) AS q
+        FROM
+            relations r
+        LEFT JOIN events e ON e.id = r.first_event
+        LEFT JOIN events e1 ON e1.id = r.last_event
+        left join relation_aliases r1 on r1.relation_id = r.id
+        WHERE
+            r.fts_name_vector @@ websearch_to_tsquery('english', %(query)s)
+            or
+            r1.fts_name_vector @@ websearch_to_tsquery('english', %(query)s)
+        group by r.id, e.event_date, e1.event_date, e.event_id, e1.event_id
+    )
+    SELECT
+        *
+    FROM
+        search_results sr
+    ORDER BY
+        appearances desc,
+        extensions.SIMILARITY(%(query)s, sr.name) DESC,
+        ts_rank(sr.fts_name_vector, q) DESC
+    LIMIT 1;
+    """
 
 
 class Relation(commands.Cog):
@@ -39,7 +74,7 @@ class Relation(commands.Cog):
             url=f"https://www.databruce.com/relations/{relation['uuid']}",
         )
 
-        print(relation)
+        logger.debug("Relation: %s", relation)
 
         embed.add_field(name="Appearances", value=relation["appearances"])
 
@@ -77,47 +112,8 @@ class Relation(commands.Cog):
 
         Can search by name or nickname (Big Man, Phantom, etc.)
         """
-        async with (
-            await db.create_pool() as pool,
-            pool.connection() as conn,
-            conn.cursor(
-                row_factory=dict_row,
-            ) as cur,
-        ):
-            res = await cur.execute(
-                """
-                    WITH search_results AS (
-                        SELECT
-                            r.*,
-                            coalesce(e.event_date::text, e.event_id) as first_date,
-                            e.event_id as first_event,
-                            coalesce(e1.event_date::text, e1.event_id) as last_date,
-                            e1.event_id as last_event,
-                            string_agg(r1.name, ',') as aliases,
-                            websearch_to_tsquery('english', %(query)s) AS q
-                        FROM
-                            relations r
-                        LEFT JOIN events e ON e.id = r.first_event
-                        LEFT JOIN events e1 ON e1.id = r.last_event
-                        left join relation_aliases r1 on r1.relation_id = r.id
-                        WHERE
-                            r.fts_name_vector @@ websearch_to_tsquery('english', %(query)s)
-                            or
-                            r1.fts_name_vector @@ websearch_to_tsquery('english', %(query)s)
-                        group by r.id, e.event_date, e1.event_date, e.event_id, e1.event_id
-                    )
-                    SELECT
-                        *
-                    FROM
-                        search_results sr
-                    ORDER BY
-                        appearances desc,
-                        extensions.SIMILARITY(%(query)s, sr.name) DESC,
-                        ts_rank(sr.fts_name_vector, q) DESC
-                    LIMIT 1;
-                    """,  # noqa: E501
-                {"query": relation_query},
-            )
+        async with db.cursor(self.bot) as cur:
+            res = await cur.execute(RELATION_SEARCH, {"query": relation_query})
 
             relation = await res.fetchone()
 
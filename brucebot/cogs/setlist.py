@@ -4,12 +4,10 @@ from pathlib import Path
 
 import discord
 import psycopg
-import reactionmenu
-import reactionmenu.errors
-from cogs.bot_stuff import bot_embed, db, utils, viewmenu
+from cogs.bot_stuff import bot_embed, db, executor, snapshot, utils, viewmenu
+from cogs.bot_stuff.venue_index import VenueIndex
 from dateutil.parser import ParserError
 from discord.ext import commands
-from psycopg.rows import dict_row
 
 
 class Setlist(commands.Cog):
@@ -89,16 +87,11 @@ class Setlist(commands.Cog):
             """
                 SELECT DISTINCT
                     e.*,
-                    v.id as venue_id,
-                    v1.uuid as venue_uuid,
-                    v.full_location AS venue_loc,
                     t1.name AS tour_leg,
                     r.name AS run,
                     t.tour_name AS tour
                 FROM "events" e
                 LEFT JOIN tours t ON t.id = e.tour_id
-                LEFT JOIN venues_text v ON v.id = e.venue_id
-                LEFT JOIN venues v1 ON v1.id = e.venue_id
                 LEFT JOIN tour_legs t1 ON t1.id = e.tour_leg
                 LEFT JOIN runs r ON r.id = e.run
                 WHERE e.event_date = %(date)s
@@ -122,16 +115,11 @@ class Setlist(commands.Cog):
             """
                 SELECT DISTINCT
                     e.*,
-                    v.id as venue_id,
-                    v1.uuid as venue_uuid,
-                    v.full_location AS venue_loc,
                     t1.name AS tour_leg,
                     r.name AS run,
                     t.tour_name AS tour
                 FROM "events" e
                 LEFT JOIN tours t ON t.id = e.tour_id
-                LEFT JOIN venues_text v ON v.id = e.venue_id
-                LEFT JOIN venues v1 ON v1.id = e.venue_id
                 LEFT JOIN tour_legs t1 ON t1.id = e.tour_leg
                 LEFT JOIN runs r ON r.id = e.run
                 WHERE e.event_id = %(event)s
@@ -183,11 +171,12 @@ class Setlist(commands.Cog):
         event: dict,
         ctx: commands.Context,
         cur: psycopg.AsyncCursor,
+        venues: VenueIndex,
     ) -> discord.File | discord.Embed:
         """Create embed."""
-        description = [
-            f"**Venue:** [{event['venue_loc']}](https://www.databruce.com/venues/{event['venue_uuid']})",
-        ]
+        venue = venues.find(event["venue_id"])
+
+        description = [f"**Venue:** [{venue['name']}]({venue['url']})"]
 
         if event["event_title"]:
             description.append(f"**Title:** {event['event_title']}")
@@ -202,7 +191,7 @@ class Setlist(commands.Cog):
 
         if event["note"]:
             description.append(
-                f"**Notes:**\n{utils.markdown_to_text(event['note'])}",
+                f"**Notes:**\n{await executor.run_process(utils.markdown_to_text, event['note'])}",  # noqa: E501
             )
 
         releases = await self.get_releases(event["event_id"], cur)
@@ -322,13 +311,9 @@ class Setlist(commands.Cog):
 
         Note: date must be past, not a future date.
         """
-        async with (
-            await db.create_pool() as pool,
-            pool.connection() as conn,
-            conn.cursor(
-                row_factory=dict_row,
-            ) as cur,
-        ):
+        venues = await snapshot.get(self.bot, VenueIndex)
+
+        async with db.cursor(self.bot) as cur:
             if re.search(r"\/(gig|rehearsal|nogig|recording|nobruce):", date):
                 event = await self.parse_brucebase_url(date, cur)
                 events = await self.get_event_by_id(event["id"], cur)
@@ -363,6 +348,7 @@ class Setlist(commands.Cog):
                         event=events[0],
                         ctx=ctx,
                         cur=cur,
+                        venues=venues,
                     )
 
                     await ctx.send(embed=embed)
@@ -373,7 +359,12 @@ class Setlist(commands.Cog):
                     )
 
                     embeds = [
-                        await self.setlist_embed(event=event, ctx=ctx, cur=cur)
+                        await self.setlist_embed(
+                            event=event,
+                            ctx=ctx,
+                            cur=cur,
+                            venues=venues,
+                        )
                         for event in events
                     ]
 
@@ -381,7 +372,7 @@ class Setlist(commands.Cog):
 
                     await menu.start()
 
-            except (UnboundLocalError, reactionmenu.errors.NoPages):
+            except (UnboundLocalError, viewmenu.NoPagesError):
                 embed = await bot_embed.not_found_embed(
                     command=self.__class__.__name__,
                     message=date,
@@ -1,9 +1,82 @@
 import discord
 import ftfy
 import psycopg
-from cogs.bot_stuff import bot_embed, db, utils, viewmenu
+from cogs.bot_stuff import assets, bot_embed, db, executor, snapshot, utils, viewmenu
+from cogs.bot_stuff.snippet_index import SnippetIndex
 from discord.ext import commands
-from psycopg.rows import dict_row
+
+SONG_INFO = """
+    select
+        s.*,
+        e.event_id as first_event,
+        coalesce(e.event_date::text, e.event_id) as first_date,
+        e1.event_id as last_event,
+        coalesce(e1.event_date::text, e1.event_id) as last_date,
+        ROUND((s.num_plays_public * 100.0) / (select count(*) from events where event_id >= e.event_id and is_stats_eligible is true), 2) as frequency
+    from
+        songs s
+    left join events e on e.id = s.first_event
+    left join events e1 on e1.id = s.last_event
+    where s.id = %(song)s
+    """  # noqa: E501
+
+FIRST_RELEASE = """
+    SELECT
+        r.name, r.release_date, r.mbid
+    FROM songs s
+    LEFT JOIN releases r ON r.id = s.album
+    WHERE s.id = %(song)s AND r.id is not null
+    """
+
+# shows since the song was last played, found from the song so it doesn't
+# have to wait on SONG_INFO
+SHOW_GAP = """
+    SELECT
+        count(event_id) AS gap
+    FROM "events"
+    WHERE event_id > (
+        SELECT e.event_id
+        FROM songs s
+        LEFT JOIN events e ON e.id = s.last_event
+        WHERE s.id = %(song)s
+    )
+    AND event_date < NOW() and is_stats_eligible = true
+    """
+
+# public performances of a song, by year and by tour
+COUNT_BY_YEAR = """
+    SELECT
+        EXTRACT(year FROM e.event_date) as year,
+        COUNT(s.song_id) AS count
+    from setlists s
+    LEFT JOIN events e ON e.id = s.event_id
+    WHERE s.song_id = %(song)s
+    AND s.set_name IN ('Show', 'Set 1', 'Set 2', 'Encore', 'Pre-Show', 'Post-Show')
+    GROUP BY 1
+    ORDER BY 1
+    """
+
+COUNT_BY_TOUR = """
+    WITH valid_events AS (
+        SELECT id, event_date, tour_id FROM events WHERE tour_id NOT IN (43, 20, 23) AND event_date IS NOT NULL
+    )
+    SELECT
+        CASE
+            WHEN to_char(MIN(e.event_date), 'YYYY') = to_char(MAX(e.event_date), 'YYYY') THEN to_char(MIN(e.event_date), 'YYYY')
+            ELSE to_char(MIN(e.event_date), 'YYYY') || '-' || to_char(MAX(e.event_date), 'YYYY')
+        END as years,
+        t.tour_name AS tour,
+        count(*) AS count
+    FROM setlists s
+    LEFT JOIN valid_events e ON e.id = s.event_id
+    LEFT JOIN tours t ON t.id = e.tour_id
+    WHERE
+        s.song_id = %(song)s
+        AND s.set_name IN ('Show', 'Set 1', 'Set 2', 'Encore', 'Pre-Show', 'Post-Show')
+        AND e.event_date IS NOT NULL
+    GROUP BY t.id
+    ORDER BY count(*) DESC
+    """  # noqa: E501
 
 
 class Song(commands.Cog):
@@ -16,134 +89,55 @@ class Song(commands.Cog):
 
     async def get_count_by_year(self, song_id: int, cur: psycopg.AsyncCursor) -> dict:
         """Use given id to count how many times a song has appeared by year."""
-        res = await cur.execute(
-            """
-            SELECT
-                EXTRACT(year FROM e.event_date) as year,
-                COUNT(s.song_id) AS count
-            from setlists s
-            LEFT JOIN events e ON e.id = s.event_id
-            WHERE s.song_id = %(song)s
-            AND s.set_name IN ('Show', 'Set 1', 'Set 2', 'Encore', 'Pre-Show', 'Post-Show')
-            GROUP BY 1
-            ORDER BY 1
-            """,  # noqa: E501
-            {"song": song_id},
-        )
+        res = await cur.execute(COUNT_BY_YEAR, {"song": song_id})
 
         return await res.fetchall()
 
     async def get_count_by_tour(self, song_id: int, cur: psycopg.AsyncCursor) -> dict:
         """Use given url to count how many times a song has appeared by year."""
-        res = await cur.execute(
-            """
-            WITH valid_events AS (
-                SELECT id, event_date, tour_id FROM events WHERE tour_id NOT IN (43, 20, 23) AND event_date IS NOT NULL
-            )
-            SELECT
-                CASE
-                    WHEN to_char(MIN(e.event_date), 'YYYY') = to_char(MAX(e.event_date), 'YYYY') THEN to_char(MIN(e.event_date), 'YYYY')
-                    ELSE to_char(MIN(e.event_date), 'YYYY') || '-' || to_char(MAX(e.event_date), 'YYYY')
-                END as years,
-                t.tour_name AS tour,
-                count(s.*)
-            FROM setlists s
-            LEFT JOIN valid_events e ON e.id = s.event_id
-            LEFT JOIN tours t ON t.id = e.tour_id
-            WHERE
-                s.song_id = %(song)s
-                AND s.set_name IN ('Show', 'Set 1', 'Set 2', 'Encore', 'Pre-Show', 'Post-Show')
-                AND e.event_date IS NOT NULL
-            GROUP BY t.id
-            ORDER BY count(*) DESC
-            """,  # noqa: E501
-            {"song": song_id},
-        )
+        res = await cur.execute(COUNT_BY_TOUR, {"song": song_id})
 
         return await res.fetchall()
 
     async def get_song_info(self, song_id: int, cur: psycopg.AsyncCursor) -> dict:
         """With provided URL from fts, get info on song."""
-        res = await cur.execute(
-            """
-            select
-                s.*,
-                e.event_id as first_event,
-                coalesce(e.event_date::text, e.event_id) as first_date,
-                e1.event_id as last_event,
-                coalesce(e1.event_date::text, e1.event_id) as last_date,
-                ROUND((s.num_plays_public * 100.0) / (select count(*) from events where event_id >= e.event_id and is_stats_eligible is true), 2) as frequency
-            from
-                songs s
-            left join events e on e.id = s.first_event
-            left join events e1 on e1.id = s.last_event
-            where s.id = %(song)s
-            """,  # noqa: E501
-            {"song": song_id},
-        )
+        res = await cur.execute(SONG_INFO, {"song": song_id})
 
         return await res.fetchone()
 
-    async def get_first_release(
+    async def get_song_details(
         self,
         song_id: int,
         cur: psycopg.AsyncCursor,
-    ) -> dict:
-        """Get info on the first release of a given song."""
-        res = await cur.execute(
-            """SELECT
-                    r.name, r.release_date, r.mbid
-                FROM songs s
-                LEFT JOIN releases r ON r.id = s.album
-                WHERE s.id = %s AND r.id is not null
-                """,
-            (song_id,),
-        )
-
-        return await res.fetchone()
-
-    async def calc_show_gap(
-        self,
-        cur: psycopg.AsyncCursor,
-        last_show: str,
-    ) -> int:
-        """Get gap between shows."""
-        res = await cur.execute(
-            """
-            SELECT
-                count(event_id) AS gap
-            FROM "events"
-            WHERE event_id > %s AND event_date < NOW() and is_stats_eligible = true
-            """,
-            (last_show,),
+    ) -> tuple[dict | None, dict, int]:
+        """Get a song's first release, info and show gap in one round trip."""
+        release, song_info, gap = await db.batch(
+            cur,
+            (FIRST_RELEASE, {"song": song_id}),
+            (SONG_INFO, {"song": song_id}),
+            (SHOW_GAP, {"song": song_id}),
         )
 
-        show_gap = await res.fetchone()
-
-        return show_gap["gap"]
+        return (release or [None])[0], song_info[0], gap[0]["gap"]
 
     async def song_embed(
         self,
         song: dict,
         release: dict,
+        gap: int,
         ctx: commands.Context,
-        cur: psycopg.AsyncCursor,
-    ) -> discord.Embed:
-        """Create the song embed and sending."""
+    ) -> tuple[discord.Embed, discord.File | None]:
+        """Create the song embed, and the thumbnail to send with it."""
         embed = await bot_embed.create_embed(
             ctx=ctx,
             title=song["song_name"],
         )
         view = discord.ui.View()
 
-        try:
-            embed.set_thumbnail(
-                url=f"https://coverartarchive.org/release-group/{release['mbid']}/front-500",
-            )
-        except TypeError:
-            embed.set_thumbnail(
-                url="https://raw.githubusercontent.com/lilbud/brucebot/main/images/releases/default.jpg",
-            )
+        thumbnail = assets.set_thumbnail(
+            embed,
+            assets.get_manifest().release(release["name"]) if release else None,
+        )
 
         if release:
             try:
@@ -185,8 +179,6 @@ class Song(commands.Cog):
                 text=song["last_date"],
             )
 
-            gap = await self.calc_show_gap(cur=cur, last_show=song["last_event"])
-
             embed.add_field(
                 name="First Played:",
                 value=first_date_value,
@@ -207,7 +199,7 @@ class Song(commands.Cog):
             embed.add_field(name="Closer:", value=song["closer"])
             embed.add_field(name="Frequency:", value=f"{song['frequency']}%")
 
-        return embed
+        return embed, thumbnail
 
     @commands.hybrid_group(
         name="song",
@@ -222,35 +214,24 @@ class Song(commands.Cog):
         song: str,
     ) -> None:
         """Search database for song."""
-        song = ftfy.fix_text(song)
-
-        async with (
-            await db.create_pool() as pool,
-            pool.connection() as conn,
-            conn.cursor(
-                row_factory=dict_row,
-            ) as cur,
-        ):
+        song = await executor.run_thread(ftfy.fix_text, song)
+
+        async with db.cursor(self.bot) as cur:
             song_match = await utils.song_find_fuzzy(song, cur)
 
             if song_match:
                 view = discord.ui.View()
 
-                release = await self.get_first_release(
-                    song_id=song_match["id"],
-                    cur=cur,
-                )
-
-                song_info = await self.get_song_info(
+                release, song_info, gap = await self.get_song_details(
                     song_id=song_match["id"],
                     cur=cur,
                 )
 
-                embed = await self.song_embed(
+                embed, thumbnail = await self.song_embed(
                     song=song_info,
                     release=release,
+                    gap=gap,
                     ctx=ctx,
-                    cur=cur,
                 )
 
                 if song_match["id"]:
@@ -281,7 +262,7 @@ class Song(commands.Cog):
 
                     view.add_item(item=spotify_button)
 
-                await ctx.send(embed=embed, view=view)
+                await ctx.send(embed=embed, view=view, file=thumbnail)
 
             else:
                 embed = await bot_embed.not_found_embed(
@@ -294,6 +275,7 @@ class Song(commands.Cog):
         name="tour",
         description="Get tour stats on a song",
         usage="<song>",
+        extras={"cost": 3},
     )
     async def song_tour_count(
         self,
@@ -306,13 +288,7 @@ class Song(commands.Cog):
             await ctx.send_help(ctx.command)
             return
 
-        async with (
-            await db.create_pool() as pool,
-            pool.connection() as conn,
-            conn.cursor(
-                row_factory=dict_row,
-            ) as cur,
-        ):
+        async with db.cursor(self.bot, "aggregate") as cur:
             song_match = await utils.song_find_fuzzy(song, cur)
 
             if song_match:
@@ -350,6 +326,7 @@ class Song(commands.Cog):
         name="year",
         description="Get year stats on a song",
         usage="<song>",
+        extras={"cost": 3},
     )
     async def song_year_count(
         self,
@@ -362,13 +339,7 @@ class Song(commands.Cog):
             await ctx.send_help(ctx.command)
             return
 
-        async with (
-            await db.create_pool() as pool,
-            pool.connection() as conn,
-            conn.cursor(
-                row_factory=dict_row,
-            ) as cur,
-        ):
+        async with db.cursor(self.bot, "aggregate") as cur:
             song_match = await utils.song_find_fuzzy(song, cur)
 
             if song_match:
@@ -400,26 +371,6 @@ class Song(commands.Cog):
                 )
                 await ctx.send(embed=embed)
 
-    async def snippet_song_count(self, song_id: int, cur: psycopg.AsyncCursor) -> dict:
-        """Get count of songs that a snippet was included as part of."""
-        res = await cur.execute(
-            """
-            SELECT
-                distinct s1.song_name,
-                s1.brucebase_url AS url,
-                count(s1.id) AS count
-            FROM snippets sn
-            LEFT JOIN setlists s ON s.id = sn.setlist_id
-            LEFT JOIN songs s1 ON s1.id = s.song_id
-            WHERE sn.snippet_id = %(song_id)s
-            GROUP BY s1.song_name, s1.brucebase_url
-            ORDER BY count(s1.id) DESC
-            """,
-            {"song_id": song_id},
-        )
-
-        return await res.fetchall()
-
     @commands.hybrid_command(
         name="snippet",
         aliases=["snip"],
@@ -433,50 +384,24 @@ class Song(commands.Cog):
         song: str,
     ) -> None:
         """Search database for songs as snippets."""
-        song = ftfy.fix_text(song)
-
-        async with (
-            await db.create_pool() as pool,
-            pool.connection() as conn,
-            conn.cursor(
-                row_factory=dict_row,
-            ) as cur,
-        ):
-            song_match = await utils.song_find_fuzzy(song, cur)
+        song = await executor.run_thread(ftfy.fix_text, song)
 
-            if song_match:
-                res = await cur.execute(
-                    """SELECT
-                            count(sn.snippet_id) AS count,
-                            MIN(e.event_date) AS first,
-                            (SELECT event_id FROM events WHERE
-                                event_id = MIN(s.event_id)) AS first_url,
-                            MAX(e.event_date) AS last,
-                            (SELECT event_id FROM events WHERE
-                                event_id = MAX(s.event_id)) AS last_url
-                        FROM snippets sn
-                        LEFT JOIN setlists s ON s.id = sn.setlist_id
-                        LEFT JOIN events e ON e.event_id = s.event_id
-                        WHERE snippet_id = %s""",
-                    (song_match["id"],),
-                )
-
-                snippet = await res.fetchone()
+        index = await snapshot.get(self.bot, SnippetIndex)
 
-                snippet_songs = await self.snippet_song_count(
-                    song_id=song_match["id"],
-                    cur=cur,
-                )
+        async with db.cursor(self.bot) as cur:
+            song_match = await utils.song_find_fuzzy(song, cur)
 
-                release = await self.get_first_release(
-                    song_id=song_match["id"],
-                    cur=cur,
-                )
+            if song_match:
+                snippet = index.find(song_match["id"])
+                snippet_songs = snippet["songs"]
 
-                song_info = await self.get_song_info(
-                    song_id=song_match["id"],
-                    cur=cur,
+                release, song_info = await db.batch(
+                    cur,
+                    (FIRST_RELEASE, {"song": song_match["id"]}),
+                    (SONG_INFO, {"song": song_match["id"]}),
                 )
+                release = (release or [None])[0]
+                song_info = song_info[0]
 
                 embed = await bot_embed.create_embed(
                     ctx=ctx,
@@ -491,12 +416,10 @@ class Song(commands.Cog):
                         inline=False,
                     )
 
-                try:
-                    embed.set_thumbnail(url=release["thumb"])
-                except TypeError:
-                    embed.set_thumbnail(
-                        url="https://raw.githubusercontent.com/lilbud/brucebot/main/images/releases/default.jpg",
-                    )
+                thumbnail = assets.set_thumbnail(
+                    embed,
+                    assets.get_manifest().release(release["name"]) if release else None,
+                )
 
                 embed.add_field(name="Count:", value=snippet["count"])
 
@@ -512,7 +435,7 @@ class Song(commands.Cog):
 
                 if snippet_songs:
                     songs = [
-                        f"[{song['song_name']}](https://www.databruce.com/songs/{song['url']}) - {song['count']} times(s)"  # noqa: E501
+                        f"[{song['song_name']}](https://www.databruce.com/songs/{song['uuid']}) - {song['count']} times(s)"  # noqa: E501
                         for song in snippet_songs
                     ]
 
@@ -522,7 +445,7 @@ class Song(commands.Cog):
                         inline=False,
                     )
 
-                await ctx.send(embed=embed)
+                await ctx.send(embed=embed, file=thumbnail)
             else:
                 embed = await bot_embed.not_found_embed(
                     command="snippet",
@@ -1,7 +1,17 @@
-import psycopg
-from cogs.bot_stuff import bot_embed, db, utils, viewmenu
+import logging
+
+from cogs.bot_stuff import bot_embed, db, snapshot, utils, viewmenu
+from cogs.bot_stuff.setlist_columns import (
+    CLOSER,
+    LAST_IN_SHOW,
+    MAIN_SETS,
+    OPENER,
+    SetlistColumns,
+)
+from cogs.bot_stuff.tour_catalog import TourCatalog
 from discord.ext import commands
-from psycopg.rows import dict_row
+
+logger = logging.getLogger(__name__)
 
 
 class Stats(commands.Cog):
@@ -12,84 +22,13 @@ class Stats(commands.Cog):
         self.bot = bot
         self.description = "Stats about songs Bruce has played live."
 
-    async def get_tour_stats(
-        self,
-        cur: psycopg.AsyncCursor,
-        tour_id: str,
-        position: str,
-    ) -> list[dict]:
-        """Get opener/closer by tour_id."""
-        if position == "Show Opener":
-            res = await cur.execute(
-                """SELECT
-                    s1.song_name,
-                    s.position,
-                    count(*) AS total
-                FROM "setlists" s
-                LEFT JOIN "events" e on e.id = s.event_id
-                LEFT JOIN "songs" s1 ON s1.id = s.song_id
-                WHERE s.is_opener = true and s.set_name = 'Show'
-                AND e.tour_id = %(tour_id)s
-                AND s.set_name = ANY(ARRAY['Show', 'Set 1', 'Set 2', 'Encore'])
-                GROUP BY s1.song_name, s.position
-                ORDER BY count(*) DESC
-                """,
-                {"tour_id": tour_id},
-            )
-        elif position == "Show Closer":
-            res = await cur.execute(
-                """SELECT
-                    s1.song_name,
-                    s.position,
-                    count(*) AS total
-                FROM "setlists" s
-                LEFT JOIN "events" e on e.id = s.event_id
-                LEFT JOIN "songs" s1 ON s1.id = s.song_id
-                WHERE s.is_closer = true and s.is_last_in_show = true
-                AND e.tour_id = %(tour_id)s
-                AND s.set_name = ANY(ARRAY['Show', 'Set 1', 'Set 2', 'Encore'])
-                GROUP BY s1.song_name, s.position
-                ORDER BY count(*) DESC
-                """,
-                {"tour_id": tour_id},
-            )
+    async def get_columns(self) -> SetlistColumns:
+        """Get the setlist columns the stats are counted from."""
+        return await snapshot.get(self.bot, SetlistColumns)
 
-        return await res.fetchall()
-
-    async def find_tour(
-        self,
-        cur: psycopg.AsyncCursor,
-        tour: str,
-    ) -> dict:
-        """."""
-        res = await cur.execute(
-            """
-            WITH search_results AS (
-                SELECT
-                    t.id,
-                    t.tour_name,
-                    t.fts_name_vector,
-                    t.num_shows,
-                    websearch_to_tsquery('english', '2023') AS q
-                FROM
-                    tours t
-                WHERE
-                    t.fts_name_vector @@ websearch_to_tsquery('english', '2023')
-            )
-            SELECT
-                *
-            FROM
-                search_results sr
-            ORDER BY
-                sr.num_shows desc,
-                extensions.SIMILARITY('2023', sr.tour_name) DESC,
-                ts_rank(sr.fts_name_vector, q) DESC
-            LIMIT 1;
-            """,
-            {"tour": tour},
-        )
-
-        return await res.fetchone()
+    async def get_catalog(self) -> TourCatalog:
+        """Get the shared tour catalog tours are found in."""
+        return await snapshot.get(self.bot, TourCatalog)
 
     @commands.hybrid_group(
         name="opener",
@@ -117,33 +56,13 @@ class Stats(commands.Cog):
         song: str,
     ) -> None:
         """Stats on when a song has opened a set/show."""
-        async with (
-            await db.create_pool() as pool,
-            pool.connection() as conn,
-            conn.cursor(
-                row_factory=dict_row,
-            ) as cur,
-        ):
+        columns = await self.get_columns()
+
+        async with db.cursor(self.bot) as cur:
             songs = await utils.song_find_fuzzy(query=song, cur=cur)
 
             if len(songs) > 0:
-                res = await cur.execute(
-                    """
-                    select
-                        s.song_id,
-                        case when s.set_name in ('Show', 'Set 1') then 'Show Opener'
-                        else s.set_name || ' Opener' end as position,
-                        count(*) as count
-                    from setlists s
-                    where s.is_opener is true
-                    and s.set_name in ('Show', 'Set 1', 'Set 2', 'Encore')
-                    and s.song_id = %(song)s
-                    group by 1,2
-                    """,
-                    {"song": songs["id"]},
-                )
-
-                openers_list = await res.fetchall()
+                openers_list = columns.song_openers(songs["id"])
 
                 if len(openers_list) > 0:
                     embed = await bot_embed.create_embed(
@@ -183,34 +102,13 @@ class Stats(commands.Cog):
         song: str,
     ) -> None:
         """Stats on when a song has closed a set/show."""
-        async with (
-            await db.create_pool() as pool,
-            pool.connection() as conn,
-            conn.cursor(
-                row_factory=dict_row,
-            ) as cur,
-        ):
+        columns = await self.get_columns()
+
+        async with db.cursor(self.bot) as cur:
             songs = await utils.song_find_fuzzy(query=song, cur=cur)
 
             if songs != []:
-                res = await cur.execute(
-                    """
-                    select
-                        s.song_id,
-                        case when s.is_main_set_closer then 'Main Set Closer'
-                        when s.is_last_in_show then 'Show Closer'
-                        else s.set_name || ' Closer' end as position,
-                        count(*) as count
-                    from setlists s
-                    where s.is_closer is true
-                    and s.set_name in ('Show', 'Set 1', 'Set 2', 'Encore')
-                    and s.song_id = %(song)s
-                    group by 1,2
-                    """,
-                    {"song": songs["id"]},
-                )
-
-                closers_list = await res.fetchall()
+                closers_list = columns.song_closers(songs["id"])
 
                 if len(closers_list) > 0:
                     embed = await bot_embed.create_embed(
@@ -220,7 +118,7 @@ class Stats(commands.Cog):
                     )
 
                     for i in closers_list:
-                        print(i)
+                        logger.debug("Closer row: %s", i)
                         embed.add_field(
                             name=i["position"],
                             value=i["count"],
@@ -251,22 +149,15 @@ class Stats(commands.Cog):
         tour: str,
     ) -> None:
         """Get list of show openers for given tour."""
-        async with (
-            await db.create_pool() as pool,
-            pool.connection() as conn,
-            conn.cursor(
-                row_factory=dict_row,
-            ) as cur,
-        ):
-            tour = await self.find_tour(cur, tour)
+        columns = await self.get_columns()
+        catalog = await self.get_catalog()
+
+        async with db.cursor(self.bot) as cur:
+            tour = await catalog.find(tour, cur)
 
             if tour:
-                stats = await self.get_tour_stats(
-                    cur,
-                    tour_id=tour["id"],
-                    position="Show Opener",
-                )
-                print(stats)
+                stats = columns.top(OPENER, ("Show",), tour_id=tour["id"])
+                logger.debug("Opener tour stats: %s", stats)
 
                 data = [
                     f"{index}. **{row['song_name']}** - *{row['total']} time(s)*"
@@ -294,20 +185,17 @@ class Stats(commands.Cog):
         tour: str,
     ) -> None:
         """Get list of closers by tour."""
-        async with (
-            await db.create_pool() as pool,
-            pool.connection() as conn,
-            conn.cursor(
-                row_factory=dict_row,
-            ) as cur,
-        ):
-            tour = await self.find_tour(cur, tour)
+        columns = await self.get_columns()
+        catalog = await self.get_catalog()
+
+        async with db.cursor(self.bot) as cur:
+            tour = await catalog.find(tour, cur)
 
             if tour:
-                stats = await self.get_tour_stats(
-                    cur,
+                stats = columns.top(
+                    CLOSER | LAST_IN_SHOW,
+                    MAIN_SETS,
                     tour_id=tour["id"],
-                    position="Show Closer",
                 )
 
                 data = [
@@ -336,50 +224,29 @@ class Stats(commands.Cog):
         year: str,
     ) -> None:
         """Get list of show openers for given year."""
-        async with (
-            await db.create_pool() as pool,
-            pool.connection() as conn,
-            conn.cursor(
-                row_factory=dict_row,
-            ) as cur,
-        ):
-            res = await cur.execute(
-                """
-                    SELECT
-                        s1.song_name,
-                        s.position,
-                        count(*) AS total
-                    FROM "setlists" s
-                    LEFT JOIN "events" e on e.id = s.event_id
-                    LEFT JOIN "songs" s1 ON s1.id = s.song_id
-                    WHERE s.is_opener = true and s.set_name = 'Show'
-                    AND to_char(e.event_date, 'YYYY') = %s
-                    GROUP BY s1.song_name, s.position
-                    ORDER BY count(*) DESC
-                    """,
-                (year,),
+        if year.isdigit():
+            stats = (await self.get_columns()).top(OPENER, ("Show",), year=int(year))
+        else:
+            stats = []
+
+        if stats:
+            data = [
+                f"{index}. **{row['song_name']}** - *{row['total']} time(s)*"
+                for index, row in enumerate(stats)
+            ]
+            await viewmenu.stats_menu(
+                ctx=ctx,
+                data=data,
+                title=f"Top Openers For: {year}",
+                rows=10,
+            )
+        else:
+            embed = await bot_embed.not_found_embed(
+                command="Stats",
+                message=f"Opener, Year: {year}",
             )
 
-            stats = await res.fetchall()
-
-            if stats:
-                data = [
-                    f"{index}. **{row['song_name']}** - *{row['total']} time(s)*"
-                    for index, row in enumerate(stats)
-                ]
-                await viewmenu.stats_menu(
-                    ctx=ctx,
-                    data=data,
-                    title=f"Top Openers For: {year}",
-                    rows=10,
-                )
-            else:
-                embed = await bot_embed.not_found_embed(
-                    command="Stats",
-                    message=f"Opener, Year: {year}",
-                )
-
-                await ctx.send(embed=embed)
+            await ctx.send(embed=embed)
 
     @closer.command(name="year", usage="<year>")
     async def closer_year_stats(
@@ -389,50 +256,32 @@ class Stats(commands.Cog):
         year: str,
     ) -> None:
         """Get list of closers by year."""
-        async with (
-            await db.create_pool() as pool,
-            pool.connection() as conn,
-            conn.cursor(
-                row_factory=dict_row,
-            ) as cur,
-        ):
-            res = await cur.execute(
-                """
-                    SELECT
-                        s1.song_name,
-                        s.position,
-                        count(*) AS total
-                    FROM "setlists" s
-                    LEFT JOIN "events" e on e.id = s.event_id
-                    LEFT JOIN "songs" s1 ON s1.id = s.song_id!op
-                    WHERE s.is_closer = true and s.is_last_in_show = true
-                    AND to_char(e.event_date, 'YYYY') = %s
-                    GROUP BY s1.song_name, s.position
-                    ORDER BY count(*) DESC
-                    """,
-                (year,),
+        if year.isdigit():
+            stats = (await self.get_columns()).top(
+                CLOSER | LAST_IN_SHOW,
+                year=int(year),
+            )
+        else:
+            stats = []
+
+        if stats:
+            data = [
+                f"{index}. **{row['song_name']}** - *{row['total']} time(s)*"
+                for index, row in enumerate(stats)
+            ]
+            await viewmenu.stats_menu(
+                ctx=ctx,
+                data=data,
+                title=f"Top Closers For: {year}",
+                rows=10,
+            )
+        else:
+            embed = await bot_embed.not_found_embed(
+                command="Stats",
+                message=f"Closer, Year: {year}",
             )
 
-            stats = await res.fetchall()
-
-            if stats:
-                data = [
-                    f"{index}. **{row['song_name']}** - *{row['total']} time(s)*"
-                    for index, row in enumerate(stats)
-                ]
-                await viewmenu.stats_menu(
-                    ctx=ctx,
-                    data=data,
-                    title=f"Top Closers For: {year}",
-                    rows=10,
-                )
-            else:
-                embed = await bot_embed.not_found_embed(
-                    command="Stats",
-                    message=f"Closer, Year: {year}",
-                )
-
-                await ctx.send(embed=embed)
+            await ctx.send(embed=embed)
 
 
 async def setup(bot: commands.Bot) -> None:
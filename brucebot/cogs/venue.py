@@ -2,7 +2,6 @@ import discord
 import psycopg
 from cogs.bot_stuff import bot_embed, db
 from discord.ext import commands
-from psycopg.rows import dict_row
 
 
 class Venue(commands.Cog):
@@ -89,13 +88,7 @@ class Venue(commands.Cog):
 
         Venue can be found by name or alias.
         """
-        async with (
-            await db.create_pool() as pool,
-            pool.connection() as conn,
-            conn.cursor(
-                row_factory=dict_row,
-            ) as cur,
-        ):
+        async with db.cursor(self.bot) as cur:
             venue = await self.venue_search(venue_query, cur)
 
             if venue is not None:
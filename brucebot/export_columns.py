@@ -0,0 +1,30 @@
+"""Write the setlist columns file the stats commands are served from.
+
+Run with the database to export from, the same way as the bot:
+`python brucebot/export_columns.py -db supabase`. A bot started against
+the same data maps the file instead of building it.
+"""
+
+import asyncio
+import logging
+
+from cogs.bot_stuff import db, executor, log, setlist_columns
+from psycopg.rows import dict_row
+
+
+async def export() -> None:
+    """Build the columns from the database, writing the file."""
+    async with (
+        await db.create_pool(1) as pool,
+        pool.connection() as conn,
+        conn.cursor(row_factory=dict_row) as cur,
+    ):
+        await setlist_columns.SetlistColumns().build(cur)
+
+
+if __name__ == "__main__":
+    log.setup()
+    asyncio.run(export())
+    executor.shutdown()
+
+    logging.getLogger(__name__).info("Exported to %s", setlist_columns.get_path())
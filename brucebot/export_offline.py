@@ -0,0 +1,19 @@
+"""Export the tables the bot reads to a local sqlite file.
+
+Run with the database to export from, the same way as the bot:
+`python brucebot/export_offline.py -db supabase`. Then start the bot with
+`-db offline` to serve from the export.
+"""
+
+import logging
+
+from cogs.bot_stuff import db, log, offline
+
+if __name__ == "__main__":
+    log.setup()
+
+    with db.load_db() as conn:
+        path = offline.get_path()
+        offline.export(conn, path)
+
+    logging.getLogger(__name__).info("Exported to %s", path)
@@ -1,65 +1,286 @@
 import asyncio
+import contextlib
+import gc
 import logging
+import multiprocessing
+import multiprocessing.connection
 import os
 import re
 import sys
+import time
+from collections.abc import Awaitable
 from pathlib import Path
+from typing import Any
 
 import discord
-from cogs._help import MyHelp
-from cogs.bot_stuff import db
-from discord.ext import commands
+from cogs._help import MyHelp, build_help
+from cogs.bot_stuff import (
+    assets,
+    cluster,
+    db,
+    executor,
+    log,
+    ratelimit,
+    replicas,
+    scheduler,
+    snapshot,
+    utils,
+    viewmenu,
+)
+from cogs.bot_stuff.album_stats import AlbumStats
+from cogs.bot_stuff.archive_feed import ArchiveFeed
+from cogs.bot_stuff.artifact_index import ArtifactIndex
+from cogs.bot_stuff.db_counters import DbCounters
+from cogs.bot_stuff.locations import Locations
+from cogs.bot_stuff.setlist_columns import SetlistColumns
+from cogs.bot_stuff.setlist_index import SetlistIndex
+from cogs.bot_stuff.snippet_index import SnippetIndex
+from cogs.bot_stuff.tour_catalog import TourCatalog
+from cogs.bot_stuff.venue_index import VenueIndex
+from discord.ext import commands, tasks
 from dotenv import load_dotenv
 
 COGS_PATH = os.path.join(os.path.dirname(__file__), "cogs")
 # COGS_PATH = Path(__file__).parent / "cogs"
 
+# built once before forking clusters, so every process shares their pages
+SHARED_SNAPSHOTS = (
+    AlbumStats,
+    ArchiveFeed,
+    ArtifactIndex,
+    DbCounters,
+    Locations,
+    SetlistColumns,
+    SetlistIndex,
+    SnippetIndex,
+    TourCatalog,
+    VenueIndex,
+)
+
+# how long commands wait for warmup before running without it (seconds)
+WARMUP_WAIT = 15
 
-class BruceBot(commands.Bot):
-    """Custom Discord.py Bot implementation."""
 
-    logging.basicConfig(format="%(message)s", level=logging.INFO)
+class BruceBot(commands.AutoShardedBot):
+    """Custom Discord.py Bot implementation."""
 
-    def __init__(self, prefix: str, ext_dir: Path) -> None:
-        """Initialize custom bot."""
+    def __init__(  # noqa: PLR0913
+        self,
+        prefix: str,
+        ext_dir: Path,
+        *,
+        shard_ids: list[int] | None = None,
+        shard_count: int | None = None,
+        pool_size: int = cluster.DEFAULT_CONNECTION_BUDGET,
+        snapshots: dict | None = None,
+    ) -> None:
+        """Initialize custom bot, optionally running only some shards."""
         intents = discord.Intents.default()
         intents.message_content = True
 
-        super().__init__(command_prefix=prefix, intents=intents, case_insensitive=True)
+        super().__init__(
+            command_prefix=prefix,
+            intents=intents,
+            case_insensitive=True,
+            shard_ids=shard_ids,
+            shard_count=shard_count,
+        )
         self.logger = logging.getLogger(self.__class__.__name__)
         self.ext_dir = ext_dir
         self.testing_channel = [1250545846160982047]
         self.testing_server = 735698850802565171
+        self.pool_size = pool_size
+        self.snapshots = dict(snapshots or {})
+        self.help_embeds: dict[str, str] = {}
+        self.rate_limiter = ratelimit.RateLimiter()
+        self.warm = asyncio.Event()
+        self.started = time.perf_counter()
+        self.before_invoke(self.before_command)
+
+    def log_phase(self, phase: str, start: float) -> None:
+        """Log how long a startup phase took, and the total so far."""
+        now = time.perf_counter()
+        self.logger.info(
+            "%s in %.2fs (%.2fs since start)",
+            phase,
+            now - start,
+            now - self.started,
+        )
+
+    async def load_extension_file(self, filename: Path) -> None:
+        """Load a single cog, logging rather than raising on failure."""
+        try:
+            await self.load_extension(f"cogs.{filename.stem}")
+            self.logger.info("Loaded extension %s", filename.stem)
+        except commands.ExtensionError:
+            self.logger.exception("Failed to load extension %s", filename.stem)
 
     async def load_extensions(self) -> None:
-        """Load cogs from specified cog folder."""
+        """Load cogs from specified cog folder, all at once."""
         if not self.ext_dir.is_dir():
             logging.info("Extension directory %s does not exist.", self.ext_dir)
             return
-        for filename in self.ext_dir.iterdir():
-            if filename.suffix == ".py" and not filename.name.startswith("_"):
-                try:
-                    await self.load_extension(f"cogs.{filename.stem}")
-                    self.logger.info("Loaded extension %s", filename.stem)
-                except commands.ExtensionError:
-                    self.logger.exception("Failed to load extension %s", filename.stem)
+
+        start = time.perf_counter()
+
+        await asyncio.gather(
+            *(
+                self.load_extension_file(filename)
+                for filename in sorted(self.ext_dir.iterdir())
+                if filename.suffix == ".py" and not filename.name.startswith("_")
+            ),
+        )
+
+        self.log_phase(f"Loaded {len(self.extensions)} extensions", start)
+
+    async def add_cog(self, cog: commands.Cog, /, **kwargs: Any) -> None:  # noqa: ANN401
+        """Add a cog, clearing the prebuilt help embeds."""
+        await super().add_cog(cog, **kwargs)
+        self.help_embeds = {}
+
+    async def remove_cog(
+        self,
+        name: str,
+        /,
+        **kwargs: Any,  # noqa: ANN401
+    ) -> commands.Cog | None:
+        """Remove a cog, clearing the prebuilt help embeds."""
+        cog = await super().remove_cog(name, **kwargs)
+        self.help_embeds = {}
+        return cog
+
+    async def open_pool(self) -> None:
+        """Open the database pools and the scheduler in front of them."""
+        start = time.perf_counter()
+
+        self.pool = await db.create_pool(self.pool_size)
+        await self.pool.open()
+
+        # lookups read from replicas when there are any, see db.cursor
+        replica_pools = db.create_replica_pools(self.pool_size)
+        self.replicas = replicas.ReplicaSet(
+            self.pool,
+            [
+                replicas.Replica(f"replica-{number}", pool)
+                for number, pool in enumerate(replica_pools)
+            ],
+        )
+        await self.replicas.open()
+
+        # every query waits its turn here before taking a connection
+        self.scheduler = scheduler.Scheduler(self.pool.max_size)
+
+        self.log_phase("Opened database pool", start)
+
+    def warmup_snapshots(self) -> list[type[snapshot.Snapshot]]:
+        """Snapshots to build during warmup.
+
+        Set by WARMUP, either "all" (default), "none", or a comma separated
+        list of snapshot names, e.g. "SetlistIndex,TourCatalog".
+        """
+        setting = os.getenv("WARMUP", "all").strip()
+
+        if setting == "all":
+            return list(SHARED_SNAPSHOTS)
+
+        names = {name.strip() for name in setting.split(",")}
+        return [cls for cls in SHARED_SNAPSHOTS if cls.__name__ in names]
+
+    async def warmup(self) -> None:
+        """Build help, snapshots and executor workers before serving commands."""
+        start = time.perf_counter()
+
+        async def warm(name: str, coro: Awaitable) -> None:
+            phase_start = time.perf_counter()
+
+            try:
+                await coro
+                self.log_phase(f"Warmed {name}", phase_start)
+            except Exception:
+                self.logger.exception("Failed to warm %s", name)
+
+        self.help_embeds = build_help(self)
+        self.log_phase("Built help embeds", start)
+
+        try:
+            await asyncio.gather(
+                *(
+                    warm(cls.__name__, snapshot.get(self, cls))
+                    for cls in self.warmup_snapshots()
+                ),
+                # first dateparser call in a worker loads all its language data
+                warm("executor", utils.date_parsing("today")),
+                warm("image manifest", executor.run_thread(assets.get_manifest)),
+            )
+        finally:
+            self.warm.set()
+
+        self.log_phase("Warmup finished", start)
+
+    async def invoke(self, ctx: commands.Context) -> None:
+        """Invoke a command, with its details attached to any logging."""
+        log.set_command(ctx)
+        await super().invoke(ctx)
+
+    async def before_command(self, ctx: commands.Context) -> None:
+        """Run before every command, after its checks have passed."""
+        # groups run this for the group and again for the subcommand, only
+        # the subcommand is charged so its cost is the one that counts
+        if getattr(ctx, "rate_limited", False) or ratelimit.subcommand_pending(ctx):
+            return
+
+        ctx.rate_limited = True
+
+        # slash commands don't go through invoke
+        if log.command_context.get() is None:
+            log.set_command(ctx)
+
+        if not await self.is_owner(ctx.author):
+            self.rate_limiter.check(ctx)
+
+        if not self.warm.is_set():
+            # past the wait, run anyway and let caches fill on demand
+            with contextlib.suppress(TimeoutError):
+                await asyncio.wait_for(self.warm.wait(), WARMUP_WAIT)
 
     async def on_ready(self) -> None:
         """Send when bot is online and ready."""
-        self.logger.info("Logged in as %s", self.user)
+        self.logger.info("Logged in as %s (shards %s)", self.user, list(self.shards))
+        self.log_phase("Connected", self.started)
 
     async def close(self) -> None:
         """Close bot on keyboard interrupt."""
+        self.refresh_snapshots.cancel()
+        self.check_replicas.cancel()
         await super().close()
+        await self.replicas.close()
         await self.pool.close()
+        executor.shutdown()
 
     async def setup_hook(self) -> None:
-        """Load cogs from directory."""
-        await self.load_extensions()
+        """Load cogs and open the pool together, then start warming up."""
+        await asyncio.gather(self.load_extensions(), self.open_pool())
 
-        # opening connection pool to database
-        self.pool = await db.create_pool()
-        await self.pool.open()
+        # page buttons answer clicks on any menu, even ones sent before a restart
+        self.add_dynamic_items(viewmenu.PageButton)
+
+        # runs while connecting to discord, commands wait for it in before_command
+        self.warmup_task = asyncio.create_task(self.warmup())
+
+        self.refresh_snapshots.start()
+
+        if self.replicas.replicas:
+            self.check_replicas.start()
+
+    @tasks.loop(minutes=5)
+    async def refresh_snapshots(self) -> None:
+        """Rebuild any in-memory snapshots whose tables have changed."""
+        await snapshot.refresh_all(self)
+
+    @tasks.loop(seconds=15)
+    async def check_replicas(self) -> None:
+        """Check replica lag, moving reads off any that fall behind."""
+        await self.replicas.check()
 
     async def on_message(self, message: discord.Message) -> None:
         """When message sent."""
@@ -94,11 +315,75 @@ class BruceBot(commands.Bot):
 if sys.platform == "win32":
     asyncio.set_event_loop_policy(asyncio.WindowsSelectorEventLoopPolicy())
 
-bot = BruceBot(prefix="!", ext_dir=Path(Path(__file__).parent, "cogs"))
 
-attributes = {"name": "bhelp"}
+def run_cluster(
+    config: cluster.ClusterConfig,
+    number: int,
+    snapshots: dict,
+) -> None:
+    """Run one bot process, with its share of the shards and connections."""
+    log.setup()
+
+    bot = BruceBot(
+        prefix="!",
+        ext_dir=Path(Path(__file__).parent, "cogs"),
+        shard_ids=config.shard_ids[number] if config.clusters > 1 else None,
+        shard_count=config.shard_count,
+        pool_size=config.pool_size,
+        snapshots=snapshots,
+    )
+
+    attributes = {"name": "bhelp"}
+
+    bot.help_command = MyHelp(command_attrs=attributes)
+
+    asyncio.run(bot.run_bot())
+
+
+async def prefill_snapshots(pool_size: int) -> dict:
+    """Build the shared snapshots with a temporary pool."""
+    async with await db.create_pool(pool_size) as pool:
+        return await snapshot.prefill(pool, SHARED_SNAPSHOTS)
+
+
+def run_clusters(config: cluster.ClusterConfig) -> None:
+    """Fork a process per cluster, stopping them all once any of them exits."""
+    snapshots = asyncio.run(prefill_snapshots(config.pool_size))
+    assets.get_manifest()
+
+    # worker threads don't survive a fork, each cluster starts its own
+    executor.shutdown()
+
+    # keep the gc from touching (and so copying) the snapshots in each process
+    gc.freeze()
+
+    context = multiprocessing.get_context("fork")
+    processes = [
+        context.Process(
+            target=run_cluster,
+            args=(config, number, snapshots),
+            name=f"cluster-{number}",
+        )
+        for number in range(config.clusters)
+    ]
+
+    for process in processes:
+        process.start()
+
+    with contextlib.suppress(KeyboardInterrupt):
+        multiprocessing.connection.wait([process.sentinel for process in processes])
+
+    for process in processes:
+        process.terminate()
+        process.join()
 
-bot.help_command = MyHelp(command_attrs=attributes)
 
+# guarded since executor worker processes import this module again
+if __name__ == "__main__":
+    log.setup()
+    config = cluster.load_config()
 
-asyncio.run(bot.run_bot())
+    if config.clusters > 1:
+        run_clusters(config)
+    else:
+        run_cluster(config, 0, {})
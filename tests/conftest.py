@@ -0,0 +1,50 @@
+import datetime
+import sqlite3
+from collections.abc import Callable
+from pathlib import Path
+
+import pytest
+
+COLUMN_TYPES = {bool: "INTEGER", int: "INTEGER", float: "REAL", datetime.date: "DATE"}
+
+
+def write_export(path: Path, tables: dict[str, list[dict]]) -> Path:
+    """Write an offline export holding `tables`, like export_offline.py does.
+
+    Column types come from the first row. The change counters are one
+    insert per row, with no updates or deletes.
+    """
+    lite = sqlite3.connect(path)
+
+    with lite:
+        lite.execute(
+            """
+            CREATE TABLE pg_stat_user_tables (
+                relname TEXT, n_tup_ins INTEGER, n_tup_upd INTEGER, n_tup_del INTEGER
+            )
+            """,
+        )
+
+        for table, rows in tables.items():
+            columns = ", ".join(
+                f'"{name}" {COLUMN_TYPES.get(type(value), "TEXT")}'
+                for name, value in rows[0].items()
+            )
+            lite.execute(f'CREATE TABLE "{table}" ({columns})')
+            lite.executemany(
+                f'INSERT INTO "{table}" VALUES ({", ".join("?" * len(rows[0]))})',  # noqa: S608
+                [tuple(row.values()) for row in rows],
+            )
+            lite.execute(
+                "INSERT INTO pg_stat_user_tables VALUES (?, ?, 0, 0)",
+                (table, len(rows)),
+            )
+
+    lite.close()
+    return path
+
+
+@pytest.fixture
+def export(tmp_path: Path) -> Callable[[dict[str, list[dict]]], Path]:
+    """Make offline exports of small fixture tables."""
+    return lambda tables: write_export(tmp_path / "export.sqlite3", tables)
@@ -0,0 +1,156 @@
+import asyncio
+import sqlite3
+from collections.abc import Callable
+from pathlib import Path
+
+import pytest
+from cogs.bot_stuff.album_stats import AlbumStats
+from cogs.bot_stuff.offline import OfflinePool
+
+BORN_TO_RUN, DARKNESS = 1, 2
+THUNDER_ROAD, BACKSTREETS, BADLANDS = 1, 2, 3
+
+TABLES = {
+    "songs": [
+        {"id": THUNDER_ROAD, "uuid": "thunder-road", "song_name": "Thunder Road"},
+        {"id": BACKSTREETS, "uuid": "backstreets", "song_name": "Backstreets"},
+        {"id": BADLANDS, "uuid": "badlands", "song_name": "Badlands"},
+    ],
+    "release_tracks": [
+        {"release_id": BORN_TO_RUN, "song_id": THUNDER_ROAD},
+        {"release_id": BORN_TO_RUN, "song_id": BACKSTREETS},
+        {"release_id": DARKNESS, "song_id": BADLANDS},
+    ],
+    "setlists": [
+        {"id": row, "song_id": song, "set_name": set_name}
+        for row, (song, set_name) in enumerate(
+            [
+                (THUNDER_ROAD, "Show"),
+                (BACKSTREETS, "Show"),
+                (THUNDER_ROAD, "Encore"),
+                (BADLANDS, "Set 1"),
+                (BACKSTREETS, "Soundcheck"),
+            ],
+            start=1,
+        )
+    ],
+}
+
+
+class Database:
+    """An offline export that can be written to between refreshes."""
+
+    def __init__(self, path: Path) -> None:
+        """Init database on an export."""
+        self.path = path
+
+    def change(self, query: str, params: tuple, counter: str) -> None:
+        """Run a change on setlists, counting it like postgres would."""
+        with sqlite3.connect(self.path) as lite:
+            changed = lite.execute(query, params).rowcount
+            lite.execute(
+                f"UPDATE pg_stat_user_tables SET {counter} = {counter} + ?"  # noqa: S608
+                " WHERE relname = 'setlists'",
+                (changed,),
+            )
+
+        lite.close()
+
+    async def load(self, stats: AlbumStats) -> bool:
+        """Refresh stats from the database."""
+        async with (
+            OfflinePool(self.path) as pool,
+            pool.connection() as conn,
+            conn.cursor() as cur,
+        ):
+            return await stats.load(cur)
+
+
+def state(stats: AlbumStats) -> tuple:
+    """Get everything the stats answer with, to compare two of them."""
+    return stats.plays, stats.releases, stats.setlist_rows, stats.track_rows
+
+
+@pytest.fixture
+def db(export: Callable[[dict[str, list[dict]]], Path]) -> Database:
+    """Make a database of two releases and a few setlist rows."""
+    return Database(export(TABLES))
+
+
+def refresh(db: Database, stats: AlbumStats) -> tuple[bool, int]:
+    """Refresh stats, returns if they changed and how many times they rebuilt."""
+    builds = 0
+    build = stats.build
+
+    async def counted(cur: object) -> None:
+        nonlocal builds
+        builds += 1
+        await build(cur)
+
+    stats.build = counted
+
+    try:
+        return asyncio.run(db.load(stats)), builds
+    finally:
+        del stats.build
+
+
+def rebuilt(db: Database) -> AlbumStats:
+    """Build stats from scratch."""
+    stats = AlbumStats()
+    asyncio.run(db.load(stats))
+    return stats
+
+
+def test_new_shows_counted_incrementally(db: Database) -> None:
+    """Added setlist rows are counted without a rebuild, same as one would."""
+    stats = rebuilt(db)
+    assert stats.find(BORN_TO_RUN)["most"]["song_name"] == "Thunder Road"
+
+    db.change(
+        "INSERT INTO setlists VALUES (6, ?, 'Show'), (7, ?, 'Show'), (8, ?, 'Show')",
+        (BACKSTREETS, BACKSTREETS, BADLANDS),
+        "n_tup_ins",
+    )
+
+    assert refresh(db, stats) == (True, 0)
+    assert state(stats) == state(rebuilt(db))
+    assert stats.find(BORN_TO_RUN)["most"]["song_name"] == "Backstreets"
+
+
+def test_unchanged(db: Database) -> None:
+    """Nothing is reread when the tables haven't changed."""
+    stats = rebuilt(db)
+
+    assert refresh(db, stats) == (False, 0)
+
+
+def test_update_rebuilds(db: Database) -> None:
+    """A corrected setlist row moves its play to the right song."""
+    stats = rebuilt(db)
+
+    db.change(
+        "UPDATE setlists SET song_id = ? WHERE id = 4",
+        (BACKSTREETS,),
+        "n_tup_upd",
+    )
+
+    assert refresh(db, stats) == (True, 1)
+    assert state(stats) == state(rebuilt(db))
+    assert stats.plays[BADLANDS] == 0
+
+
+def test_delete_and_insert_rebuilds(db: Database) -> None:
+    """A row deleted and inserted again, under its old id, is caught."""
+    stats = rebuilt(db)
+
+    db.change("DELETE FROM setlists WHERE id = 1", (), "n_tup_del")
+    db.change(
+        "INSERT INTO setlists VALUES (1, ?, 'Show')",
+        (BADLANDS,),
+        "n_tup_ins",
+    )
+
+    assert refresh(db, stats) == (True, 1)
+    assert state(stats) == state(rebuilt(db))
+    assert stats.plays[THUNDER_ROAD] == 1
@@ -0,0 +1,72 @@
+import datetime
+
+from cogs.bot_stuff.archive_feed import OVERLAP, ArchiveFeed
+
+NOON = datetime.datetime(2024, 5, 1, 12, tzinfo=datetime.UTC)
+
+
+def link(url: str, created_at: datetime.datetime) -> dict:
+    """Make an archive link row, as the feed's query returns them."""
+    return {
+        "event_date": datetime.date(1978, 9, 19),
+        "event_id": "19780919-01",
+        "venue_id": 1,
+        "archive_url": url,
+        "created_at": created_at,
+    }
+
+
+def urls(links: list[dict]) -> list[str]:
+    """Get the urls of some links."""
+    return [link["archive_url"] for link in links]
+
+
+def test_same_timestamp() -> None:
+    """A link sharing the mark's timestamp is added once, when it shows up."""
+    feed = ArchiveFeed()
+    assert urls(feed.add([link("first", NOON)])) == ["first"]
+
+    polled = [link("second", NOON), link("first", NOON)]
+    assert urls(feed.add(polled)) == ["second"]
+    assert feed.add(polled) == []
+    assert feed.since == NOON
+
+
+def test_late_commit_in_window() -> None:
+    """A link that commits after a newer one, inside the window, isn't missed."""
+    feed = ArchiveFeed()
+    feed.add([link("newer", NOON)])
+
+    late = link("late", NOON - datetime.timedelta(minutes=2))
+    assert urls(feed.add([link("newer", NOON), late])) == ["late"]
+
+    # the mark doesn't go back for it
+    assert feed.since == NOON
+    assert feed.latest[0]["row"].startswith("[late]")
+    assert feed.latest[1]["row"].startswith("[newer]")
+
+
+def test_outside_window_forgotten() -> None:
+    """Links older than the window before the mark are no longer remembered."""
+    feed = ArchiveFeed()
+    feed.add([link("old", NOON), link("older", NOON - OVERLAP)])
+    assert set(feed.seen) == {"old", "older"}
+
+    later = NOON + OVERLAP + datetime.timedelta(seconds=1)
+    assert urls(feed.add([link("later", later)])) == ["later"]
+    assert set(feed.seen) == {"later"}
+
+    # the window is inclusive at its start
+    edge = later - OVERLAP
+    feed.add([link("edge", edge), link("later", later)])
+    assert set(feed.seen) == {"later", "edge"}
+
+
+def test_nothing_new() -> None:
+    """A poll with nothing in it keeps the mark and what's remembered."""
+    feed = ArchiveFeed()
+    feed.add([link("first", NOON)])
+
+    assert feed.add([]) == []
+    assert feed.since == NOON
+    assert set(feed.seen) == {"first"}
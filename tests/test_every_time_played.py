@@ -0,0 +1,155 @@
+import asyncio
+import datetime
+from collections.abc import Callable
+from pathlib import Path
+from types import SimpleNamespace
+
+import cogs
+import discord
+import pytest
+from cogs.bot_stuff import viewmenu
+from cogs.bot_stuff.offline import OfflinePool
+from cogs.bot_stuff.setlist_index import SetlistIndex
+from cogs.bot_stuff.venue_index import VenueIndex
+from cogs.every_time_played import EveryTimePlayed
+
+from main import BruceBot
+
+COGS = Path(cogs.__file__).parent
+
+THUNDER_ROAD, BACKSTREETS = 1, 2
+
+# enough shows for two pages of ten
+SHOWS = 12
+
+
+@pytest.fixture
+def bot(export: Callable[[dict[str, list[dict]]], Path]) -> BruceBot:
+    """Make a bot with the etp snapshots built from shows opening with a pair."""
+    path = export(
+        {
+            "events": [
+                {
+                    "id": show,
+                    "event_id": f"1978{show:04d}-01",
+                    "event_date": datetime.date(1978, 6, show),
+                    "venue_id": 1,
+                }
+                for show in range(1, SHOWS + 1)
+            ],
+            "setlists": [
+                {"event_id": show, "song_id": song, "set_name": "Show", "position": at}
+                for show in range(1, SHOWS + 1)
+                for at, song in enumerate((THUNDER_ROAD, BACKSTREETS), start=1)
+            ],
+            "songs": [
+                {"id": THUNDER_ROAD, "song_name": "Thunder Road"},
+                {"id": BACKSTREETS, "song_name": "Backstreets"},
+            ],
+            "venues": [{"id": 1, "uuid": "roxy", "name": "The Roxy", "city": 1}],
+            "venues_text": [{"id": 1, "full_location": "The Roxy, Los Angeles"}],
+            "cities": [{"id": 1, "name": "Los Angeles", "state": 1, "country": 2}],
+            "states": [{"id": 1, "name": "California", "state_abbrev": "CA"}],
+            "countries": [{"id": 2, "name": "United States"}],
+        },
+    )
+
+    async def build() -> BruceBot:
+        bot = BruceBot("!", COGS)
+
+        async with (
+            OfflinePool(path) as pool,
+            pool.connection() as conn,
+            conn.cursor() as cur,
+        ):
+            for snapshot in (SetlistIndex, VenueIndex):
+                bot.snapshots[snapshot] = snapshot()
+                await bot.snapshots[snapshot].load(cur)
+
+        await bot.add_cog(EveryTimePlayed(bot))
+        return bot
+
+    return asyncio.run(build())
+
+
+async def click(bot: BruceBot, button: discord.ui.Item) -> dict:
+    """Click a page button as discord would, from its custom_id alone."""
+    edited = {}
+
+    async def edit_message(**kwargs: object) -> None:
+        edited.update(kwargs)
+
+    interaction = SimpleNamespace(
+        client=bot,
+        response=SimpleNamespace(edit_message=edit_message),
+    )
+    match = viewmenu.PageButton.__discord_ui_compiled_template__.fullmatch(
+        button.custom_id,
+    )
+    clicked = await viewmenu.PageButton.from_custom_id(interaction, button, match)
+    await clicked.callback(interaction)
+
+    return edited
+
+
+def test_extension_loads() -> None:
+    """The etp cog is picked up by the loader and registers its command."""
+
+    async def run() -> None:
+        bot = BruceBot("!", COGS)
+        found = []
+
+        async def load_extension_file(filename: Path) -> None:
+            found.append(filename.stem)
+
+        # only load the one under test, the others need a logged in bot
+        bot.load_extension_file = load_extension_file
+        await bot.load_extensions()
+        assert "every_time_played" in found
+
+        await bot.load_extension("cogs.every_time_played")
+        assert "cogs.every_time_played" in bot.extensions
+        assert bot.get_command("etp") is not None
+
+    asyncio.run(run())
+
+
+def test_song_pages(bot: BruceBot) -> None:
+    """A song's performances page through the registered etp source."""
+
+    async def run() -> None:
+        source = await viewmenu.page_sources["etp"](bot, str(THUNDER_ROAD))
+        assert source.pages == 2  # noqa: PLR2004
+
+        first = await source.get_page(0)
+        assert first.title == f"Every time Thunder Road was played ({SHOWS})"
+        assert first.description.splitlines()[0] == (
+            "1. [1978-06-01 [Thu] - The Roxy, Los Angeles]"
+            "(https://www.databruce.com/events/19780001-01) (Show #1)"
+        )
+
+        _, forward = viewmenu.page_view("etp", str(THUNDER_ROAD), 0, source).children
+        edited = await click(bot, forward)
+
+        rows = edited["embed"].description.splitlines()
+        assert len(rows) == SHOWS - 10
+        assert rows[0].startswith("11. [1978-06-11 [Sun]")
+
+    asyncio.run(run())
+
+
+def test_chain_pages(bot: BruceBot) -> None:
+    """A chain of songs pages back around from the first page."""
+
+    async def run() -> None:
+        args = f"{THUNDER_ROAD}>{BACKSTREETS}"
+        source = await viewmenu.page_sources["etp"](bot, args)
+
+        back, _ = viewmenu.page_view("etp", args, 0, source).children
+        edited = await click(bot, back)
+
+        title = "Times that Thunder Road was followed by Backstreets"
+        assert edited["embed"].title == title
+        assert edited["embed"].description.startswith("11. ")
+
+    asyncio.run(run())
@@ -0,0 +1,192 @@
+import asyncio
+import datetime
+from collections.abc import Callable
+from pathlib import Path
+
+import pytest
+from cogs import on_this_day, relation, song
+from cogs.bot_stuff import utils
+from cogs.bot_stuff.offline import OfflinePool, OfflineUnsupportedError, translate
+
+TABLES = {
+    "bands": [{"id": 1, "name": "Bruce Springsteen & The E Street Band"}],
+    "events": [
+        {
+            "id": event,
+            "event_id": event_id,
+            "event_date": date,
+            "event_type": "Concert",
+            "artist": 1,
+            "venue_id": 1,
+            "tour_id": tour,
+            "is_stats_eligible": True,
+        }
+        for event, event_id, date, tour in (
+            (1, "19780601-01", datetime.date(1978, 6, 1), 1),
+            (2, "19780602-01", datetime.date(1978, 6, 2), 1),
+            (3, "19800601-01", datetime.date(1980, 6, 1), 2),
+            (4, "20990101-01", datetime.date(2099, 1, 1), 2),
+        )
+    ],
+    "songs": [
+        {
+            "id": 1,
+            "uuid": "thunder-road",
+            "song_name": "Thunder Road",
+            "num_plays_public": 3,
+            "first_event": 1,
+            "last_event": 3,
+            "album": 1,
+        },
+        {
+            "id": 2,
+            "uuid": "backstreets",
+            "song_name": "Backstreets",
+            "num_plays_public": 1,
+            "first_event": 1,
+            "last_event": 1,
+            "album": 2,
+        },
+    ],
+    "releases": [
+        {
+            "id": 1,
+            "name": "Born To Run",
+            "release_date": datetime.date(1975, 8, 25),
+            "mbid": "born-to-run",
+        },
+    ],
+    "setlists": [
+        {"event_id": event, "song_id": song_id, "set_name": set_name, "position": 1}
+        for event, song_id, set_name in (
+            (1, 1, "Show"),
+            (1, 2, "Encore"),
+            (2, 1, "Show"),
+            (3, 1, "Set 1"),
+            (3, 2, "Soundcheck"),
+        )
+    ],
+    "tours": [
+        {"id": 1, "tour_name": "Darkness Tour"},
+        {"id": 2, "tour_name": "The River Tour"},
+    ],
+}
+
+
+@pytest.mark.parametrize(
+    ("query", "params", "expected", "expected_params"),
+    [
+        (
+            "SELECT e.event_date::text FROM events e",
+            {},
+            "SELECT CAST(e.event_date AS TEXT) FROM events e",
+            {},
+        ),
+        ("WHERE event_date < NOW()", {}, "WHERE event_date < CURRENT_DATE", {}),
+        ("string_agg(r.name, ',')", {}, "group_concat(r.name, ',')", {}),
+        (
+            "EXTRACT(year FROM e.event_date)",
+            {},
+            "CAST(strftime('%Y', e.event_date) AS INTEGER)",
+            {},
+        ),
+        (
+            "to_char(MIN(e.event_date), 'YYYY')",
+            {},
+            "strftime('%Y', MIN(e.event_date))",
+            {},
+        ),
+        (
+            "WHERE set_name = ANY(%(sets)s) AND id > %(last)s",
+            {"sets": ["Show", "Encore"], "last": 3},
+            "WHERE set_name IN (:sets_0, :sets_1) AND id > :last",
+            {"sets_0": "Show", "sets_1": "Encore", "last": 3},
+        ),
+        (
+            "LIKE '%%' || %(query)s || '%%'",
+            {"query": "road"},
+            "LIKE '%' || :query || '%'",
+            {"query": "road"},
+        ),
+        ("extensions.SIMILARITY(a, b)", {}, "SIMILARITY(a, b)", {}),
+    ],
+)
+def test_translate(
+    query: str,
+    params: dict,
+    expected: str,
+    expected_params: dict,
+) -> None:
+    """Postgres syntax is rewritten into sqlite's."""
+    assert translate(query, params) == (expected, expected_params)
+
+
+@pytest.mark.parametrize(
+    ("query", "params", "expected"),
+    [
+        (
+            on_this_day.OTD_QUERY,
+            {"date": "%-06-01", "after": "", "limit": 10},
+            [{"key": "19780601-01"}, {"key": "19800601-01"}],
+        ),
+        (
+            song.SONG_INFO,
+            {"song": 1},
+            [{"first_date": "1978-06-01", "last_date": "1980-06-01", "frequency": 75}],
+        ),
+        (
+            song.FIRST_RELEASE,
+            {"song": 1},
+            [{"name": "Born To Run", "release_date": datetime.date(1975, 8, 25)}],
+        ),
+        (song.FIRST_RELEASE, {"song": 2}, []),
+        # the 2099 show hasn't happened yet
+        (song.SHOW_GAP, {"song": 2}, [{"gap": 2}]),
+        (
+            song.COUNT_BY_YEAR,
+            {"song": 1},
+            [{"year": 1978, "count": 2}, {"year": 1980, "count": 1}],
+        ),
+        (
+            song.COUNT_BY_TOUR,
+            {"song": 1},
+            [
+                {"years": "1978", "tour": "Darkness Tour", "count": 2},
+                {"years": "1980", "tour": "The River Tour", "count": 1},
+            ],
+        ),
+        (utils.SONG_SEARCH_OFFLINE, {"query": "thunder"}, [{"id": 1}]),
+        (utils.SONG_SEARCH_OFFLINE, {"query": "Backstreet"}, [{"id": 2}]),
+        (utils.SONG_SEARCH_OFFLINE, {"query": "Jungleland"}, []),
+    ],
+)
+def test_queries(
+    export: Callable[[dict[str, list[dict]]], Path],
+    query: str,
+    params: dict,
+    expected: list[dict],
+) -> None:
+    """The cogs' postgres queries give the same answers from an export."""
+
+    async def run() -> list[dict]:
+        async with (
+            OfflinePool(export(TABLES)) as pool,
+            pool.connection() as conn,
+            conn.cursor() as cur,
+        ):
+            res = await cur.execute(query, params)
+            return await res.fetchall()
+
+    rows = asyncio.run(run())
+
+    assert len(rows) == len(expected)
+
+    for row, want in zip(rows, expected, strict=True):
+        assert {name: row[name] for name in want} == want
+
+
+@pytest.mark.parametrize("query", [utils.SONG_SEARCH, relation.RELATION_SEARCH])
+def test_full_text_search_refused(query: str) -> None:
+    """Queries using full text search are refused rather than sent to sqlite."""
+    with pytest.raises(OfflineUnsupportedError):
+        translate(query, {"query": "clarence"})
@@ -0,0 +1,95 @@
+import asyncio
+import contextlib
+from pathlib import Path
+from types import SimpleNamespace
+
+import pytest
+from cogs import song
+from cogs.bot_stuff import db
+from discord.ext import commands
+from discord.ext.commands.view import StringView
+
+from main import BruceBot
+
+USER_ID = 1
+
+
+class StopCommandError(Exception):
+    """Raised in place of opening a cursor, the command body isn't tested."""
+
+
+class Grouped(commands.Cog):
+    """A group that runs before its subcommands, like prefix groups can."""
+
+    @commands.group(name="grouped", invoke_without_command=False)
+    async def grouped(self, ctx: commands.Context) -> None:
+        """Do nothing, the group itself."""
+
+    @grouped.command(name="costly", extras={"cost": 3})
+    async def costly(self, ctx: commands.Context, *, song: str = "") -> None:
+        """Do nothing, at a cost."""
+
+
+def make_context(bot: BruceBot, content: str) -> commands.Context:
+    """Build the context discord.py would for a prefix message."""
+    message = SimpleNamespace(
+        id=1,
+        content=content,
+        attachments=[],
+        author=SimpleNamespace(id=USER_ID),
+        channel=SimpleNamespace(id=2),
+        guild=None,
+        _state=None,
+    )
+    view = StringView(content)
+    view.skip_string("!")
+    invoked_with = view.get_word()
+
+    return commands.Context(
+        message=message,
+        bot=bot,
+        view=view,
+        prefix="!",
+        invoked_with=invoked_with,
+        command=bot.get_command(invoked_with),
+    )
+
+
+def tokens_taken(content: str, monkeypatch: pytest.MonkeyPatch) -> float:
+    """Run a command through the bot and get how many user tokens it took."""
+
+    def cursor(*_args: object, **_kwargs: object) -> None:
+        raise StopCommandError
+
+    monkeypatch.setattr(db, "cursor", cursor)
+
+    async def run() -> float:
+        bot = BruceBot("!", Path(__file__))
+        bot.owner_id = USER_ID + 1
+        bot.warm.set()
+        await bot.add_cog(song.Song(bot))
+        await bot.add_cog(Grouped())
+
+        with contextlib.suppress(commands.CommandInvokeError):
+            ctx = make_context(bot, content)
+            await ctx.command.invoke(ctx)
+
+        bucket = bot.rate_limiter.bucket("user", USER_ID)
+        return bucket.size - bucket.tokens
+
+    return asyncio.run(run())
+
+
+def test_subcommand_cost(monkeypatch: pytest.MonkeyPatch) -> None:
+    """A prefix subcommand is charged its own cost, not its group's."""
+    assert tokens_taken("!song tour x", monkeypatch) == pytest.approx(3, abs=0.1)
+
+
+def test_group_cost(monkeypatch: pytest.MonkeyPatch) -> None:
+    """A group called without a subcommand is charged once."""
+    assert tokens_taken("!song thunder road", monkeypatch) == pytest.approx(1, abs=0.1)
+
+
+def test_early_group_subcommand_cost(monkeypatch: pytest.MonkeyPatch) -> None:
+    """A group whose hooks run before its subcommand is known isn't charged."""
+    assert tokens_taken("!grouped costly x", monkeypatch) == pytest.approx(3, abs=0.1)
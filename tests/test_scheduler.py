@@ -0,0 +1,58 @@
+import asyncio
+
+from cogs.bot_stuff.scheduler import Scheduler
+
+
+def test_cancelled_waiter_skipped() -> None:
+    """A slot freed while a cancelled waiter is still in line goes to the next."""
+
+    async def run() -> None:
+        scheduler = Scheduler(slots=1)
+        await scheduler.acquire("lookup")
+
+        cancelled = asyncio.create_task(scheduler.acquire("lookup"))
+        waiting = asyncio.create_task(scheduler.acquire("lookup"))
+        await asyncio.sleep(0)
+
+        # release before the cancelled waiter has run to leave the line
+        cancelled.cancel()
+        scheduler.release("lookup")
+
+        await asyncio.wait_for(waiting, 1)
+        assert cancelled.cancelled()
+        assert scheduler.running["lookup"] == 1
+        assert not scheduler.waiting
+
+    asyncio.run(run())
+
+
+def test_lookup_reserve() -> None:
+    """Heavy classes together never take the last connection of a small pool."""
+
+    async def run() -> None:
+        scheduler = Scheduler(slots=3)
+        await scheduler.acquire("aggregate")
+        await scheduler.acquire("background")
+
+        # aggregate is under its own limit of 2, but that's the last slot
+        held = asyncio.create_task(scheduler.acquire("aggregate"))
+        await asyncio.sleep(0)
+        assert not held.done()
+
+        await asyncio.wait_for(scheduler.acquire("lookup"), 1)
+
+        scheduler.release("background")
+        await asyncio.wait_for(held, 1)
+        assert scheduler.running["aggregate"] == 2  # noqa: PLR2004
+
+    asyncio.run(run())
+
+
+def test_single_connection_pool() -> None:
+    """With only one connection, heavy work still gets to run."""
+
+    async def run() -> None:
+        scheduler = Scheduler(slots=1)
+        await asyncio.wait_for(scheduler.acquire("background"), 1)
+
+    asyncio.run(run())
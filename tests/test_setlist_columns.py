@@ -0,0 +1,210 @@
+import asyncio
+import random
+from collections import Counter
+from pathlib import Path
+
+import pytest
+from cogs.bot_stuff.setlist_columns import (
+    CLOSER,
+    MAIN_SETS,
+    OPENER,
+    Columns,
+    SetlistColumns,
+    write,
+)
+
+SETS = ("Show", "Set 1", "Set 2", "Encore", "Pre-Show")
+SONGS = {song: f"Song {song}" for song in range(1, 9)}
+TOURS = {1: "Darkness Tour", 2: "River Tour"}
+YEARS = (1978, 1980, 1981)
+
+
+def make_data() -> dict:
+    """Make setlists for a few dozen shows, with songs flagged like the database."""
+    rand = random.Random(1978)  # noqa: S311
+    events = []
+    setlists = []
+
+    for event in range(1, 31):
+        year = rand.choice(YEARS)
+        events.append(
+            {
+                "id": event,
+                "date": f"{year}-06-{event % 28 + 1:02d}",
+                "tour_id": 1 if year == YEARS[0] else 2,
+            },
+        )
+
+        show = [set_name for set_name in SETS if rand.random() < 0.7] or ["Show"]  # noqa: PLR2004
+        position = 0
+
+        for set_name in show:
+            songs = rand.sample(list(SONGS), 3)
+
+            for index, song in enumerate(songs):
+                position += 1
+                last = set_name == show[-1] and index == len(songs) - 1
+                setlists.append(
+                    {
+                        "event_id": event,
+                        "song_id": song,
+                        "set_name": set_name,
+                        "position": position,
+                        "is_opener": index == 0,
+                        "is_closer": index == len(songs) - 1,
+                        "is_last_in_show": last,
+                        "is_main_set_closer": set_name == "Set 2"
+                        and index == len(songs) - 1,
+                    },
+                )
+
+    return {
+        "events": events,
+        "setlists": setlists,
+        "songs": [{"id": song, "song_name": name} for song, name in SONGS.items()],
+        "tours": [{"id": tour, "tour_name": name} for tour, name in TOURS.items()],
+    }
+
+
+def reference_top(
+    data: dict,
+    flag: str,
+    sets: tuple[str, ...],
+    **event: int,
+) -> Counter:
+    """Count (song, position) for flagged rows of the matching events."""
+    events = {
+        row["id"]
+        for row in data["events"]
+        if all(
+            (int(row["date"][:4]) if name == "year" else row[name]) == value
+            for name, value in event.items()
+        )
+    }
+
+    return Counter(
+        (SONGS[row["song_id"]], row["position"])
+        for row in data["setlists"]
+        if row["event_id"] in events and row[flag] and row["set_name"] in sets
+    )
+
+
+def reference_openers(data: dict, song: int) -> Counter:
+    """Count the kinds of set a song opened."""
+    return Counter(
+        "Show Opener"
+        if row["set_name"] in ("Show", "Set 1")
+        else f"{row['set_name']} Opener"
+        for row in data["setlists"]
+        if row["song_id"] == song and row["is_opener"] and row["set_name"] in MAIN_SETS
+    )
+
+
+def reference_closers(data: dict, song: int) -> Counter:
+    """Count the kinds of set a song closed."""
+    counts = Counter()
+
+    for row in data["setlists"]:
+        if row["song_id"] != song or not row["is_closer"]:
+            continue
+
+        if row["set_name"] not in MAIN_SETS:
+            continue
+
+        if row["is_main_set_closer"]:
+            counts["Main Set Closer"] += 1
+        elif row["is_last_in_show"]:
+            counts["Show Closer"] += 1
+        else:
+            counts[f"{row['set_name']} Closer"] += 1
+
+    return counts
+
+
+@pytest.fixture
+def data() -> dict:
+    """Make the fixture shows."""
+    return make_data()
+
+
+@pytest.fixture
+def columns(data: dict, tmp_path: Path) -> SetlistColumns:
+    """Write the fixture shows to a columns file and map it back."""
+    path = tmp_path / "setlists.columns"
+    write(path, 1234, data)
+
+    snapshot = SetlistColumns()
+    asyncio.run(snapshot.use(Columns(path)))
+    return snapshot
+
+
+def test_round_trip(data: dict, columns: SetlistColumns) -> None:
+    """Every row and name comes back from the file as it went in."""
+    mapped = columns.columns
+
+    assert mapped.fingerprint == 1234  # noqa: PLR2004
+    assert list(mapped["events.id"]) == [row["id"] for row in data["events"]]
+    assert list(mapped["setlists.song_id"]) == [
+        row["song_id"] for row in data["setlists"]
+    ]
+    assert list(mapped["setlists.position"]) == [
+        row["position"] for row in data["setlists"]
+    ]
+    assert mapped.songs == SONGS
+    assert mapped.tours == TOURS
+
+
+def test_not_a_columns_file(tmp_path: Path) -> None:
+    """Anything else is refused rather than read."""
+    path = tmp_path / "setlists.columns"
+    path.write_bytes(b"not columns at all")
+
+    with pytest.raises(ValueError, match="not a columns file"):
+        Columns(path)
+
+
+@pytest.mark.parametrize(
+    ("flag", "name"),
+    [(OPENER, "is_opener"), (CLOSER, "is_closer")],
+)
+@pytest.mark.parametrize("sets", [("Show",), MAIN_SETS])
+def test_top(
+    data: dict,
+    columns: SetlistColumns,
+    flag: int,
+    name: str,
+    sets: tuple,
+) -> None:
+    """Top songs by year and tour match counting the rows directly."""
+    for year in YEARS:
+        top = columns.top(flag, sets, year=year)
+        assert Counter(
+            {(row["song_name"], row["position"]): row["total"] for row in top},
+        ) == reference_top(data, name, sets, year=year)
+
+    for tour in TOURS:
+        top = columns.top(flag, sets, tour_id=tour)
+        assert Counter(
+            {(row["song_name"], row["position"]): row["total"] for row in top},
+        ) == reference_top(data, name, sets, tour_id=tour)
+
+
+def test_song_openers_and_closers(data: dict, columns: SetlistColumns) -> None:
+    """Opener and closer counts for each song match counting the rows directly."""
+    for song in SONGS:
+        openers = columns.song_openers(song)
+        closers = columns.song_closers(song)
+
+        assert Counter(
+            {row["position"]: row["count"] for row in openers},
+        ) == reference_openers(data, song)
+        assert Counter(
+            {row["position"]: row["count"] for row in closers},
+        ) == reference_closers(data, song)
+
+
+def test_unknown_keys(columns: SetlistColumns) -> None:
+    """Songs, years and tours with no rows count nothing."""
+    assert columns.top(OPENER, year=1950) == []
+    assert columns.top(OPENER, tour_id=99) == []
+    assert columns.song_openers(99) == []
@@ -0,0 +1,120 @@
+import asyncio
+import datetime
+from collections.abc import Callable
+from pathlib import Path
+
+import pytest
+from cogs.bot_stuff.offline import OfflinePool
+from cogs.bot_stuff.setlist_index import SetlistIndex
+
+THUNDER_ROAD, BACKSTREETS, JUNGLELAND, BORN_TO_RUN, UNKNOWN = 1, 2, 3, 4, 99
+
+# event id -> (set, song) in order
+SETLISTS = {
+    1: [
+        ("Show", THUNDER_ROAD),
+        ("Show", BACKSTREETS),
+        ("Show", JUNGLELAND),
+        ("Show", THUNDER_ROAD),
+        ("Encore", BACKSTREETS),
+    ],
+    2: [("Soundcheck", BORN_TO_RUN), ("Show", JUNGLELAND), ("Show", THUNDER_ROAD)],
+    3: [("Show", BACKSTREETS), ("Show", JUNGLELAND)],
+}
+
+
+@pytest.fixture
+def index(export: Callable[[dict[str, list[dict]]], Path]) -> SetlistIndex:
+    """Build the index from three small shows."""
+    path = export(
+        {
+            "events": [
+                {
+                    "id": event,
+                    "event_id": f"1975080{event}-01",
+                    "event_date": datetime.date(1975, 8, event),
+                    "venue_id": event,
+                }
+                for event in SETLISTS
+            ],
+            "setlists": [
+                {
+                    "event_id": event,
+                    "song_id": song,
+                    "set_name": set_name,
+                    "position": position,
+                }
+                for event, setlist in SETLISTS.items()
+                for position, (set_name, song) in enumerate(setlist, start=1)
+            ],
+            "songs": [
+                {"id": THUNDER_ROAD, "song_name": "Thunder Road"},
+                {"id": BACKSTREETS, "song_name": "Backstreets"},
+                {"id": JUNGLELAND, "song_name": "Jungleland"},
+                {"id": BORN_TO_RUN, "song_name": "Born To Run"},
+            ],
+        },
+    )
+
+    async def build() -> SetlistIndex:
+        index = SetlistIndex()
+
+        async with (
+            OfflinePool(path) as pool,
+            pool.connection() as conn,
+            conn.cursor() as cur,
+        ):
+            await index.load(cur)
+
+        return index
+
+    return asyncio.run(build())
+
+
+def event_ids(events: list) -> list[int]:
+    """Get the ids of a list of events."""
+    return [event["id"] for event in events]
+
+
+def test_chain_in_one_show(index: SetlistIndex) -> None:
+    """Three songs played back to back are found."""
+    assert event_ids(index.follow([THUNDER_ROAD, BACKSTREETS, JUNGLELAND])) == [1]
+
+
+def test_repeated_in_one_show(index: SetlistIndex) -> None:
+    """A pair played twice in a show lists that show once."""
+    assert event_ids(index.follow([THUNDER_ROAD, BACKSTREETS])) == [1]
+
+
+def test_chain_across_sets(index: SetlistIndex) -> None:
+    """Songs follow each other from the main set into the encore."""
+    assert event_ids(index.follow([JUNGLELAND, THUNDER_ROAD, BACKSTREETS])) == [1]
+
+
+def test_chain_across_events(index: SetlistIndex) -> None:
+    """The last song of a show isn't followed by the first of the next."""
+    # show 2 ends with Thunder Road, show 3 opens with Backstreets
+    assert event_ids(index.follow([THUNDER_ROAD, BACKSTREETS])) == [1]
+    assert event_ids(index.follow([JUNGLELAND, THUNDER_ROAD])) == [1, 2]
+    assert event_ids(index.follow([THUNDER_ROAD, BACKSTREETS, JUNGLELAND])) == [1]
+    assert index.follow([BACKSTREETS, BACKSTREETS]) == []
+
+
+def test_unknown_song(index: SetlistIndex) -> None:
+    """Songs that were never played match nothing."""
+    assert index.follow([UNKNOWN, THUNDER_ROAD]) == []
+    assert index.follow([THUNDER_ROAD, UNKNOWN]) == []
+    assert index.follow([THUNDER_ROAD, BACKSTREETS, UNKNOWN]) == []
+    assert list(index.performances(UNKNOWN)) == []
+
+
+def test_performances(index: SetlistIndex) -> None:
+    """Every public performance of a song, in order, with its set and position."""
+    performances = [
+        (slot["id"], slot["set_name"], slot["position"])
+        for slot in map(index.performance, index.performances(THUNDER_ROAD))
+    ]
+
+    assert performances == [(1, "Show", 1), (1, "Show", 4), (2, "Show", 3)]
+    # soundchecks aren't public
+    assert list(index.performances(BORN_TO_RUN)) == []
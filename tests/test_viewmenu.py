@@ -0,0 +1,32 @@
+import asyncio
+from types import SimpleNamespace
+
+from cogs.bot_stuff import viewmenu
+
+
+def test_click_after_eviction() -> None:
+    """A click that lands after the menu stopped being tracked still pages."""
+
+    async def run() -> None:
+        source = viewmenu.ListSource(rows=1)
+        source.add_row("first")
+        source.add_row("second")
+
+        menu = viewmenu.PageMenu(SimpleNamespace(), source)
+        menu.message = SimpleNamespace(id=1)
+        edited = {}
+
+        async def edit_message(**kwargs: object) -> None:
+            edited.update(kwargs)
+
+        interaction = SimpleNamespace(
+            response=SimpleNamespace(edit_message=edit_message),
+        )
+
+        assert menu.message.id not in viewmenu.active_menus
+        await menu.show_page(interaction, 1)
+
+        assert edited["embed"].description == "second"
+        assert menu.message.id not in viewmenu.active_menus
+
+    asyncio.run(run())